@@ -0,0 +1 @@
+"""Offline benchmarks for the OCR pipeline; run with ``python -m benchmarks.run``."""
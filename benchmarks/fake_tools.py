@@ -0,0 +1,156 @@
+"""Stand-ins for ocrmypdf, docker, tesseract, gs and pngquant.
+
+The fake ``ocrmypdf`` sleeps ``FAKE_OCR_STARTUP`` seconds plus
+``FAKE_OCR_PAGE_LATENCY`` seconds per page of its ``--pages`` range, drawing
+a progress bar on stderr like OCRmyPDF's, and copies its input to its output.
+With ``--sidecar`` it writes one line of made-up text per page, separated by
+form feeds like OCRmyPDF's sidecar. The fake ``docker`` understands the
+``run``, ``exec``, ``restart`` and ``rm`` calls made by :mod:`src.runner`: it
+maps paths under its ``-v`` mounts back to the host folders, passes on ``-e``
+variables, sleeps ``FAKE_DOCKER_STARTUP`` seconds per ``docker run``, and
+hands the job to the fake ``ocrmypdf``.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+_OCRMYPDF = r'''
+import os, shutil, sys, time
+args = sys.argv[1:]
+if "--version" in args:
+    print("16.0.0")
+    sys.exit(0)
+pages = 1
+if "--pages" in args:
+    first, _, last = args[args.index("--pages") + 1].partition("-")
+    pages = int(last or first) - int(first) + 1
+time.sleep(float(os.environ.get("FAKE_OCR_STARTUP", "0")))
+for page in range(1, pages + 1):
+    time.sleep(float(os.environ.get("FAKE_OCR_PAGE_LATENCY", "0")))
+    sys.stderr.write(f"\rOCR: {100 * page // pages:3d}%| {page}/{pages} [page]")
+    sys.stderr.flush()
+sys.stderr.write("\n")
+shutil.copyfile(args[-2], args[-1])
+if "--sidecar" in args:
+    with open(args[args.index("--sidecar") + 1], "w", encoding="utf-8") as sidecar:
+        sidecar.write("\f".join(f"Fake OCR text of page {page}\n" for page in range(1, pages + 1)))
+'''
+
+_DOCKER = r'''
+import json, os, subprocess, sys, time, uuid
+from pathlib import Path
+state = Path(os.environ["FAKE_DOCKER_STATE"])
+ocrmypdf = Path(__file__).with_name("ocrmypdf")
+args = sys.argv[1:]
+command, rest = args[0], args[1:]
+if command == "restart":
+    sys.exit(0)
+if command == "rm":
+    for container in rest:
+        if not container.startswith("-"):
+            (state / container).unlink(missing_ok=True)
+    sys.exit(0)
+mounts = {}
+env = dict(os.environ)
+if command == "exec":
+    while rest[0] == "-e":
+        name, _, value = rest[1].partition("=")
+        env[name] = value
+        rest = rest[2:]
+    mounts = json.loads((state / rest[0]).read_text())
+    rest = rest[2:]  # container id, "ocrmypdf"
+elif command == "run":
+    time.sleep(float(os.environ.get("FAKE_DOCKER_STARTUP", "0")))
+    detach = False
+    while rest[0].startswith("-"):
+        flag = rest.pop(0)
+        if flag == "-d":
+            detach = True
+        elif flag == "-v":
+            host, _, target = rest.pop(0).rpartition(":")
+            mounts[target] = host
+        elif flag == "-e":
+            name, _, value = rest.pop(0).partition("=")
+            env[name] = value
+        elif flag in ("--entrypoint", "--name"):
+            rest.pop(0)
+    if detach:
+        container = uuid.uuid4().hex
+        (state / container).write_text(json.dumps(mounts))
+        print(container)
+        sys.exit(0)
+    rest = rest[1:]  # image
+else:
+    sys.exit(f"fake docker: unsupported command {command}")
+def host_path(arg):
+    for target, host in mounts.items():
+        if arg.startswith(target + "/"):
+            return host + arg[len(target):]
+    return arg
+rest = [host_path(arg) for arg in rest]
+sys.exit(subprocess.call([sys.executable, str(ocrmypdf), *rest], env=env))
+'''
+
+_VERSION_ONLY = r'''
+print("0.0-fake")
+'''
+
+_TOOLS = {
+    "ocrmypdf": _OCRMYPDF,
+    "docker": _DOCKER,
+    "tesseract": _VERSION_ONLY,
+    "gs": _VERSION_ONLY,
+    "pngquant": _VERSION_ONLY,
+}
+
+
+def install_fake_tools(bin_dir: Path) -> Path:
+    """Write the fake executables into ``bin_dir``."""
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    for name, body in _TOOLS.items():
+        path = bin_dir / name
+        path.write_text(f"#!{sys.executable}\n{body.lstrip()}", encoding="utf-8")
+        path.chmod(0o755)
+    return bin_dir
+
+
+@contextmanager
+def fake_tools(
+    page_latency: float = 0.0, startup: float = 0.0, docker_startup: float = 0.0
+) -> Iterator[Path]:
+    """Put the fake tools first on PATH for the duration of the block."""
+    names = (
+        "PATH",
+        "FAKE_OCR_PAGE_LATENCY",
+        "FAKE_OCR_STARTUP",
+        "FAKE_DOCKER_STARTUP",
+        "FAKE_DOCKER_STATE",
+    )
+    saved = {name: os.environ.get(name) for name in names}
+    with tempfile.TemporaryDirectory(prefix="lawbooks-fake-") as tmp:
+        bin_dir = install_fake_tools(Path(tmp) / "bin")
+        state = Path(tmp) / "docker-state"
+        state.mkdir()
+        os.environ.update(
+            {
+                "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+                "FAKE_OCR_PAGE_LATENCY": str(page_latency),
+                "FAKE_OCR_STARTUP": str(startup),
+                "FAKE_DOCKER_STARTUP": str(docker_startup),
+                "FAKE_DOCKER_STATE": str(state),
+            }
+        )
+        try:
+            yield bin_dir
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
@@ -0,0 +1,314 @@
+"""Run pipeline benchmarks and compare them against a saved baseline.
+
+    python -m benchmarks.run --size quick --output results.json
+    python -m benchmarks.run --baseline baseline.json
+
+Every scenario runs on synthetic books (see :mod:`benchmarks.synthetic`) with
+the fake OCR tools from :mod:`benchmarks.fake_tools`, so no OCR engine,
+Docker or network is needed. Results are JSON; with ``--baseline`` any
+scenario slower than the baseline by more than ``--threshold`` is reported and
+the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from pypdf import PdfReader, PdfWriter
+
+from benchmarks.fake_tools import fake_tools
+from benchmarks.synthetic import make_book
+from src.ocr_chunks import BookOcrJob, OcrSettings, ocr_pdf_in_chunks
+from src.pdf_ops import merge_pdfs
+from src.runner import DockerContainerPool
+from src.status_store import StatusStore
+from src.text_extract import extract_text
+
+logger = logging.getLogger("benchmarks")
+
+SIZES = {"quick": (10, 200), "full": (10, 500, 5000)}
+CHUNK_SIZE = 25
+STATUS_EVENTS = 20000
+# Differences below this are noise, whatever the ratio.
+MIN_REGRESSION_SECONDS = 0.02
+
+
+@dataclass
+class Context:
+    book: Path
+    pages: int
+    tmp: Path
+    jobs: int
+
+
+def _fresh_dir(ctx: Context, name: str) -> Path:
+    path = ctx.tmp / name
+    shutil.rmtree(path, ignore_errors=True)
+    path.mkdir(parents=True)
+    return path
+
+
+def bench_split(ctx: Context) -> float:
+    workdir = _fresh_dir(ctx, "split")
+    settings = OcrSettings(
+        backend="local", workdir=workdir, lang="eng", clean=False, dry_run=False
+    )
+    book = BookOcrJob(
+        ctx.book, workdir, settings, chunk_size=CHUNK_SIZE, staging="reference", prescan=False
+    )
+    book.prepare()
+    started = time.perf_counter()
+    for chunk in book.chunks:
+        book.split(chunk)
+    return time.perf_counter() - started
+
+
+def _bench_ocr(ctx: Context, backend: str, reuse_containers: bool) -> float:
+    workdir = _fresh_dir(ctx, f"ocr-{backend}")
+    with fake_tools():
+        started = time.perf_counter()
+        ocr_pdf_in_chunks(
+            str(ctx.book),
+            str(workdir),
+            chunk_size=CHUNK_SIZE,
+            backend=backend,
+            jobs=ctx.jobs,
+            reuse_containers=reuse_containers,
+            staging="reference",
+            merge=False,
+            prescan=False,
+        )
+        return time.perf_counter() - started
+
+
+def bench_ocr_local(ctx: Context) -> float:
+    """Chunked OCR with a zero-latency OCR tool: pure orchestration overhead."""
+    return _bench_ocr(ctx, "local", reuse_containers=False)
+
+
+def bench_ocr_docker_pool(ctx: Context) -> float:
+    return _bench_ocr(ctx, "docker", reuse_containers=True)
+
+
+def bench_docker_pool_start(ctx: Context) -> float:
+    """Start a container pool and measure the per-chunk overhead it saves."""
+    workdir = _fresh_dir(ctx, "docker-pool")
+    with fake_tools():
+        started = time.perf_counter()
+        with DockerContainerPool(str(workdir), size=ctx.jobs, measure_overhead=True) as pool:
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Docker pool saves %ss per chunk", pool.summary()["saved_per_chunk_seconds"]
+            )
+    return elapsed
+
+
+def bench_merge(ctx: Context) -> float:
+    workdir = _fresh_dir(ctx, "merge")
+    reader = PdfReader(str(ctx.book))
+    chunks = []
+    for start in range(0, ctx.pages, CHUNK_SIZE):
+        writer = PdfWriter()
+        for index in range(start, min(start + CHUNK_SIZE, ctx.pages)):
+            writer.add_page(reader.pages[index])
+        chunk = workdir / f"chunk_{start + 1:04d}.pdf"
+        with chunk.open("wb") as handle:
+            writer.write(handle)
+        chunks.append(chunk)
+    started = time.perf_counter()
+    merge_pdfs(chunks, workdir / "merged.pdf")
+    return time.perf_counter() - started
+
+
+def bench_status_writes(ctx: Context) -> float:
+    workdir = _fresh_dir(ctx, "status")
+    started = time.perf_counter()
+    with StatusStore(workdir / "status.json") as store:
+        for event in range(STATUS_EVENTS):
+            store.update(
+                ("chunks", f"chunk_{event % 200:04d}.pdf"),
+                {"status": "completed", "attempts": 1, "ocr_seconds": 1.5},
+            )
+    return time.perf_counter() - started
+
+
+def bench_extract(ctx: Context) -> float:
+    workdir = _fresh_dir(ctx, "extract")
+    started = time.perf_counter()
+    extract_text(ctx.book, workdir / "book.txt")
+    return time.perf_counter() - started
+
+
+def bench_extract_parallel(ctx: Context) -> float:
+    workdir = _fresh_dir(ctx, "extract-parallel")
+    started = time.perf_counter()
+    extract_text(ctx.book, workdir / "book.txt", jobs=ctx.jobs)
+    return time.perf_counter() - started
+
+
+# Scenarios run once per book size; BOOKLESS ones run once per benchmark.
+SCENARIOS: Dict[str, Callable[[Context], float]] = {
+    "split": bench_split,
+    "ocr_local": bench_ocr_local,
+    "ocr_docker_pool": bench_ocr_docker_pool,
+    "docker_pool_start": bench_docker_pool_start,
+    "merge": bench_merge,
+    "extract": bench_extract,
+    "extract_parallel": bench_extract_parallel,
+    "status_writes": bench_status_writes,
+}
+BOOKLESS = {"status_writes", "docker_pool_start"}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    sizes: List[int], scenarios: List[str], repeat: int, jobs: int
+) -> dict:
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix="lawbooks-bench-") as tmp:
+        tmp_path = Path(tmp)
+        runs = [(name, None) for name in scenarios if name in BOOKLESS]
+        runs += [
+            (name, pages) for pages in sizes for name in scenarios if name not in BOOKLESS
+        ]
+        for name, pages in runs:
+            book = tmp_path / f"book_{pages}.pdf"
+            if pages is not None and not book.exists():
+                make_book(book, pages)
+            ctx = Context(book=book, pages=pages or 0, tmp=tmp_path, jobs=jobs)
+            timings = [SCENARIOS[name](ctx) for _ in range(repeat)]
+            key = name if pages is None else f"{name}[{pages}p]"
+            best = min(timings)
+            results[key] = {
+                "seconds": round(best, 4),
+                "median_seconds": round(statistics.median(timings), 4),
+                "runs": [round(timing, 4) for timing in timings],
+            }
+            if pages:
+                results[key]["pages"] = pages
+                results[key]["pages_per_second"] = round(pages / best, 1) if best else None
+            logger.info("%-28s %8.3fs", key, best)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jobs": jobs,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Return one row per scenario in both runs, flagging regressions."""
+    rows = []
+    for key, result in current["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is None:
+            continue
+        ratio = result["seconds"] / previous["seconds"] if previous["seconds"] else None
+        regressed = (
+            ratio is not None
+            and ratio > 1 + threshold
+            and result["seconds"] - previous["seconds"] > MIN_REGRESSION_SECONDS
+        )
+        rows.append(
+            {
+                "scenario": key,
+                "baseline_seconds": previous["seconds"],
+                "seconds": result["seconds"],
+                "ratio": None if ratio is None else round(ratio, 3),
+                "regression": regressed,
+            }
+        )
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the LawBooks pipeline.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="quick")
+    parser.add_argument(
+        "--pages", type=int, nargs="+", help="Book sizes to use instead of --size"
+    )
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run (repeatable; default: all)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--output", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="Compare against these saved results")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Flag scenarios this much slower than the baseline (0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    logging.getLogger("src").setLevel(logging.WARNING)
+
+    report = run_benchmarks(
+        sizes=args.pages or list(SIZES[args.size]),
+        scenarios=args.scenarios or list(SCENARIOS),
+        repeat=args.repeat,
+        jobs=args.jobs,
+    )
+    status = 0
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        rows = compare(report, baseline, args.threshold)
+        report["comparison"] = {"baseline": args.baseline, "threshold": args.threshold, "rows": rows}
+        for row in rows:
+            logger.info(
+                "%-28s %8.3fs -> %8.3fs  x%.2f%s",
+                row["scenario"],
+                row["baseline_seconds"],
+                row["seconds"],
+                row["ratio"] or 0,
+                "  REGRESSION" if row["regression"] else "",
+            )
+        if any(row["regression"] for row in rows):
+            status = 1
+
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(payload + "\n", encoding="utf-8")
+    else:
+        print(payload)
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
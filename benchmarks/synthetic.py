@@ -0,0 +1,123 @@
+"""Synthetic law books: text pages with citations, mixed with scanned-image pages."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import zlib
+from pathlib import Path
+
+from pypdf import PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+
+_WORDS = (
+    "the court held that under section act appeal tribunal order judgment "
+    "plaintiff defendant evidence contract statute provision applicant respondent "
+    "liability damages notice hearing jurisdiction commissioner regulation"
+).split()
+_CITATIONS = ("s. {0}({1})", "Art. {0}", "r. {0}({1})(b)", "para {0}", "ss. {0}-{1}")
+_LINES_PER_PAGE = 40
+_IMAGE_VARIANTS = 4
+_IMAGE_SIDE = 600
+
+
+def _text_line(rng: random.Random) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 14))]
+    if rng.random() < 0.1:
+        citation = rng.choice(_CITATIONS).format(rng.randint(1, 300), rng.randint(1, 9))
+        words.insert(rng.randrange(len(words)), citation)
+    return " ".join(words).replace("\\", "").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_text(rng: random.Random, page_number: int) -> bytes:
+    lines = [f"BT /F1 10 Tf 12 TL 56 760 Td (Page {page_number}) Tj"]
+    lines.extend(f"T* ({_text_line(rng)}) Tj" for _ in range(_LINES_PER_PAGE))
+    lines.append("ET")
+    return "\n".join(lines).encode("latin-1")
+
+
+def _image(writer: PdfWriter, rng: random.Random) -> object:
+    # Mostly white with noisy "print", roughly like a compressed scan.
+    pixels = bytearray(b"\xff" * (_IMAGE_SIDE * _IMAGE_SIDE))
+    for _ in range(_IMAGE_SIDE * _IMAGE_SIDE // 8):
+        pixels[rng.randrange(len(pixels))] = rng.randrange(0, 128)
+    image = StreamObject()
+    image._data = zlib.compress(bytes(pixels))
+    image.update(
+        {
+            NameObject("/Type"): NameObject("/XObject"),
+            NameObject("/Subtype"): NameObject("/Image"),
+            NameObject("/Width"): NumberObject(_IMAGE_SIDE),
+            NameObject("/Height"): NumberObject(_IMAGE_SIDE),
+            NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+            NameObject("/BitsPerComponent"): NumberObject(8),
+            NameObject("/Filter"): NameObject("/FlateDecode"),
+        }
+    )
+    return writer._add_object(image)
+
+
+def make_book(path: Path, pages: int, image_every: int = 4, seed: int = 0) -> Path:
+    """Write a ``pages``-page book to ``path``; every ``image_every``-th page
+    (0 for none) is an image-only page. The output depends only on the
+    arguments."""
+    rng = random.Random(seed)
+    writer = PdfWriter()
+    font = writer._add_object(
+        DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Font"),
+                NameObject("/Subtype"): NameObject("/Type1"),
+                NameObject("/BaseFont"): NameObject("/Helvetica"),
+            }
+        )
+    )
+    images = [_image(writer, rng) for _ in range(_IMAGE_VARIANTS)] if image_every else []
+    for page_number in range(1, pages + 1):
+        page = writer.add_blank_page(612, 792)
+        content = DecodedStreamObject()
+        if image_every and page_number % image_every == 0:
+            resources = DictionaryObject(
+                {
+                    NameObject("/XObject"): DictionaryObject(
+                        {NameObject("/Im1"): rng.choice(images)}
+                    )
+                }
+            )
+            content.set_data(b"q 540 0 0 720 36 36 cm /Im1 Do Q")
+        else:
+            resources = DictionaryObject(
+                {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+            )
+            content.set_data(_page_text(rng, page_number))
+        page[NameObject("/Resources")] = resources
+        page[NameObject("/Contents")] = writer._add_object(content)
+        page[NameObject("/MediaBox")] = ArrayObject(
+            [NumberObject(0), NumberObject(0), NumberObject(612), NumberObject(792)]
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as handle:
+        writer.write(handle)
+    return path
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate a synthetic law book PDF.")
+    parser.add_argument("output")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--image-every", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    make_book(Path(args.output), args.pages, args.image_every, args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
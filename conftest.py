@@ -0,0 +1 @@
+"""Lets the tests import the ``src`` package when run as plain ``pytest``."""
@@ -2,14 +2,46 @@
 
 from __future__ import annotations
 
-import json
+import contextvars
 import logging
+import shutil
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional
+
+from . import metrics
+from .leases import DEFAULT_LEASE_SECONDS, FINISHED, Lease, LeaseDirectory
+from .ocr_chunks import (
+    BookOcrJob,
+    OcrSettings,
+    RetryPolicy,
+    backend_pools,
+    chunk_sidecars,
+    _check_backend,
+    ocr_pdf_in_chunks,
+    run_book_jobs,
+)
+from .ocr_cache import DEFAULT_MAX_BYTES, OcrCache
+from .page_store import pack_text_files
+from .profiles import DEFAULT_PROFILE, CpuBudget, get_profile
+from .progress import DEFAULT_INTERVAL
+from .scratch import DEFAULT_RESERVE_BYTES, ScratchSpace
+from .status_store import StatusStore
+from .text_extract import DEFAULT_PAGES_PER_TASK, extract_text, extract_texts
+from .watch import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_RESCAN_INTERVAL,
+    DEFAULT_SETTLE_SECONDS,
+    FolderWatcher,
+)
 
 logger = logging.getLogger(__name__)
 
+STEPS = ("ocr", "extract_text")
+DEFAULT_WORKER_POLL_INTERVAL = 10.0
+
 
 def iter_pdfs(input_folder: Path) -> Iterable[Path]:
     return sorted(path for path in input_folder.glob("*.pdf") if path.is_file())
@@ -43,23 +75,585 @@ def prepare_books(
 ) -> Path:
     """Enumerate PDFs and create per-book status files.
 
-    This function is resumable: if a status.json already exists, it is preserved.
+    This function is resumable: if a book already has status (a status.json
+    snapshot or a journal), it is preserved.
     """
     run_path = create_run_folders(runs_folder, run_id=run_id)
-    books_root = run_path / "books"
-
     for pdf_path in iter_pdfs(input_folder):
-        book_id = _book_id_for(pdf_path)
-        book_path = books_root / book_id
-        book_path.mkdir(parents=True, exist_ok=True)
+        _prepare_book(run_path, pdf_path)
+    return run_path
+
+
+def _prepare_book(run_path: Path, pdf_path: Path) -> Path:
+    """Create the book's folder and pending status unless it has a status."""
+    book_path = run_path / "books" / _book_id_for(pdf_path)
+    book_path.mkdir(parents=True, exist_ok=True)
+
+    store = StatusStore(book_path / "status.json")
+    if store.exists():
+        logger.info("Skipping existing status for %s", pdf_path)
+        return book_path
+
+    for key, value in _status_payload(pdf_path).items():
+        store.set((key,), value)
+    store.close()
+    logger.info("Created status for %s", pdf_path)
+    return book_path
+
+
+def _book_paths(run_path: Path, book_ids: Optional[Iterable[str]] = None) -> List[Path]:
+    if book_ids is not None:
+        return [run_path / "books" / book_id for book_id in book_ids]
+    return sorted(path for path in (run_path / "books").iterdir() if path.is_dir())
 
-        status_path = book_path / "status.json"
-        if status_path.exists():
-            logger.info("Skipping existing status for %s", pdf_path)
+
+def run_books(
+    run_path: Path,
+    output_folder: Path,
+    chunk_size: int = 25,
+    jobs: int = 1,
+    lookahead: int = 2,
+    lang: str = "eng",
+    clean: bool = False,
+    force: bool = False,
+    backend: str = "auto",
+    reuse_containers: bool = False,
+    staging: str = "auto",
+    cache_dir: Optional[Path] = None,
+    cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    prescan: bool = True,
+    chunking: str = "fixed",
+    min_chunk_pages: int = 1,
+    max_chunk_pages: Optional[int] = None,
+    retry: Optional[RetryPolicy] = None,
+    keep_going: bool = False,
+    scratch_dir: Optional[Path] = None,
+    scratch_reserve_bytes: int = DEFAULT_RESERVE_BYTES,
+    profile: str = DEFAULT_PROFILE,
+    cpus: Optional[int] = None,
+    progress_interval: float = DEFAULT_INTERVAL,
+    book_ids: Optional[Iterable[str]] = None,
+    leases: Optional[Mapping[str, Lease]] = None,
+) -> dict:
+    """OCR and extract text for every prepared book in ``run_path``, or only
+    for ``book_ids`` when given.
+
+    Chunks from all books share one queue of ``jobs`` workers (see
+    :func:`src.ocr_chunks.run_book_jobs`), with the longest books queued first
+    so small books fill idle workers at the end of the run. Each book's
+    status.json records its steps; books whose steps are already completed
+    are skipped, and interrupted books resume at the chunk level. An
+    ``"auto"`` backend is only resolved once a chunk needs OCR. Text is
+    written to ``output_folder/output_text/<stem>.txt`` on a thread of its
+    own, so chunk workers go on with the next book, taken from the chunks'
+    OCRmyPDF sidecars where they exist. With ``cache_dir``,
+    chunks already OCR'd in any earlier run are reused from the shared cache.
+    ``retry`` and ``keep_going`` decide how chunk failures are handled (see
+    :class:`src.ocr_chunks.RetryPolicy`). With ``scratch_dir``, chunk inputs
+    are written there rather than into the run folder. ``profile`` and
+    ``cpus`` are as for :func:`src.ocr_chunks.ocr_pdf_in_chunks`. Progress
+    is logged every ``progress_interval`` seconds. ``leases`` maps book ids
+    to the leases :func:`run_worker` holds on them; a book whose lease is
+    lost is abandoned (see :meth:`src.ocr_chunks.BookOcrJob.abandon`) and
+    counted as taken over.
+
+    Returns a summary of books and pages processed and the throughput.
+    """
+    from .pdf_ops import count_pages
+
+    started = time.perf_counter()
+    _check_backend(backend)
+    settings = OcrSettings(
+        backend=backend,
+        workdir=run_path,
+        lang=lang,
+        clean=clean,
+        dry_run=False,
+        retry=retry or RetryPolicy(),
+        keep_going=keep_going,
+        profile=get_profile(profile),
+        cpu_budget=CpuBudget.for_jobs(jobs, cpus),
+        cache=OcrCache(cache_dir, cache_max_bytes) if cache_dir else None,
+        scratch=ScratchSpace(scratch_dir, scratch_reserve_bytes) if scratch_dir else None,
+    )
+
+    books: List[BookOcrJob] = []
+    pages: Dict[Path, int] = {}
+    skipped = 0
+    unreadable = 0
+    for book_path in _book_paths(run_path, book_ids):
+        store = StatusStore(book_path / "status.json")
+        steps = store.get("steps", default={})
+        if not force and all(steps.get(step) == "completed" for step in STEPS):
+            skipped += 1
+            store.close()
             continue
+        pdf_path = Path(store.get("pdf_path"))
+        page_count = store.get("pages")
+        if page_count is None:
+            try:
+                page_count = count_pages(pdf_path)
+            except Exception as exc:
+                logger.error("Could not read %s: %s", pdf_path, exc)
+                store.set(("steps", "ocr"), "failed")
+                store.set(("last_error",), str(exc))
+                store.close()
+                unreadable += 1
+                continue
+            store.set(("pages",), page_count)
+        pages[book_path] = page_count
+        book = BookOcrJob(
+            pdf_path,
+            book_path,
+            settings,
+            chunk_size=chunk_size,
+            force=force,
+            staging=staging,
+            store=store,
+            prescan=prescan,
+            chunking=chunking,
+            min_chunk_pages=min_chunk_pages,
+            max_chunk_pages=max_chunk_pages,
+            expected_pages=page_count,
+        )
+        lease = None if leases is None else leases.get(book_path.name)
+        if lease is not None:
+            lease.on_lost = book.abandon
+            if lease.lost:
+                book.abandon()
+        books.append(book)
+
+    # Longest book first: its chunks start early instead of being the tail.
+    books.sort(key=lambda book: pages[book.workdir], reverse=True)
+    for book in books:
+        book.store.set(("steps", "ocr"), "running")
+
+    text_dir = output_folder / "output_text"
+    completed: List[BookOcrJob] = []
+    taken_over: List[BookOcrJob] = []
+
+    # One thread: extraction is mostly pypdf parsing, which holds the GIL.
+    extractor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extract")
+
+    def extract(book: BookOcrJob, merged_path: Path) -> None:
+        store = book.store
+        try:
+            try:
+                with metrics.span("extract", pages=pages[book.workdir]) as extract_span:
+                    text_path = extract_text(
+                        merged_path,
+                        text_dir / f"{book.source_path.stem}.txt",
+                        sidecars=chunk_sidecars(merged_path, store),
+                    )
+                    extract_span.add(bytes=text_path.stat().st_size)
+                store.update(("metrics", "stages"), {"extract": extract_span.as_dict()})
+            except Exception as exc:
+                logger.error("Text extraction failed for %s: %s", merged_path, exc)
+                store.set(("steps", "extract_text"), "failed")
+                store.set(("last_error",), str(exc))
+                return
+            store.set(("steps", "extract_text"), "completed")
+            store.set(("text_path",), str(text_path))
+            store.set(("last_error",), None)
+            completed.append(book)
+        finally:
+            store.close()
+
+    def on_book_done(
+        book: BookOcrJob, merged_path: Optional[Path], error: Optional[BaseException]
+    ) -> None:
+        store = book.store
+        if book.abandoned:
+            taken_over.append(book)
+        elif error is not None:
+            store.set(("steps", "ocr"), "failed")
+            store.set(("last_error",), str(error))
+        else:
+            store.set(("steps", "ocr"), "completed")
+            store.set(("steps", "extract_text"), "running")
+            extractor.submit(contextvars.copy_context().run, extract, book, merged_path)
+            return
+        store.close()
+
+    try:
+        with backend_pools(settings, jobs, reuse_containers):
+            run_book_jobs(
+                books,
+                jobs=jobs,
+                lookahead=lookahead,
+                on_book_done=on_book_done,
+                progress_interval=progress_interval,
+            )
+    finally:
+        extractor.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - started
+    hours = max(elapsed, 1e-9) / 3600
+    done_pages = sum(pages[book.workdir] for book in completed)
+    return {
+        "books_total": len(books) + skipped + unreadable,
+        "books_completed": len(completed),
+        "books_failed": len(books) - len(completed) - len(taken_over) + unreadable,
+        "books_skipped": skipped,
+        "books_taken_over": len(taken_over),
+        "pages_completed": done_pages,
+        "elapsed_seconds": round(elapsed, 1),
+        "books_per_hour": round(len(completed) / hours, 1),
+        "pages_per_hour": round(done_pages / hours, 1),
+    }
+
+
+def queue_book(run_path: Path, pdf_path: Path, changed: bool = False) -> str:
+    """Create a pending status for ``pdf_path`` in the run; returns its book id.
+
+    With ``changed``, a book queued before starts over in a fresh folder, so
+    chunks OCR'd from an earlier version of the file are not reused. Without
+    it an existing book folder is kept and the book resumes from its status.
+    """
+    book_id = _book_id_for(pdf_path)
+    book_path = run_path / "books" / book_id
+    if (book_path / "status.json").exists() and not changed:
+        logger.info("%s is already in %s; resuming it", pdf_path, run_path)
+        return book_id
+    if book_path.exists():
+        logger.info("%s changed; discarding its earlier results", pdf_path)
+        shutil.rmtree(book_path)
+    book_path.mkdir(parents=True, exist_ok=True)
+    with StatusStore(book_path / "status.json") as store:
+        for key, value in _status_payload(pdf_path).items():
+            store.set((key,), value)
+    return book_id
+
+
+def watch_folder(
+    input_folder: Path,
+    runs_folder: Path,
+    run_id: str = "watch",
+    settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    rescan_interval: float = DEFAULT_RESCAN_INTERVAL,
+    use_inotify: bool = True,
+    stop: Optional[Callable[[], bool]] = None,
+    **run_options: Any,
+) -> Path:
+    """Queue new and changed PDFs into one run as they arrive and process them.
+
+    A PDF is queued once it has stopped growing (see
+    :class:`src.watch.FolderWatcher`) and each batch is passed to
+    :func:`run_books` with ``run_options``. ``<run>/watch.json`` records the
+    size and mtime of every file queued and whether its book completed or
+    failed, so after a restart unfinished and failed books are resumed and
+    completed ones are only queued again if the file changes. A book folder
+    left in the run without a watch.json entry is resumed, not replaced. Runs
+    until ``stop`` returns True or the process is interrupted; returns the run
+    folder.
+    """
+    run_path = create_run_folders(runs_folder, run_id=run_id)
+    state = StatusStore(run_path / "watch.json")
+    files: Dict[str, dict] = state.get("files", default={})
+    known = {name: (record["size"], record["mtime_ns"]) for name, record in files.items()}
+    unfinished = [
+        name for name, record in files.items() if record["state"] in ("queued", "failed")
+    ]
 
-        payload = _status_payload(pdf_path)
-        status_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-        logger.info("Created status for %s", pdf_path)
+    def process(names: List[str]) -> None:
+        summary = run_books(
+            run_path,
+            book_ids=[_book_id_for(input_folder / name) for name in names],
+            **run_options,
+        )
+        failed = []
+        for name in names:
+            outcome = _outcome(run_path / "books" / _book_id_for(input_folder / name))
+            if outcome is None:
+                continue
+            state.update(("files", name), {"state": outcome})
+            if outcome == "failed":
+                failed.append(name)
+        logger.info("Batch done: %s", format_summary(summary).replace("\n", "; "))
+        if failed:
+            logger.warning(
+                "%s book(s) failed and are retried after a restart or when changed: %s",
+                len(failed),
+                ", ".join(failed),
+            )
 
+    try:
+        with FolderWatcher(
+            input_folder,
+            known=known,
+            settle_seconds=settle_seconds,
+            poll_interval=poll_interval,
+            rescan_interval=rescan_interval,
+            use_inotify=use_inotify,
+        ) as watcher:
+            logger.info(
+                "Watching %s for run %s (%s); %s file(s) known, %s to resume",
+                input_folder,
+                run_path,
+                watcher.mode,
+                len(known),
+                len(unfinished),
+            )
+            if unfinished:
+                process(unfinished)
+            while stop is None or not stop():
+                ready = watcher.poll()
+                if not ready:
+                    continue
+                for pdf_path in ready:
+                    changed = state.get("files", pdf_path.name) is not None
+                    queue_book(run_path, pdf_path, changed=changed)
+                    size, mtime_ns = watcher.known[pdf_path.name]
+                    state.set(
+                        ("files", pdf_path.name),
+                        {"size": size, "mtime_ns": mtime_ns, "state": "queued"},
+                    )
+                logger.info("Queued %s new or changed book(s)", len(ready))
+                process([pdf_path.name for pdf_path in ready])
+    except KeyboardInterrupt:
+        logger.info("Stopped watching %s", input_folder)
+    finally:
+        state.close()
     return run_path
+
+
+def _claim_books(
+    leases: LeaseDirectory, run_path: Path, input_folder: Path, pages_wanted: int
+) -> Dict[str, Lease]:
+    """Claim books, largest file first, until they hold ``pages_wanted`` pages."""
+    from .pdf_ops import count_pages
+
+    claimed: Dict[str, Lease] = {}
+    pages = 0
+    for pdf_path in sorted(
+        iter_pdfs(input_folder), key=lambda path: path.stat().st_size, reverse=True
+    ):
+        if pages >= pages_wanted:
+            break
+        lease = leases.claim(_book_id_for(pdf_path))
+        if lease is None:
+            continue
+        book_path = _prepare_book(run_path, pdf_path)
+        with StatusStore(book_path / "status.json") as store:
+            store.set(("lease",), {"owner": leases.owner, "generation": lease.generation})
+            book_pages = store.get("pages")
+        if book_pages is None:
+            try:
+                book_pages = count_pages(pdf_path)
+            except Exception:
+                # run_books records the book as failed.
+                book_pages = 0
+        claimed[lease.name] = lease
+        pages += book_pages
+    return claimed
+
+
+def _outcome(book_path: Path) -> Optional[str]:
+    status = StatusStore(book_path / "status.json").data
+    if all(status.get("steps", {}).get(step) == "completed" for step in STEPS):
+        return "completed"
+    if _has_failures(status):
+        return "failed"
+    return None
+
+
+def run_worker(
+    input_folder: Path,
+    runs_folder: Path,
+    run_id: str,
+    worker_id: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    poll_interval: float = DEFAULT_WORKER_POLL_INTERVAL,
+    stop: Optional[Callable[[], bool]] = None,
+    **run_options: Any,
+) -> dict:
+    """Process the run ``run_id`` together with workers on other hosts.
+
+    Every worker points at the same input folder and ``runs_folder`` on a
+    shared filesystem. Books are claimed through lease files in
+    ``<run>/leases`` (see :class:`src.leases.LeaseDirectory`), as many at a
+    time as fill ``jobs`` workers with chunks, and are processed with
+    :func:`run_books` and ``run_options``. Their results go to the shared
+    per-book status as usual. A book claimed by a worker that stops renewing
+    its lease for ``lease_seconds`` is taken over and resumed at the chunk
+    level. Once no book is free, the worker checks for expired leases every
+    ``poll_interval`` seconds. It returns when every book in the input folder
+    has completed or failed, or when ``stop`` returns True.
+
+    Returns a :func:`run_books` summary of the books this worker processed.
+    """
+    started = time.perf_counter()
+    run_path = create_run_folders(runs_folder, run_id=run_id)
+    pages_wanted = run_options.get("jobs", 1) * run_options.get("chunk_size", 25)
+    summaries: List[dict] = []
+    with LeaseDirectory(run_path / "leases", owner=worker_id, ttl=lease_seconds) as leases:
+        logger.info("Worker %s sharing run %s", leases.owner, run_path)
+        while stop is None or not stop():
+            claimed = _claim_books(leases, run_path, input_folder, pages_wanted)
+            if claimed:
+                logger.info("Claimed %s", ", ".join(claimed))
+                try:
+                    summaries.append(
+                        run_books(
+                            run_path, book_ids=list(claimed), leases=claimed, **run_options
+                        )
+                    )
+                finally:
+                    for book_id, lease in claimed.items():
+                        leases.release(lease, _outcome(run_path / "books" / book_id))
+                continue
+            states = [leases.state(_book_id_for(path)) for path in iter_pdfs(input_folder)]
+            if all(state in FINISHED for state in states):
+                break
+            logger.debug("No free books; %s held by other workers", states.count("held"))
+            time.sleep(poll_interval)
+
+    elapsed = time.perf_counter() - started
+    hours = max(elapsed, 1e-9) / 3600
+    summary = {
+        key: sum(part[key] for part in summaries)
+        for key in (
+            "books_total",
+            "books_completed",
+            "books_failed",
+            "books_skipped",
+            "books_taken_over",
+            "pages_completed",
+        )
+    }
+    summary.update(
+        elapsed_seconds=round(elapsed, 1),
+        books_per_hour=round(summary["books_completed"] / hours, 1),
+        pages_per_hour=round(summary["pages_completed"] / hours, 1),
+    )
+    return summary
+
+
+def _has_failures(status: dict) -> bool:
+    return "failed" in status.get("steps", {}).values() or any(
+        chunk.get("status") == "failed" for chunk in status.get("chunks", {}).values()
+    )
+
+
+def retry_failed(path: Path, output_folder: Optional[Path] = None, **options: Any) -> dict:
+    """Re-run the books under ``path`` that have a failed step or chunk.
+
+    ``path`` is a run folder or an ``ocr-one`` output folder. Each book is
+    resumed with the chunk plan recorded in its status, so chunks that
+    completed are kept and only the failed ones (and any dropped after the
+    failure) are OCR'd again. ``options`` are the execution options of
+    :func:`run_books` (jobs, backend, retry policy, ...); ``output_folder`` is
+    required for a run folder.
+
+    Returns ``{"books_retried", "books_failed"}``.
+    """
+    path = Path(path)
+    if (path / "books").is_dir():
+        groups: Dict[str, List[str]] = {}
+        plans: Dict[str, dict] = {}
+        for book_path in _book_paths(path):
+            status = StatusStore(book_path / "status.json").data
+            if _has_failures(status):
+                plan = status.get("plan", {})
+                key = repr(sorted(plan.items()))
+                groups.setdefault(key, []).append(book_path.name)
+                plans[key] = plan
+        if not groups:
+            return {"books_retried": 0, "books_failed": 0}
+        if output_folder is None:
+            raise ValueError("An output folder is needed to retry a run folder.")
+        failed = 0
+        for key, book_ids in groups.items():
+            logger.info("Retrying %s book(s) in %s", len(book_ids), path)
+            summary = run_books(
+                path,
+                output_folder,
+                force=False,
+                book_ids=book_ids,
+                **{**options, **plans[key]},
+            )
+            failed += summary["books_failed"]
+        return {"books_retried": sum(len(ids) for ids in groups.values()), "books_failed": failed}
+
+    status = StatusStore(path / "status.json").data
+    if not status:
+        raise ValueError(f"{path} is neither a run folder nor an ocr-one output folder.")
+    if not _has_failures(status):
+        return {"books_retried": 0, "books_failed": 0}
+    source = status.get("source", {}).get("path")
+    if source is None:
+        raise ValueError(f"{path / 'status.json'} does not record the source PDF.")
+    options.pop("output_folder", None)
+    logger.info("Retrying %s", source)
+    try:
+        ocr_pdf_in_chunks(source, str(path), force=False, **{**options, **status.get("plan", {})})
+    except (RuntimeError, TimeoutError) as exc:
+        logger.error("Retry of %s failed: %s", source, exc)
+        return {"books_retried": 1, "books_failed": 1}
+    return {"books_retried": 1, "books_failed": 0}
+
+
+def extract_text_folder(
+    input_folder: Path,
+    output_folder: Path,
+    jobs: int = 1,
+    force: bool = False,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+    page_store: Optional[Path] = None,
+    compress: bool = False,
+) -> dict:
+    """Extract text from every PDF in ``input_folder`` on one process pool.
+
+    Text goes to ``output_folder/output_text/<stem>.txt``. Books whose text
+    file is newer than the PDF are skipped unless ``force`` is set. Largest
+    books are queued first so the run does not end on one long book. With
+    ``page_store``, every book's text is then packed into that file (see
+    :mod:`src.page_store`).
+    """
+    started = time.perf_counter()
+    text_dir = output_folder / "output_text"
+    books = []
+    skipped = 0
+    for pdf_path in iter_pdfs(input_folder):
+        text_path = text_dir / f"{pdf_path.stem}.txt"
+        if (
+            not force
+            and text_path.exists()
+            and text_path.stat().st_mtime_ns >= pdf_path.stat().st_mtime_ns
+        ):
+            skipped += 1
+            continue
+        books.append((pdf_path, text_path))
+    books.sort(key=lambda book: book[0].stat().st_size, reverse=True)
+
+    errors = extract_texts(books, jobs=jobs, pages_per_task=pages_per_task)
+    failed = sum(1 for error in errors.values() if error is not None)
+    if page_store is not None:
+        text_paths = [
+            text_dir / f"{pdf_path.stem}.txt"
+            for pdf_path in iter_pdfs(input_folder)
+            if errors.get(pdf_path) is None
+        ]
+        pack_text_files([path for path in text_paths if path.exists()], page_store, compress)
+    return {
+        "books_total": len(books) + skipped,
+        "books_completed": len(books) - failed,
+        "books_failed": failed,
+        "books_skipped": skipped,
+        "elapsed_seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def format_summary(summary: dict) -> str:
+    taken_over = summary.get("books_taken_over")
+    return (
+        f"Books: {summary['books_completed']} completed, "
+        f"{summary['books_failed']} failed, "
+        f"{summary['books_skipped']} already done"
+        + (f", {taken_over} taken over by other workers" if taken_over else "")
+        + f" (of {summary['books_total']})\n"
+        f"Pages: {summary['pages_completed']} in {summary['elapsed_seconds']}s\n"
+        f"Throughput: {summary['books_per_hour']} books/hour, "
+        f"{summary['pages_per_hour']} pages/hour"
+    )
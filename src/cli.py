@@ -1,42 +1,171 @@
 """Command-line interface for LawBooks."""
 
 import argparse
-import importlib.util
+import json
 import logging
+import os
+import sys
+import time
 from pathlib import Path
+from typing import List, Optional, TextIO
 
-from src import batch_folder
-from src.config import load_config
+from src import batch_folder, daemon, metrics, planning, runner
+from src.config import AppConfig, load_config
 from src.log import configure_logging
-from src.ocr_chunks import ocr_pdf_in_chunks
+from src.inprocess_ocr import InprocessOcrPool
+from src.ocr_chunks import (
+    RetryPolicy,
+    chunk_sidecars,
+    ocr_pdf_in_chunks,
+    share_inprocess_pool,
+)
+from src.page_store import PageStore, pack_text_files
+from src.profiles import DEFAULT_PROFILE, PROFILES
+from src.search_index import SearchIndex
+from src.staging import STAGING_STRATEGIES
+from src.text_extract import extract_text
 
 
-def _require_pypdf() -> type:
-    if importlib.util.find_spec("pypdf") is None:
-        raise RuntimeError(
-            "Missing dependency 'pypdf'. Install with `pip install -r requirements.txt`."
-        )
-    from pypdf import PdfReader
-
-    return PdfReader
+def _extract_text_one(pdf_path: Path, output_folder: Path, jobs: int = 1) -> Path:
+    output_path = output_folder / "output_text" / f"{pdf_path.stem}.txt"
+    # A merged PDF in an ocr-one output folder has its chunks' OCR text beside it.
+    return extract_text(pdf_path, output_path, jobs=jobs, sidecars=chunk_sidecars(pdf_path))
 
 
-def _extract_text_one(pdf_path: Path, output_folder: Path) -> Path:
-    PdfReader = _require_pypdf()
-
-    output_text_dir = output_folder / "output_text"
-    output_text_dir.mkdir(parents=True, exist_ok=True)
-    output_path = output_text_dir / f"{pdf_path.stem}.txt"
+def _add_execution_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="Number of chunks to OCR concurrently"
+    )
+    parser.add_argument(
+        "--cpus",
+        type=int,
+        default=None,
+        help="CPUs to divide between concurrent chunks (default: all available)",
+    )
+    parser.add_argument(
+        "--lookahead",
+        type=int,
+        default=2,
+        help="Chunk inputs to split ahead of the OCR workers (default: 2)",
+    )
+    parser.add_argument(
+        "--ocr-backend",
+        choices=("auto", "docker", "local", "inprocess"),
+        default="auto",
+        help="OCR backend to use (default: auto)",
+    )
+    parser.add_argument(
+        "--staging",
+        choices=STAGING_STRATEGIES,
+        default="auto",
+        help="How to stage the source PDF into the workdir (default: auto)",
+    )
+    parser.add_argument(
+        "--docker-pool",
+        action="store_true",
+        help="Reuse one long-lived container per job instead of one per chunk",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Shared OCR result cache folder (default: OCR_CACHE_FOLDER)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=10240,
+        help="Evict least recently used cache entries above this size",
+    )
+    parser.add_argument(
+        "--scratch-dir",
+        help="Folder for transient chunk inputs, e.g. /dev/shm (default: SCRATCH_FOLDER)",
+    )
+    parser.add_argument(
+        "--scratch-reserve-mb",
+        type=int,
+        default=256,
+        help="Free space to leave in the scratch folder (default: 256)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help="Times to retry a failed chunk, with exponential backoff (default: 0)",
+    )
+    parser.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=5.0,
+        help="Seconds to wait before the first retry; doubles each time",
+    )
+    parser.add_argument(
+        "--chunk-timeout",
+        type=float,
+        default=None,
+        help="Fixed part of a chunk's time limit in seconds (default: no limit)",
+    )
+    parser.add_argument(
+        "--chunk-timeout-per-page",
+        type=float,
+        default=None,
+        help="Seconds per page added to a chunk's time limit (default: none)",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between progress reports with pages/s and ETA; 0 turns them off",
+    )
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="OCR every other chunk of a book after one fails, then report all failures",
+    )
 
-    reader = PdfReader(str(pdf_path))
-    lines: list[str] = []
-    for index, page in enumerate(reader.pages, start=1):
-        lines.append(f"===== PAGE {index:04d} =====")
-        text = page.extract_text() or ""
-        lines.append(text)
 
-    output_path.write_text("\n".join(lines), encoding="utf-8")
-    return output_path
+def _add_ocr_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--chunk-size", type=int, default=25, help="Pages per OCR chunk"
+    )
+    parser.add_argument("--lang", default="eng", help="OCR language")
+    parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help=f"Speed/quality trade-off of the OCR options (default: {DEFAULT_PROFILE})",
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Enable OCRmyPDF cleaning (requires unpaper).",
+    )
+    parser.add_argument(
+        "--chunking",
+        choices=["fixed", "cost"],
+        default="fixed",
+        help="Cut chunks by page count, or by estimated OCR cost per page",
+    )
+    parser.add_argument(
+        "--min-chunk-pages",
+        type=int,
+        default=1,
+        help="Fewest pages per chunk with --chunking cost",
+    )
+    parser.add_argument(
+        "--max-chunk-pages",
+        type=int,
+        default=None,
+        help="Most pages per chunk with --chunking cost (default: twice --chunk-size)",
+    )
+    parser.add_argument(
+        "--no-prescan",
+        dest="prescan",
+        action="store_false",
+        help="OCR every page instead of skipping pages with a text layer",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Re-run OCR even if chunk exists"
+    )
+    _add_execution_options(parser)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -50,6 +179,73 @@ def build_parser() -> argparse.ArgumentParser:
     process_parser.add_argument("--input-folder", required=False)
     process_parser.add_argument("--output-folder", required=False)
     process_parser.add_argument("--run-id", required=False)
+    process_parser.add_argument(
+        "--run",
+        action="store_true",
+        help="OCR and extract text for every book instead of only preparing",
+    )
+    _add_ocr_options(process_parser)
+    process_parser.add_argument(
+        "--prometheus",
+        help="After --run, write run metrics to this Prometheus textfile",
+    )
+
+    watch_parser = subparsers.add_parser(
+        "watch",
+        help="Process PDFs as they arrive in the input folder.",
+    )
+    watch_parser.add_argument("--input-folder", required=False)
+    watch_parser.add_argument("--output-folder", required=False)
+    watch_parser.add_argument(
+        "--run-id", default="watch", help="Run folder to queue books into (default: watch)"
+    )
+    watch_parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        default=10.0,
+        help="Queue a PDF once its size and mtime are unchanged for this long",
+    )
+    watch_parser.add_argument(
+        "--poll-interval", type=float, default=2.0, help="Seconds between checks"
+    )
+    watch_parser.add_argument(
+        "--rescan-minutes",
+        type=float,
+        default=10.0,
+        help="When polling, list the whole folder at least this often",
+    )
+    watch_parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll even where inotify is available (e.g. network shares)",
+    )
+    _add_ocr_options(watch_parser)
+
+    work_parser = subparsers.add_parser(
+        "work",
+        help="Process a run together with workers on other hosts sharing the runs folder.",
+    )
+    work_parser.add_argument("--input-folder", required=False)
+    work_parser.add_argument("--output-folder", required=False)
+    work_parser.add_argument(
+        "--run-id", required=True, help="Run folder that every worker shares"
+    )
+    work_parser.add_argument(
+        "--worker-id", help="Name recorded in lease files (default: <host>-<pid>)"
+    )
+    work_parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=120.0,
+        help="Take over books whose worker has not renewed its lease for this long",
+    )
+    work_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=10.0,
+        help="Seconds between checks for expired leases once no book is free",
+    )
+    _add_ocr_options(work_parser)
 
     ocr_parser = subparsers.add_parser(
         "ocr-one",
@@ -67,27 +263,26 @@ def build_parser() -> argparse.ArgumentParser:
         required=True,
         help="Output folder for OCR runs",
     )
+    _add_ocr_options(ocr_parser)
     ocr_parser.add_argument(
-        "--chunk-size", type=int, default=25, help="Pages per OCR chunk"
-    )
-    ocr_parser.add_argument("--lang", default="eng", help="OCR language")
-    ocr_parser.add_argument(
-        "--clean",
-        action="store_true",
-        help="Enable OCRmyPDF cleaning (requires unpaper).",
+        "--dry-run", action="store_true", help="Print docker commands without running"
     )
     ocr_parser.add_argument(
-        "--ocr-backend",
-        choices=("auto", "docker", "local"),
-        default="auto",
-        help="OCR backend to use (default: auto)",
+        "--no-merge",
+        dest="merge",
+        action="store_false",
+        help="Leave OCR'd chunks unmerged",
     )
-    ocr_parser.add_argument(
-        "--dry-run", action="store_true", help="Print docker commands without running"
+
+    retry_parser = subparsers.add_parser(
+        "retry-failed",
+        help="Re-run only the failed chunks of a run folder or ocr-one folder.",
     )
-    ocr_parser.add_argument(
-        "--force", action="store_true", help="Re-run OCR even if chunk exists"
+    retry_parser.add_argument("path", help="Run folder (runs/<run-id>) or book folder")
+    retry_parser.add_argument(
+        "--output-folder", help="Text output folder, for a run folder"
     )
+    _add_execution_options(retry_parser)
 
     extract_parser = subparsers.add_parser(
         "extract-text-one",
@@ -95,46 +290,377 @@ def build_parser() -> argparse.ArgumentParser:
     )
     extract_parser.add_argument("--pdf-path", required=True)
     extract_parser.add_argument("--output-folder", required=True)
+    extract_parser.add_argument(
+        "--jobs", type=int, default=1, help="Processes extracting page ranges"
+    )
+
+    extract_folder_parser = subparsers.add_parser(
+        "extract-text-folder",
+        help="Extract text from every PDF in a folder.",
+    )
+    extract_folder_parser.add_argument("--input-folder", required=False)
+    extract_folder_parser.add_argument("--output-folder", required=False)
+    extract_folder_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes extracting page ranges (default: one per CPU)",
+    )
+    extract_folder_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-extract books whose text is newer than the PDF",
+    )
+    extract_folder_parser.add_argument(
+        "--page-store",
+        help="Also pack every book's text into this page store file",
+    )
+    extract_folder_parser.add_argument(
+        "--compress", action="store_true", help="zlib-compress pages in the page store"
+    )
+
+    pack_parser = subparsers.add_parser(
+        "pack-pages",
+        help="Pack extracted .txt files into one page store.",
+    )
+    pack_parser.add_argument(
+        "--text", nargs="+", required=True, help="Text files or folders of .txt files"
+    )
+    pack_parser.add_argument("--output", required=True, help="Page store to write")
+    pack_parser.add_argument(
+        "--compress", action="store_true", help="zlib-compress pages"
+    )
+
+    page_parser = subparsers.add_parser(
+        "get-page",
+        help="Print one page of text from a page store.",
+    )
+    page_parser.add_argument("--store", required=True)
+    page_parser.add_argument("--book", help="Book name (file stem); optional for one-book stores")
+    page_parser.add_argument("--page", type=int, required=True, help="1-based page number")
+
+    index_parser = subparsers.add_parser(
+        "index",
+        help="Build or update the search index from extracted text.",
+    )
+    index_parser.add_argument("--output-folder", required=False)
+    index_parser.add_argument(
+        "--text",
+        nargs="+",
+        help="Text files or folders of .txt files (default: <output-folder>/output_text)",
+    )
+    index_parser.add_argument(
+        "--index", help="Index file (default: <output-folder>/search_index.sqlite)"
+    )
+
+    search_parser = subparsers.add_parser(
+        "search",
+        help="Search the index for pages matching a query.",
+    )
+    search_parser.add_argument(
+        "query", help='Words, citations such as "s. 12(3)", and "quoted phrases"'
+    )
+    search_parser.add_argument("--output-folder", required=False)
+    search_parser.add_argument(
+        "--index", help="Index file (default: <output-folder>/search_index.sqlite)"
+    )
+    search_parser.add_argument("--limit", type=int, default=20)
+
+    plan_parser = subparsers.add_parser(
+        "plan",
+        help="Count pages and estimate the wall time and book order of a run.",
+    )
+    plan_parser.add_argument("--input-folder", required=False)
+    plan_parser.add_argument(
+        "--jobs", type=int, default=1, help="Chunks the run will OCR concurrently"
+    )
+    plan_parser.add_argument(
+        "--chunk-size", type=int, default=25, help="Pages per OCR chunk"
+    )
+    plan_parser.add_argument(
+        "--profile",
+        choices=list(PROFILES),
+        default=DEFAULT_PROFILE,
+        help="Speed profile whose earlier OCR timings to use",
+    )
+    plan_parser.add_argument(
+        "--no-prescan",
+        dest="prescan",
+        action="store_false",
+        help="Assume every page is OCR'd rather than the share earlier prescans found",
+    )
+    plan_parser.add_argument(
+        "--scan-jobs",
+        type=int,
+        default=planning.DEFAULT_SCAN_JOBS,
+        help="PDFs to read page counts from at the same time",
+    )
+    plan_parser.add_argument("--top", type=int, default=None, help="Books of the order to list")
+    plan_parser.add_argument("--json", action="store_true", help="Print the plan as JSON")
+
+    stats_parser = subparsers.add_parser(
+        "stats",
+        help="Summarize timings of a run folder or an ocr-one output folder.",
+    )
+    stats_parser.add_argument("path", help="Run folder (runs/<run-id>) or book folder")
+    stats_parser.add_argument("--top", type=int, default=10, help="Slowest chunks to list")
+    stats_parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    stats_parser.add_argument(
+        "--prometheus", help="Also write the summary to this Prometheus textfile"
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run a job server that keeps the tools warm between jobs.",
+    )
+    serve_parser.add_argument("--host", default=daemon.DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=daemon.DEFAULT_PORT)
+    serve_parser.add_argument(
+        "--workers", type=int, default=2, help="Jobs to run at the same time"
+    )
+    serve_parser.add_argument(
+        "--ocr-workers",
+        type=int,
+        default=2,
+        help="In-process OCR workers shared by all jobs (0 starts a pool per job)",
+    )
+    serve_parser.add_argument(
+        "--keep-jobs",
+        type=int,
+        default=daemon.DEFAULT_KEEP_JOBS,
+        help="Finished jobs whose state and events are kept for clients",
+    )
+
+    submit_parser = subparsers.add_parser(
+        "submit",
+        help="Send a command to a running job server and stream its progress.",
+    )
+    submit_parser.add_argument(
+        "--url", default=f"http://{daemon.DEFAULT_HOST}:{daemon.DEFAULT_PORT}"
+    )
+    submit_parser.add_argument(
+        "--no-wait", action="store_true", help="Print the job id and return at once"
+    )
+    submit_parser.add_argument(
+        "job",
+        nargs=argparse.REMAINDER,
+        help=f"The command to run, e.g. -- ocr-one ... ({', '.join(daemon.JOB_COMMANDS)})",
+    )
 
     return parser
 
 
-def main() -> int:
-    configure_logging()
-    parser = build_parser()
-    args = parser.parse_args()
+def _text_paths(values: List[str]) -> List[Path]:
+    text_paths: List[Path] = []
+    for value in values:
+        path = Path(value)
+        text_paths.extend(sorted(path.glob("*.txt")) if path.is_dir() else [path])
+    return text_paths
+
+
+def _index_path(args: argparse.Namespace) -> Path:
+    if args.index:
+        return Path(args.index)
+    return load_config(output_folder=args.output_folder).output_folder / "search_index.sqlite"
+
+
+def _retry_policy(args: argparse.Namespace) -> RetryPolicy:
+    return RetryPolicy(
+        attempts=args.retries + 1,
+        backoff_seconds=args.retry_backoff,
+        timeout_seconds=args.chunk_timeout,
+        timeout_per_page=args.chunk_timeout_per_page,
+    )
+
+
+def _execution_options(args: argparse.Namespace, config: AppConfig) -> dict:
+    """Keyword arguments shared by :func:`batch_folder.run_books` and
+    :func:`ocr_pdf_in_chunks` that do not change the chunk plan."""
+    return {
+        "jobs": args.jobs,
+        "cpus": args.cpus,
+        "lookahead": args.lookahead,
+        "backend": args.ocr_backend,
+        "reuse_containers": args.docker_pool,
+        "staging": args.staging,
+        "cache_dir": config.ocr_cache_folder,
+        "cache_max_bytes": args.cache_max_mb * 1024 * 1024,
+        "retry": _retry_policy(args),
+        "keep_going": args.keep_going,
+        "scratch_dir": config.scratch_folder,
+        "scratch_reserve_bytes": args.scratch_reserve_mb * 1024 * 1024,
+        "progress_interval": args.progress_interval,
+    }
+
+
+def _run_options(args: argparse.Namespace, config: AppConfig) -> dict:
+    """Keyword arguments for :func:`batch_folder.run_books` from OCR options."""
+    return {
+        "output_folder": config.output_folder,
+        "chunk_size": args.chunk_size,
+        "lang": args.lang,
+        "clean": args.clean,
+        "profile": args.profile,
+        "force": args.force,
+        "prescan": args.prescan,
+        "chunking": args.chunking,
+        "min_chunk_pages": args.min_chunk_pages,
+        "max_chunk_pages": args.max_chunk_pages,
+        **_execution_options(args, config),
+    }
+
+
+def _warm() -> None:
+    """Load what every job needs once, before the server takes jobs."""
+    import pypdf
+
+    load_config()
+    logging.getLogger(__name__).info(
+        "pypdf %s; docker %s, local ocrmypdf %s",
+        pypdf.__version__,
+        "found" if runner.docker_available() else "not found",
+        "ready" if runner.local_ocrmypdf_ready() else "not ready",
+    )
+
+
+def run(args: argparse.Namespace, out: Optional[TextIO] = None) -> int:
+    """Run a parsed command, printing its results to ``out`` (default stdout)."""
+    out = out or sys.stdout
 
     if args.command == "process-folder":
-        config = load_config(args.input_folder, args.output_folder)
+        config = load_config(
+            args.input_folder,
+            args.output_folder,
+            ocr_cache_folder=args.cache_dir,
+            scratch_folder=args.scratch_dir,
+        )
         run_path = batch_folder.prepare_books(
             input_folder=config.input_folder,
             runs_folder=config.runs_folder,
             run_id=args.run_id,
         )
         logging.getLogger(__name__).info("Prepared run at %s", run_path)
+        if not args.run:
+            return 0
+        try:
+            summary = batch_folder.run_books(run_path=run_path, **_run_options(args, config))
+        except RuntimeError as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
+        print(batch_folder.format_summary(summary), file=out)
+        if args.prometheus:
+            run_stats = metrics.summarize(metrics.load_statuses(run_path))
+            metrics.write_prometheus(run_stats, Path(args.prometheus), run=run_path.name)
+        return 1 if summary["books_failed"] else 0
+
+    if args.command == "watch":
+        config = load_config(
+            args.input_folder,
+            args.output_folder,
+            ocr_cache_folder=args.cache_dir,
+            scratch_folder=args.scratch_dir,
+        )
+        try:
+            batch_folder.watch_folder(
+                input_folder=config.input_folder,
+                runs_folder=config.runs_folder,
+                run_id=args.run_id,
+                settle_seconds=args.settle_seconds,
+                poll_interval=args.poll_interval,
+                rescan_interval=args.rescan_minutes * 60,
+                use_inotify=not args.poll,
+                **_run_options(args, config),
+            )
+        except (RuntimeError, ValueError) as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
         return 0
 
+    if args.command == "work":
+        config = load_config(
+            args.input_folder,
+            args.output_folder,
+            ocr_cache_folder=args.cache_dir,
+            scratch_folder=args.scratch_dir,
+        )
+        try:
+            summary = batch_folder.run_worker(
+                input_folder=config.input_folder,
+                runs_folder=config.runs_folder,
+                run_id=args.run_id,
+                worker_id=args.worker_id,
+                lease_seconds=args.lease_seconds,
+                poll_interval=args.poll_interval,
+                **_run_options(args, config),
+            )
+        except (RuntimeError, ValueError) as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
+        print(batch_folder.format_summary(summary), file=out)
+        return 1 if summary["books_failed"] else 0
+
     if args.command == "ocr-one":
+        config = load_config(ocr_cache_folder=args.cache_dir, scratch_folder=args.scratch_dir)
         try:
             ocr_pdf_in_chunks(
                 input_pdf=args.pdf_path,
                 workdir=str(Path(args.output_folder)),
                 chunk_size=args.chunk_size,
+                jobs=args.jobs,
+                cpus=args.cpus,
+                lookahead=args.lookahead,
                 lang=args.lang,
                 clean=args.clean,
+                profile=args.profile,
                 dry_run=args.dry_run,
                 force=args.force,
                 backend=args.ocr_backend,
+                reuse_containers=args.docker_pool,
+                staging=args.staging,
+                merge=args.merge,
+                cache_dir=config.ocr_cache_folder,
+                cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+                prescan=args.prescan,
+                chunking=args.chunking,
+                min_chunk_pages=args.min_chunk_pages,
+                max_chunk_pages=args.max_chunk_pages,
+                retry=_retry_policy(args),
+                keep_going=args.keep_going,
+                scratch_dir=config.scratch_folder,
+                scratch_reserve_bytes=args.scratch_reserve_mb * 1024 * 1024,
+                progress_interval=args.progress_interval,
             )
-        except RuntimeError as exc:
+        except (RuntimeError, TimeoutError, ValueError) as exc:
             logging.getLogger(__name__).error(str(exc))
             return 1
         return 0
 
+    if args.command == "retry-failed":
+        config = load_config(
+            output_folder=args.output_folder,
+            ocr_cache_folder=args.cache_dir,
+            scratch_folder=args.scratch_dir,
+        )
+        try:
+            summary = batch_folder.retry_failed(
+                Path(args.path),
+                output_folder=config.output_folder,
+                **_execution_options(args, config),
+            )
+        except (RuntimeError, ValueError) as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
+        print(
+            f"Retried {summary['books_retried']} book(s); "
+            f"{summary['books_failed']} still failed",
+            file=out,
+        )
+        return 1 if summary["books_failed"] else 0
+
     if args.command == "extract-text-one":
         try:
             output_path = _extract_text_one(
-                Path(args.pdf_path), Path(args.output_folder)
+                Path(args.pdf_path), Path(args.output_folder), jobs=args.jobs
             )
         except RuntimeError as exc:
             logging.getLogger(__name__).error(str(exc))
@@ -142,9 +668,161 @@ def main() -> int:
         logging.getLogger(__name__).info("Wrote text to %s", output_path)
         return 0
 
-    parser.print_help()
+    if args.command == "extract-text-folder":
+        config = load_config(args.input_folder, args.output_folder)
+        try:
+            summary = batch_folder.extract_text_folder(
+                input_folder=config.input_folder,
+                output_folder=config.output_folder,
+                jobs=args.jobs,
+                force=args.force,
+                page_store=Path(args.page_store) if args.page_store else None,
+                compress=args.compress,
+            )
+        except RuntimeError as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
+        print(
+            f"Books: {summary['books_completed']} extracted, "
+            f"{summary['books_failed']} failed, "
+            f"{summary['books_skipped']} up to date "
+            f"(of {summary['books_total']}) in {summary['elapsed_seconds']}s",
+            file=out,
+        )
+        return 1 if summary["books_failed"] else 0
+
+    if args.command == "pack-pages":
+        try:
+            pack_text_files(_text_paths(args.text), Path(args.output), compress=args.compress)
+        except (OSError, ValueError) as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
+        return 0
+
+    if args.command == "get-page":
+        try:
+            with PageStore(Path(args.store)) as store:
+                text = store.get_page(args.page, args.book)
+        except (OSError, ValueError, KeyError, IndexError) as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
+        print(text, file=out)
+        return 0
+
+    if args.command == "index":
+        config = load_config(output_folder=args.output_folder)
+        text_paths = _text_paths(args.text or [str(config.output_folder / "output_text")])
+        with SearchIndex(_index_path(args)) as index:
+            counts = index.update(text_paths, prune=not args.text)
+        print(
+            f"Index: {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['removed']} removed, {counts['unchanged']} unchanged",
+            file=out,
+        )
+        return 0
+
+    if args.command == "search":
+        index_path = _index_path(args)
+        if not index_path.exists():
+            logging.getLogger(__name__).error(
+                "No index at %s; run the index command first.", index_path
+            )
+            return 1
+        started = time.perf_counter()
+        with SearchIndex(index_path) as index:
+            hits = index.search(args.query, limit=args.limit)
+        for hit in hits:
+            print(f"{hit.book}\tpage {hit.page}\t{hit.score}", file=out)
+        logging.getLogger(__name__).info(
+            "%s hit(s) in %.1f ms", len(hits), (time.perf_counter() - started) * 1000
+        )
+        return 0 if hits else 1
+
+    if args.command == "plan":
+        config = load_config(args.input_folder)
+        if not config.input_folder.is_dir():
+            logging.getLogger(__name__).error("%s is not a folder.", config.input_folder)
+            return 1
+        try:
+            plan = planning.plan_library(
+                input_folder=config.input_folder,
+                runs_folder=config.runs_folder,
+                jobs=args.jobs,
+                chunk_size=args.chunk_size,
+                profile=args.profile,
+                prescan=args.prescan,
+                scan_jobs=args.scan_jobs,
+            )
+        except ValueError as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
+        if args.json:
+            print(json.dumps(plan, indent=2), file=out)
+        else:
+            print(planning.format_plan(plan, top=args.top), file=out)
+        return 0
+
+    if args.command == "stats":
+        path = Path(args.path)
+        if not path.is_dir():
+            logging.getLogger(__name__).error("%s is not a folder.", path)
+            return 1
+        summary = metrics.summarize(metrics.load_statuses(path), top=args.top)
+        if args.json:
+            print(json.dumps(summary, indent=2), file=out)
+        else:
+            print(metrics.format_stats(summary), file=out)
+        if args.prometheus:
+            metrics.write_prometheus(summary, Path(args.prometheus), run=path.resolve().name)
+        return 0
+
+    if args.command == "serve":
+        # Containers stay per job: their /data mount is the job's own folder.
+        pool = InprocessOcrPool(workers=args.ocr_workers) if args.ocr_workers > 0 else None
+        try:
+            if pool is not None:
+                try:
+                    pool.start()
+                    share_inprocess_pool(pool)
+                except runner.OcrmypdfNotFoundError:
+                    logging.getLogger(__name__).info(
+                        "ocrmypdf is not importable; inprocess jobs start their own workers"
+                    )
+                    pool = None
+            daemon.serve(
+                build_parser(),
+                run,
+                host=args.host,
+                port=args.port,
+                workers=args.workers,
+                warm=_warm,
+                keep_jobs=args.keep_jobs,
+            )
+        except (OSError, ValueError) as exc:
+            logging.getLogger(__name__).error(str(exc))
+            return 1
+        finally:
+            if pool is not None:
+                share_inprocess_pool(None)
+                pool.close()
+        return 0
+
+    if args.command == "submit":
+        argv = args.job[1:] if args.job[:1] == ["--"] else args.job
+        return daemon.submit(args.url, argv, wait=not args.no_wait)
+
+    logging.getLogger(__name__).error("Unknown command %s", args.command)
     return 1
 
 
+def main() -> int:
+    configure_logging()
+    try:
+        return run(build_parser().parse_args())
+    except KeyboardInterrupt:
+        logging.getLogger(__name__).warning("Interrupted")
+        return 130
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -15,29 +15,47 @@ class AppConfig:
     input_folder: Path
     output_folder: Path
     runs_folder: Path
+    ocr_cache_folder: Optional[Path] = None
+    scratch_folder: Optional[Path] = None
 
 
 DEFAULT_RUNS_FOLDER = Path("runs")
 
+_dotenv_loaded = False
+
 
 def load_config(
     input_folder: Optional[str] = None,
     output_folder: Optional[str] = None,
     runs_folder: Optional[str] = None,
+    ocr_cache_folder: Optional[str] = None,
+    scratch_folder: Optional[str] = None,
 ) -> AppConfig:
-    """Load configuration from environment variables and defaults."""
-    load_dotenv()
+    """Load configuration from environment variables and defaults.
+
+    The ``.env`` file is read on the first call only.
+    """
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        load_dotenv()
+        _dotenv_loaded = True
 
     env_input = os.getenv("INPUT_FOLDER")
     env_output = os.getenv("OUTPUT_FOLDER")
     env_runs = os.getenv("RUNS_FOLDER")
+    env_cache = os.getenv("OCR_CACHE_FOLDER")
+    env_scratch = os.getenv("SCRATCH_FOLDER")
 
     input_value = input_folder or env_input or "input"
     output_value = output_folder or env_output or "output"
     runs_value = runs_folder or env_runs or str(DEFAULT_RUNS_FOLDER)
+    cache_value = ocr_cache_folder or env_cache
+    scratch_value = scratch_folder or env_scratch
 
     return AppConfig(
         input_folder=Path(input_value),
         output_folder=Path(output_value),
         runs_folder=Path(runs_value),
+        ocr_cache_folder=Path(cache_value) if cache_value else None,
+        scratch_folder=Path(scratch_value) if scratch_value else None,
     )
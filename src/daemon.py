@@ -0,0 +1,387 @@
+"""A long-running job server on localhost HTTP, and its thin client.
+
+Jobs are CLI command lines (``["ocr-one", "--input", ...]``) parsed with the
+CLI's own parser and run by a fixed pool of job workers inside one warm
+process: pypdf is imported once, the environment file is read once, and
+backend tool lookups are cached. Log records and output of a job are kept
+as events that clients stream as newline-delimited JSON. Jobs must be posted
+as ``application/json``, which browsers only send cross-origin after a CORS
+preflight that the server does not answer, so web pages cannot queue jobs.
+
+Endpoints::
+
+    POST /jobs               {"argv": [...]}  -> {"id": ...}
+    GET  /jobs               all jobs still kept
+    GET  /jobs/<id>          one job
+    GET  /jobs/<id>/events   the job's events, streamed until it finishes
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextvars
+import itertools
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, TextIO
+
+from . import runner
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_KEEP_JOBS = 100
+# CLI commands the server accepts as jobs.
+JOB_COMMANDS = ("ocr-one", "extract-text-one", "extract-text-folder", "process-folder")
+
+_current_job: contextvars.ContextVar[Optional["Job"]] = contextvars.ContextVar(
+    "current_job", default=None
+)
+_current_output: contextvars.ContextVar[Optional["_JobOutput"]] = contextvars.ContextVar(
+    "current_output", default=None
+)
+
+
+@dataclass
+class Job:
+    id: str
+    argv: List[str]
+    state: str = "queued"
+    exit_code: Optional[int] = None
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    progress: Optional[dict] = None
+    events: List[dict] = field(default_factory=list)
+    changed: threading.Condition = field(default_factory=threading.Condition)
+
+    @property
+    def done(self) -> bool:
+        return self.state in {"completed", "failed"}
+
+    def emit(self, **event: object) -> None:
+        with self.changed:
+            self.events.append({"time": round(time.time(), 3), **event})
+            self.changed.notify_all()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "argv": self.argv,
+            "state": self.state,
+            "exit_code": self.exit_code,
+            "error": self.error,
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "progress": self.progress,
+            "events": len(self.events),
+        }
+
+
+class _JobLogHandler(logging.Handler):
+    """Copies log records made on behalf of a job into its event list.
+
+    Progress reports (records with a ``progress`` snapshot, see
+    :class:`src.progress.ProgressTracker`) also become ``progress`` events and
+    the job's latest ``progress``.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        job = _current_job.get()
+        if job is not None:
+            job.emit(
+                type="log",
+                level=record.levelname,
+                logger=record.name,
+                message=record.getMessage(),
+            )
+            progress = getattr(record, "progress", None)
+            if progress is not None:
+                job.progress = progress
+                job.emit(type="progress", **progress)
+
+
+class _JobOutput:
+    """A text stream whose lines become ``output`` events of the current job."""
+
+    def __init__(self, job: Job) -> None:
+        self.job = job
+        self._buffer = ""
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        with self._lock:
+            self._buffer += text
+            *lines, self._buffer = self._buffer.split("\n")
+            for line in lines:
+                self.job.emit(type="output", text=line)
+        return len(text)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._buffer:
+                self.job.emit(type="output", text=self._buffer)
+                self._buffer = ""
+
+
+class _StdoutRouter:
+    """Stands in for ``sys.stdout`` while serving, so that text a job's code
+    prints directly (e.g. ``--dry-run`` commands) becomes that job's output
+    events rather than going to the server's own stdout."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def write(self, text: str) -> int:
+        output = _current_output.get()
+        return (output or self.stream).write(text)
+
+    def flush(self) -> None:
+        output = _current_output.get()
+        (output or self.stream).flush()
+
+    def __getattr__(self, name: str) -> object:
+        return getattr(self.stream, name)
+
+
+class JobServer:
+    """Queue of jobs run by ``workers`` threads through ``dispatch``.
+
+    Only the ``keep_jobs`` most recently finished jobs are kept, with their
+    events; older ones are forgotten so a long-running server stays small.
+    """
+
+    def __init__(
+        self,
+        parser: argparse.ArgumentParser,
+        dispatch: Callable[[argparse.Namespace, TextIO], int],
+        workers: int = 2,
+        keep_jobs: int = DEFAULT_KEEP_JOBS,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if keep_jobs < 0:
+            raise ValueError("keep_jobs must not be negative")
+        self.parser = parser
+        self.dispatch = dispatch
+        self.workers = workers
+        self.keep_jobs = keep_jobs
+        self.jobs: Dict[str, Job] = {}
+        self._queue: "queue.Queue[Job]" = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        logging.getLogger().addHandler(_JobLogHandler())
+        if not isinstance(sys.stdout, _StdoutRouter):
+            sys.stdout = _StdoutRouter(sys.stdout)
+        for number in range(self.workers):
+            threading.Thread(
+                target=self._work, name=f"job-worker-{number}", daemon=True
+            ).start()
+
+    def submit(self, argv: Sequence[str]) -> Job:
+        argv = [str(arg) for arg in argv]
+        if not argv or argv[0] not in JOB_COMMANDS:
+            raise ValueError(f"Jobs must be one of: {', '.join(JOB_COMMANDS)}.")
+        with self._lock:
+            job = Job(id=f"{next(self._ids)}-{int(time.time())}", argv=argv)
+            self.jobs[job.id] = job
+        job.emit(type="state", state="queued")
+        self._queue.put(job)
+        logger.info("Queued job %s: %s", job.id, " ".join(argv))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self.jobs.values())
+
+    def _forget_finished(self) -> None:
+        with self._lock:
+            finished = [job for job in self.jobs.values() if job.done]
+            for job in finished[: max(len(finished) - self.keep_jobs, 0)]:
+                del self.jobs[job.id]
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            _current_job.set(job)
+            job.state = "running"
+            job.started = time.time()
+            job.emit(type="state", state="running")
+            output = _JobOutput(job)
+            _current_output.set(output)
+            try:
+                job.exit_code = self.dispatch(self._parse(job.argv), output)
+            except ValueError as exc:
+                logger.error("Job %s failed: %s", job.id, exc)
+                job.error = str(exc)
+                job.exit_code = 1
+            except Exception as exc:
+                logger.exception("Job %s failed", job.id)
+                job.error = str(exc)
+                job.exit_code = 1
+            finally:
+                output.flush()
+                _current_job.set(None)
+                _current_output.set(None)
+            job.finished = time.time()
+            job.state = "completed" if job.exit_code == 0 else "failed"
+            job.emit(type="state", state=job.state, exit_code=job.exit_code, error=job.error)
+            self._forget_finished()
+
+    def _parse(self, argv: List[str]) -> argparse.Namespace:
+        try:
+            return self.parser.parse_args(argv)
+        except SystemExit:
+            # argparse has already printed the usage error to the server log.
+            raise ValueError(f"Invalid arguments: {' '.join(argv)}") from None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "LawBooks"
+    jobs: JobServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        logger.debug("%s %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        if self.path != "/jobs":
+            self._send_json(404, {"error": "not found"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._send_json(415, {"error": "jobs must be posted as application/json"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            job = self.jobs.submit(request.get("argv", []))
+        except (ValueError, AttributeError) as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        self._send_json(202, job.summary())
+
+    def do_GET(self) -> None:
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if parts == ["jobs"]:
+            self._send_json(200, [job.summary() for job in self.jobs.list()])
+            return
+        job = self.jobs.get(parts[1]) if len(parts) in (2, 3) and parts[0] == "jobs" else None
+        if job is None:
+            self._send_json(404, {"error": "not found"})
+            return
+        if len(parts) == 2:
+            self._send_json(200, job.summary())
+        elif parts[2] == "events":
+            self._stream_events(job)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _stream_events(self, job: Job) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        sent = 0
+        while True:
+            with job.changed:
+                while sent == len(job.events) and not job.done:
+                    job.changed.wait(timeout=1.0)
+                pending = job.events[sent:]
+                finished = job.done
+            for event in pending:
+                self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            sent += len(pending)
+            if finished and sent == len(job.events):
+                return
+
+
+def serve(
+    parser: argparse.ArgumentParser,
+    dispatch: Callable[[argparse.Namespace, TextIO], int],
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = 2,
+    warm: Optional[Callable[[], None]] = None,
+    keep_jobs: int = DEFAULT_KEEP_JOBS,
+) -> None:
+    """Serve jobs until interrupted; ``warm`` is called once before listening."""
+    runner.cache_tool_lookups(True)
+    if warm is not None:
+        warm()
+    jobs = JobServer(parser, dispatch, workers=workers, keep_jobs=keep_jobs)
+    jobs.start()
+    handler = type("Handler", (_Handler,), {"jobs": jobs})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    logger.info("Serving jobs on http://%s:%s with %s worker(s)", host, port, workers)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        httpd.server_close()
+
+
+def submit(url: str, argv: Sequence[str], wait: bool = True) -> int:
+    """Submit ``argv`` to the server at ``url`` and relay its events.
+
+    Log events go to stderr and output events to stdout. Returns the job's
+    exit code, or 0 once the job is queued when ``wait`` is False.
+    """
+    request = urllib.request.Request(
+        f"{url.rstrip('/')}/jobs",
+        data=json.dumps({"argv": list(argv)}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            job = json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        logger.error("Server rejected the job: %s", json.loads(exc.read()).get("error"))
+        return 1
+    except urllib.error.URLError as exc:
+        logger.error("Cannot reach the server at %s: %s", url, exc.reason)
+        return 1
+    if not wait:
+        print(job["id"])
+        return 0
+
+    exit_code = 1
+    with urllib.request.urlopen(f"{url.rstrip('/')}/jobs/{job['id']}/events") as events:
+        for line in events:
+            event = json.loads(line)
+            if event["type"] == "log":
+                print(
+                    f"{event['level']} | {event['logger']} | {event['message']}",
+                    file=sys.stderr,
+                )
+            elif event["type"] == "output":
+                print(event["text"])
+            elif event["type"] == "state" and event["state"] in {"completed", "failed"}:
+                exit_code = event["exit_code"]
+    return exit_code
@@ -0,0 +1,358 @@
+"""In-process OCRmyPDF backend built on long-lived worker processes."""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .profiles import DEFAULT_PROFILE, PROFILES, CpuLimits, OcrProfile
+from .runner import CommandCancelled, OcrmypdfNotFoundError, _resolve_optimize_level
+
+logger = logging.getLogger(__name__)
+
+WORKER_ENV_VAR = "LAWBOOKS_INPROCESS_WORKER"
+DEFAULT_WORKER = "src.inprocess_ocr:ocrmypdf_worker"
+# How often a waiting job checks for cancellation.
+_POLL_SECONDS = 0.2
+
+__all__ = [
+    "DEFAULT_WORKER",
+    "InprocessOcrPool",
+    "WORKER_ENV_VAR",
+    "ocrmypdf_importable",
+    "ocrmypdf_worker",
+]
+
+_worker_function: Optional[Callable[[str, str, Dict[str, Any]], None]] = None
+
+
+def ocrmypdf_importable() -> bool:
+    return importlib.util.find_spec("ocrmypdf") is not None
+
+
+def _load_entry_point(spec: str) -> Callable[[str, str, Dict[str, Any]], None]:
+    module_name, _, function_name = spec.partition(":")
+    if not module_name or not function_name:
+        raise ValueError(f"Worker entry point must look like 'module:function', got {spec!r}")
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+
+def _init_worker(entry_point: str) -> None:
+    global _worker_function
+    _worker_function = _load_entry_point(entry_point)
+    if entry_point == DEFAULT_WORKER:
+        try:
+            importlib.import_module("ocrmypdf")
+        except ImportError:
+            # Reported per job as OcrmypdfNotFoundError.
+            pass
+
+
+def ocrmypdf_worker(in_pdf: str, out_pdf: str, options: Dict[str, Any]) -> None:
+    """Default worker entry point: call ``ocrmypdf.ocr`` with ``options``."""
+    try:
+        import ocrmypdf
+    except ImportError as exc:
+        raise OcrmypdfNotFoundError(
+            "ocrmypdf is not importable. Install it with `pip install ocrmypdf` "
+            "or use the local/docker backend."
+        ) from exc
+
+    try:
+        exit_code = ocrmypdf.ocr(in_pdf, out_pdf, **options)
+    except Exception as exc:
+        # ocrmypdf exceptions may not survive pickling back to the parent.
+        raise RuntimeError(f"ocrmypdf failed: {type(exc).__name__}: {exc}") from None
+    if int(exit_code) != 0:
+        raise RuntimeError(f"ocrmypdf failed with exit code {int(exit_code)}.")
+
+
+def _run_job(
+    in_pdf: str, out_pdf: str, options: Dict[str, Any], env: Dict[str, str]
+) -> None:
+    assert _worker_function is not None, "worker process was not initialised"
+    # Tesseract is a subprocess of OCRmyPDF and inherits the worker's environment.
+    # The worker is reused, so the next job must not inherit this job's limits.
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        _worker_function(in_pdf, out_pdf, options)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _worker_main(connection: Any, entry_point: str) -> None:
+    """Run jobs received on ``connection`` until it closes or sends None."""
+    _init_worker(entry_point)
+    while True:
+        try:
+            job = connection.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        try:
+            _run_job(*job)
+            error: Optional[BaseException] = None
+        except Exception as exc:
+            error = exc
+        try:
+            connection.send(error)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            connection.send(RuntimeError(f"ocrmypdf failed: {type(error).__name__}: {error}"))
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe."""
+
+    def __init__(self, context: Any, entry_point: str) -> None:
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, entry_point),
+            name="inprocess-ocr",
+            # Killed with the parent; OCRmyPDF runs in threads (use_threads).
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.cancelled = False
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.kill()
+        self.connection.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+def build_ocr_options(
+    pages_range: Tuple[int, int],
+    lang: str,
+    clean: bool = False,
+    extra_options: Optional[Dict[str, Any]] = None,
+    profile: OcrProfile = PROFILES[DEFAULT_PROFILE],
+    cpu: Optional[CpuLimits] = None,
+    sidecar: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Keyword arguments for ``ocrmypdf.ocr`` matching the CLI runners' flags."""
+    start_page, end_page = pages_range
+    options: Dict[str, Any] = {
+        "skip_text": True,
+        "deskew": profile.deskew,
+        "optimize": _resolve_optimize_level(profile.optimize),
+        "language": lang.split("+"),
+        "pages": f"{start_page}-{end_page}",
+        "progress_bar": False,
+        "use_threads": True,
+    }
+    if profile.output_type is not None:
+        options["output_type"] = profile.output_type
+    if cpu is not None:
+        options["jobs"] = cpu.ocr_jobs
+    if clean:
+        options["clean"] = True
+    if sidecar is not None:
+        options["sidecar"] = sidecar
+    if extra_options:
+        options.update(extra_options)
+    return options
+
+
+class InprocessOcrPool:
+    """A pool of worker processes that each import OCRmyPDF once.
+
+    Workers are started with the ``spawn`` method (the parent runs threads) and
+    call the entry point named by ``entry_point``, the ``LAWBOOKS_INPROCESS_WORKER``
+    environment variable, or :func:`ocrmypdf_worker`. An entry point is any
+    ``module:function`` taking ``(in_pdf, out_pdf, options)``, which lets the
+    pool be benchmarked with a stub instead of real Tesseract.
+
+    Each job runs in a worker of its own. A job that times out or is
+    cancelled (see :meth:`run` and :meth:`cancel`) has its worker killed,
+    and a fresh worker takes its place for the next job. A job's time limit
+    starts once it has a worker, not while it waits for one.
+    """
+
+    def __init__(self, workers: int, entry_point: Optional[str] = None) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.entry_point = entry_point or os.getenv(WORKER_ENV_VAR) or DEFAULT_WORKER
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[_Worker] = []
+        self._busy: Set[_Worker] = set()
+        self._slots = threading.Semaphore(workers)
+        self._started = False
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "InprocessOcrPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start the workers, unless they are running already.
+
+        Raises :class:`~src.runner.OcrmypdfNotFoundError` if the default
+        entry point is used and OCRmyPDF is not importable. Dry runs never
+        call this.
+        """
+        with self._lock:
+            if self._started:
+                return
+            if self.entry_point == DEFAULT_WORKER and not ocrmypdf_importable():
+                raise OcrmypdfNotFoundError(
+                    "ocrmypdf is not importable. Install it with `pip install ocrmypdf` "
+                    "or use the local/docker backend."
+                )
+            self._started = True
+            self._idle = [_Worker(self._context, self.entry_point) for _ in range(self.workers)]
+        logger.info(
+            "Started %s in-process OCR worker(s) using %s", self.workers, self.entry_point
+        )
+
+    def close(self) -> None:
+        """Stop the idle workers and kill any still running a job."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            busy = list(self._busy)
+        for worker in busy:
+            worker.cancelled = True
+            worker.kill()
+        for worker in idle:
+            worker.stop()
+
+    def cancel(self) -> int:
+        """Kill the workers running jobs, whose :meth:`run` calls then raise
+        :class:`~src.runner.CommandCancelled`; returns how many were killed."""
+        with self._lock:
+            busy = list(self._busy)
+        for worker in busy:
+            worker.cancelled = True
+            worker.kill()
+        return len(busy)
+
+    def _checkout(self) -> _Worker:
+        self._slots.acquire()
+        try:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("In-process OCR pool is closed.")
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                # Replaces a worker killed after a timeout or cancellation.
+                worker = _Worker(self._context, self.entry_point)
+            with self._lock:
+                self._busy.add(worker)
+            return worker
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, worker: _Worker, healthy: bool) -> None:
+        with self._lock:
+            self._busy.discard(worker)
+            keep = healthy and not self._closed and not worker.cancelled
+            if keep:
+                self._idle.append(worker)
+        if not keep and worker.process.is_alive():
+            worker.kill()
+        self._slots.release()
+
+    def _wait(
+        self,
+        worker: _Worker,
+        timeout_sec: Optional[float],
+        cancelled: Optional[Callable[[], bool]],
+    ) -> Optional[BaseException]:
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        while True:
+            wait = _POLL_SECONDS
+            if deadline is not None:
+                wait = min(wait, max(deadline - time.monotonic(), 0.0))
+            try:
+                if worker.connection.poll(wait):
+                    return worker.connection.recv()
+            except (EOFError, OSError):
+                if worker.cancelled:
+                    raise CommandCancelled("ocrmypdf was cancelled.") from None
+                raise RuntimeError("ocrmypdf worker process died.") from None
+            if worker.cancelled or (cancelled is not None and cancelled()):
+                worker.cancelled = True
+                raise CommandCancelled("ocrmypdf was cancelled.")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("ocrmypdf timed out.")
+
+    def run(
+        self,
+        in_pdf: str,
+        out_pdf: str,
+        pages_range: Tuple[int, int],
+        lang: str,
+        clean: bool = False,
+        extra_options: Optional[Dict[str, Any]] = None,
+        timeout_sec: Optional[float] = None,
+        dry_run: bool = False,
+        profile: OcrProfile = PROFILES[DEFAULT_PROFILE],
+        cpu: Optional[CpuLimits] = None,
+        sidecar: Optional[str] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> str:
+        """OCR ``in_pdf`` into ``out_pdf`` in a worker process.
+
+        Raises ``TimeoutError`` after ``timeout_sec`` seconds, and
+        :class:`~src.runner.CommandCancelled` once ``cancelled()`` is true;
+        either way the worker is killed.
+        """
+        options = build_ocr_options(
+            pages_range, lang, clean, extra_options, profile, cpu, sidecar
+        )
+        display = f"ocrmypdf.ocr({str(in_pdf)!r}, {str(out_pdf)!r}, **{options!r})"
+        if dry_run:
+            print(f"DRY RUN: {display}")
+            return display
+
+        self.start()
+        worker = self._checkout()
+        healthy = False
+        job = (str(Path(in_pdf)), str(Path(out_pdf)), options, {} if cpu is None else cpu.env())
+        try:
+            try:
+                worker.connection.send(job)
+            except OSError as exc:
+                raise RuntimeError("ocrmypdf worker process died.") from exc
+            error = self._wait(worker, timeout_sec, cancelled)
+            healthy = True
+        finally:
+            self._checkin(worker, healthy)
+        if isinstance(error, RuntimeError):
+            raise error
+        if error is not None:
+            raise RuntimeError(f"ocrmypdf failed: {error}") from error
+        return display
@@ -0,0 +1,232 @@
+"""Expiring lease files that let workers on several hosts share a run folder."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 120.0
+FINISHED = ("completed", "failed")
+_GENERATION = re.compile(r"^(\d{8})\.json$")
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+@dataclass
+class Lease:
+    name: str
+    generation: int
+    path: Path
+    claimed_at: float
+    lost: bool = False
+    # Called from the renewal thread if another worker takes the item over.
+    on_lost: Optional[Callable[[], None]] = field(default=None, repr=False)
+
+
+class LeaseDirectory:
+    """Exclusive, expiring claims on named items, kept as files in ``folder``.
+
+    Each claim of an item is a new generation file ``<item>/<n>.json``. It is
+    written under a temporary name and hard-linked into place. The link fails
+    if another worker created that generation first, so exactly one claimant
+    wins on any filesystem with an atomic ``link(2)``, NFS included. The
+    newest generation is the item's lease. Its holder renews it every
+    ``ttl / 4`` seconds from a background thread (see :meth:`start`). A lease
+    not renewed for ``ttl`` seconds has expired, and the next claim takes the
+    item over. A holder that finds a newer generation than its own has lost
+    the item. Renewal times are wall-clock times, so the hosts' clocks must
+    agree to well within ``ttl``.
+
+    A released lease records an ``outcome``. Items whose last outcome is
+    ``completed`` or ``failed`` are not claimed again. Items released
+    without one, for example by an interrupted worker, are free.
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        owner: Optional[str] = None,
+        ttl: float = DEFAULT_LEASE_SECONDS,
+    ) -> None:
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.folder = Path(folder)
+        self.owner = owner or default_owner()
+        self.ttl = ttl
+        self.held: Dict[str, Lease] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "LeaseDirectory":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _generations(self, name: str) -> List[int]:
+        try:
+            entries = os.listdir(self.folder / name)
+        except FileNotFoundError:
+            return []
+        matches = (_GENERATION.match(entry) for entry in entries)
+        return sorted(int(match.group(1)) for match in matches if match)
+
+    def _path(self, name: str, generation: int) -> Path:
+        return self.folder / name / f"{generation:08d}.json"
+
+    def current(self, name: str) -> Optional[Tuple[int, dict]]:
+        """The newest generation of ``name``'s lease and its record, if any."""
+        # A new holder prunes older generations, possibly while we list them.
+        for _ in range(3):
+            generations = self._generations(name)
+            if not generations:
+                return None
+            try:
+                text = self._path(name, generations[-1]).read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            return generations[-1], json.loads(text)
+        return None
+
+    @staticmethod
+    def _state(record: dict) -> str:
+        if record["state"] == "held":
+            expired = time.time() - record["renewed_at"] > record["ttl"]
+            return "expired" if expired else "held"
+        return record.get("outcome") or "free"
+
+    def state(self, name: str) -> str:
+        """``free``, ``held``, ``expired``, ``completed`` or ``failed``."""
+        current = self.current(name)
+        return "free" if current is None else self._state(current[1])
+
+    def claim(self, name: str) -> Optional[Lease]:
+        """Take the lease on ``name`` if it is free or expired; None otherwise."""
+        generation = 0
+        current = self.current(name)
+        if current is not None:
+            generation, record = current
+            state = self._state(record)
+            if state == "held" or state in FINISHED:
+                return None
+            if state == "expired":
+                logger.warning(
+                    "Lease of %s held by %s expired; taking it over", name, record["owner"]
+                )
+        lease = Lease(
+            name=name,
+            generation=generation + 1,
+            path=self._path(name, generation + 1),
+            claimed_at=time.time(),
+        )
+        if not self._write(lease, "held", exclusive=True):
+            return None
+        with self._lock:
+            self.held[name] = lease
+        for old in range(1, lease.generation):
+            try:
+                self._path(name, old).unlink()
+            except FileNotFoundError:
+                pass
+        return lease
+
+    def _write(
+        self, lease: Lease, state: str, outcome: Optional[str] = None, exclusive: bool = False
+    ) -> bool:
+        record = {
+            "owner": self.owner,
+            "generation": lease.generation,
+            "state": state,
+            "outcome": outcome,
+            "ttl": self.ttl,
+            "claimed_at": lease.claimed_at,
+            "renewed_at": time.time(),
+        }
+        lease.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = lease.path.with_name(f".{lease.path.stem}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_text(json.dumps(record, sort_keys=True), encoding="utf-8")
+        try:
+            if not exclusive:
+                os.replace(tmp_path, lease.path)
+                return True
+            try:
+                os.link(tmp_path, lease.path)
+            except FileExistsError:
+                return False
+            return True
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def _superseded(self, lease: Lease) -> bool:
+        generations = self._generations(lease.name)
+        return bool(generations) and generations[-1] > lease.generation
+
+    def renew(self) -> None:
+        """Renew every held lease, dropping those another worker took over."""
+        with self._lock:
+            leases = list(self.held.values())
+        for lease in leases:
+            try:
+                if self._superseded(lease):
+                    lease.lost = True
+                    with self._lock:
+                        self.held.pop(lease.name, None)
+                    logger.error("Lost the lease of %s to another worker", lease.name)
+                    if lease.on_lost is not None:
+                        lease.on_lost()
+                    continue
+                self._write(lease, "held")
+            except OSError as exc:
+                logger.warning("Could not renew the lease of %s: %s", lease.name, exc)
+
+    def release(self, lease: Lease, outcome: Optional[str] = None) -> bool:
+        """Give up ``lease``, recording ``outcome``; False if it was lost."""
+        with self._lock:
+            self.held.pop(lease.name, None)
+        if lease.lost or self._superseded(lease):
+            logger.error(
+                "Lease of %s was taken over; not recording outcome %s", lease.name, outcome
+            )
+            return False
+        self._write(lease, "released", outcome)
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._renew_until_stopped, name="lease-renewal", daemon=True
+        )
+        self._thread.start()
+
+    def _renew_until_stopped(self) -> None:
+        while not self._stop.wait(self.ttl / 4):
+            self.renew()
+
+    def close(self) -> None:
+        """Stop renewing and release every lease still held, without an outcome."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            leases = list(self.held.values())
+        for lease in leases:
+            self.release(lease)
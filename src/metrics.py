@@ -0,0 +1,287 @@
+"""Timing and resource spans for pipeline stages, and run statistics."""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .status_store import StatusStore
+
+try:
+    import resource
+except ImportError:  # Windows: no getrusage; CPU and RSS are left at zero.
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+@dataclass
+class Span:
+    """Resources used by one stage of work.
+
+    ``cpu_seconds`` is the CPU time of the thread running the span and
+    ``child_cpu_seconds`` that of subprocesses it ran. ``peak_rss_bytes`` is
+    the larger of this process's peak RSS and the peak of those subprocesses.
+    """
+
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    child_cpu_seconds: float = 0.0
+    peak_rss_bytes: int = 0
+    pages: int = 0
+    bytes: int = 0
+
+    def add(self, pages: int = 0, bytes: int = 0) -> None:
+        self.pages += pages
+        self.bytes += bytes
+
+    def add_child_usage(self, usage: object) -> None:
+        self.child_cpu_seconds += usage.ru_utime + usage.ru_stime
+        self.peak_rss_bytes = max(self.peak_rss_bytes, _rss_bytes(usage.ru_maxrss))
+
+    def as_dict(self) -> dict:
+        record = asdict(self)
+        del record["name"]
+        for key in ("wall_seconds", "cpu_seconds", "child_cpu_seconds"):
+            record[key] = round(record[key], 4)
+        return record
+
+
+def _rss_bytes(maxrss: int) -> int:
+    # ru_maxrss is in kilobytes, except on macOS.
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _stack() -> List[Span]:
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def span(name: str, pages: int = 0, bytes: int = 0) -> Iterator[Span]:
+    """Measure the block; code inside may add to it via :func:`count`."""
+    record = Span(name, pages=pages, bytes=bytes)
+    stack = _stack()
+    stack.append(record)
+    wall_started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        yield record
+    finally:
+        record.wall_seconds = time.perf_counter() - wall_started
+        record.cpu_seconds = time.thread_time() - cpu_started
+        if resource is not None:
+            own_peak = _rss_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+            record.peak_rss_bytes = max(record.peak_rss_bytes, own_peak)
+        stack.pop()
+        logger.debug("%s: %s", name, record.as_dict())
+
+
+def current_span() -> Optional[Span]:
+    stack = _stack()
+    return stack[-1] if stack else None
+
+
+def count(pages: int = 0, bytes: int = 0) -> None:
+    """Add pages and bytes processed to the innermost span of this thread."""
+    record = current_span()
+    if record is not None:
+        record.add(pages=pages, bytes=bytes)
+
+
+# --- Run statistics -------------------------------------------------------
+
+
+def load_statuses(path: Path) -> List[Tuple[str, dict]]:
+    """``(book, status)`` for a book folder or every book under a run folder."""
+    path = Path(path)
+    if (path / "status.json").exists() or (path / "status.journal").exists():
+        status_paths = [path / "status.json"]
+    else:
+        status_paths = sorted(
+            {candidate.with_suffix(".json") for candidate in path.glob("**/status.json")}
+            | {candidate.with_suffix(".json") for candidate in path.glob("**/status.journal")}
+        )
+    statuses = []
+    for status_path in status_paths:
+        store = StatusStore(status_path)
+        statuses.append((status_path.parent.name, store.data))
+    return statuses
+
+
+def _empty_stage() -> dict:
+    return {
+        "count": 0,
+        "wall_seconds": 0.0,
+        "cpu_seconds": 0.0,
+        "child_cpu_seconds": 0.0,
+        "peak_rss_bytes": 0,
+        "pages": 0,
+        "bytes": 0,
+    }
+
+
+def _add_span(stage: dict, record: dict) -> None:
+    stage["count"] += 1
+    for key in ("wall_seconds", "cpu_seconds", "child_cpu_seconds", "pages", "bytes"):
+        stage[key] += record.get(key, 0)
+    stage["peak_rss_bytes"] = max(stage["peak_rss_bytes"], record.get("peak_rss_bytes", 0))
+
+
+def summarize(statuses: Sequence[Tuple[str, dict]], top: int = 10) -> dict:
+    """Totals per stage, book and chunk outcomes, OCR throughput per speed
+    profile, and the slowest OCR chunks."""
+    stages: Dict[str, dict] = {}
+    profiles: Dict[str, dict] = {}
+    books: Dict[str, int] = {}
+    chunk_states: Dict[str, int] = {}
+    chunks = []
+    elapsed = 0.0
+    for book, status in statuses:
+        outcome = status.get("steps", {}).get("ocr") or status.get("merge", {}).get("status")
+        books[outcome or "pending"] = books.get(outcome or "pending", 0) + 1
+        book_metrics = status.get("metrics", {})
+        elapsed += book_metrics.get("elapsed_seconds", 0.0)
+        for name, record in book_metrics.get("stages", {}).items():
+            _add_span(stages.setdefault(name, _empty_stage()), record)
+        for chunk_name, chunk in status.get("chunks", {}).items():
+            state = chunk.get("status", "pending")
+            chunk_states[state] = chunk_states.get(state, 0) + 1
+            for name, record in chunk.get("metrics", {}).items():
+                _add_span(stages.setdefault(name, _empty_stage()), record)
+            ocr = chunk.get("metrics", {}).get("ocr")
+            if ocr and ocr.get("pages") and state == "completed":
+                profile = profiles.setdefault(
+                    chunk.get("profile", "unknown"),
+                    {"chunks": 0, "pages": 0, "wall_seconds": 0.0, "child_cpu_seconds": 0.0},
+                )
+                profile["chunks"] += 1
+                profile["pages"] += ocr["pages"]
+                profile["wall_seconds"] += ocr["wall_seconds"]
+                profile["child_cpu_seconds"] += ocr.get("child_cpu_seconds", 0.0)
+            if ocr and ocr.get("pages"):
+                chunks.append(
+                    {
+                        "book": book,
+                        "chunk": chunk_name,
+                        "pages": ocr["pages"],
+                        "wall_seconds": ocr["wall_seconds"],
+                        "seconds_per_page": round(ocr["wall_seconds"] / ocr["pages"], 3),
+                    }
+                )
+    for stage in stages.values():
+        stage["wall_seconds"] = round(stage["wall_seconds"], 3)
+        stage["cpu_seconds"] = round(stage["cpu_seconds"], 3)
+        stage["child_cpu_seconds"] = round(stage["child_cpu_seconds"], 3)
+        stage["pages_per_second"] = (
+            round(stage["pages"] / stage["wall_seconds"], 2)
+            if stage["wall_seconds"] and stage["pages"]
+            else None
+        )
+    for profile in profiles.values():
+        profile["wall_seconds"] = round(profile["wall_seconds"], 3)
+        profile["child_cpu_seconds"] = round(profile["child_cpu_seconds"], 3)
+        profile["pages_per_second"] = (
+            round(profile["pages"] / profile["wall_seconds"], 2)
+            if profile["wall_seconds"]
+            else None
+        )
+    chunks.sort(key=lambda chunk: chunk["wall_seconds"], reverse=True)
+    return {
+        "books": books,
+        "chunks": chunk_states,
+        "book_elapsed_seconds": round(elapsed, 3),
+        "stages": stages,
+        "profiles": profiles,
+        "slowest_chunks": chunks[:top],
+    }
+
+
+def format_stats(summary: dict) -> str:
+    lines = [
+        "Books: " + ", ".join(f"{count} {state}" for state, count in sorted(summary["books"].items())),
+        "Chunks: " + ", ".join(f"{count} {state}" for state, count in sorted(summary["chunks"].items())),
+        "",
+        f"{'stage':<10} {'spans':>6} {'wall s':>10} {'child cpu s':>12} {'pages':>8} "
+        f"{'pages/s':>9} {'MB':>9} {'peak RSS MB':>12}",
+    ]
+    for name, stage in sorted(summary["stages"].items()):
+        rate = stage["pages_per_second"]
+        lines.append(
+            f"{name:<10} {stage['count']:>6} {stage['wall_seconds']:>10.1f} "
+            f"{stage['child_cpu_seconds']:>12.1f} {stage['pages']:>8} "
+            f"{'-' if rate is None else f'{rate:.1f}':>9} "
+            f"{stage['bytes'] / 1e6:>9.1f} {stage['peak_rss_bytes'] / 1e6:>12.1f}"
+        )
+    if summary["profiles"]:
+        lines.extend(["", "OCR by profile:"])
+        for name, profile in sorted(summary["profiles"].items()):
+            rate = profile["pages_per_second"]
+            lines.append(
+                f"  {name}: {profile['pages']} page(s) in {profile['chunks']} chunk(s), "
+                f"{'-' if rate is None else f'{rate:.2f}'} pages/s per chunk, "
+                f"{profile['child_cpu_seconds']:.1f} CPU s"
+            )
+    if summary["slowest_chunks"]:
+        lines.extend(["", "Slowest chunks:"])
+        for chunk in summary["slowest_chunks"]:
+            lines.append(
+                f"  {chunk['book']}/{chunk['chunk']}: {chunk['wall_seconds']:.1f}s "
+                f"for {chunk['pages']} page(s) ({chunk['seconds_per_page']:.2f}s/page)"
+            )
+    return "\n".join(lines)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def write_prometheus(summary: dict, path: Path, run: str) -> Path:
+    """Write ``summary`` in the Prometheus text format for the node exporter's
+    textfile collector; the file is replaced atomically."""
+    metrics = [
+        ("lawbooks_stage_seconds_total", "counter", "Wall time spent per stage.", "wall_seconds"),
+        ("lawbooks_stage_cpu_seconds_total", "counter", "Thread CPU time per stage.", "cpu_seconds"),
+        (
+            "lawbooks_stage_child_cpu_seconds_total",
+            "counter",
+            "CPU time of subprocesses per stage.",
+            "child_cpu_seconds",
+        ),
+        ("lawbooks_stage_pages_total", "counter", "Pages processed per stage.", "pages"),
+        ("lawbooks_stage_bytes_total", "counter", "Bytes processed per stage.", "bytes"),
+        ("lawbooks_stage_peak_rss_bytes", "gauge", "Peak RSS seen per stage.", "peak_rss_bytes"),
+    ]
+    run_label = _label(run)
+    lines = []
+    for metric, kind, help_text, key in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, stage in sorted(summary["stages"].items()):
+            lines.append(f'{metric}{{run="{run_label}",stage="{_label(name)}"}} {stage[key]}')
+    for metric, key, help_text in (
+        ("lawbooks_books", "books", "Books by OCR outcome."),
+        ("lawbooks_chunks", "chunks", "Chunks by status."),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for state, value in sorted(summary[key].items()):
+            lines.append(f'{metric}{{run="{run_label}",status="{_label(state)}"}} {value}')
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
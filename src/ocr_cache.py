@@ -0,0 +1,234 @@
+"""Shared, content-addressed cache of OCR'd chunks."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, Sequence
+
+from .staging import clone_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 10 * 1024**3
+_LOCK_STALE_SECONDS = 60.0
+# The running total in stats.json is checked against the entries this often.
+_RESCAN_SECONDS = 3600.0
+# Eviction goes this far below the limit, so a full cache is not listed on
+# every store.
+_EVICT_TO = 0.9
+
+
+class _HashingSink:
+    """A write-only binary stream that feeds a hash instead of a file."""
+
+    def __init__(self) -> None:
+        self.digest = hashlib.sha256()
+        self._size = 0
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        self._size += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._size
+
+
+def page_content_hash(reader: Any, page_indices: Sequence[int]) -> str:
+    """Hash the given pages and everything they reference.
+
+    Pages are serialized the same way the streaming merger writes them, with
+    object numbers assigned in traversal order, so identical page content in
+    different files (reprints, renamed copies) hashes the same.
+    """
+    from .pdf_ops import _StreamingPdfWriter
+
+    sink = _HashingSink()
+    _StreamingPdfWriter(sink).copy_pages(reader, page_indices)
+    return sink.digest.hexdigest()
+
+
+def cache_key(content_hash: str, settings: Dict[str, Any]) -> str:
+    payload = json.dumps(settings, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{content_hash}\n{payload}".encode("utf-8")).hexdigest()
+
+
+class _DirectoryLock:
+    """Cross-process lock: an exclusively created file, broken when stale."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def __enter__(self) -> "_DirectoryLock":
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    age = time.time() - self.path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                if age > _LOCK_STALE_SECONDS:
+                    logger.warning("Breaking stale cache lock %s", self.path)
+                    self.path.unlink(missing_ok=True)
+                    continue
+                time.sleep(0.05)
+                continue
+            os.write(fd, f"{os.getpid()}\n".encode("ascii"))
+            os.close(fd)
+            return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+class OcrCache:
+    """OCR'd chunks stored under ``root/<key[:2]>/<key>.pdf``.
+
+    Entries are written to a temporary file and renamed into place, so several
+    processes can share one cache. A hit touches the entry's mtime. The total
+    size is kept in ``root/stats.json`` and updated by every store; the
+    entries are only listed when it grows past ``max_bytes``, to evict the
+    least recently used ones down to 90% of it, or once the total is older than an hour, to
+    correct it. Hit/miss/store/eviction counters are kept per instance and
+    added to ``root/stats.json`` by :meth:`close`.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._counter_lock = threading.Lock()
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            self.counters[name] += amount
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.pdf"
+
+    def _iter_entries(self) -> Iterator[os.DirEntry]:
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".pdf"):
+                    yield entry
+
+    def fetch(self, key: str, dest: Path) -> bool:
+        """Copy the entry for ``key`` to ``dest``; returns False on a miss."""
+        entry_path = self._entry_path(key)
+        tmp_path = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            clone_file(entry_path, tmp_path)
+            os.utime(entry_path)
+            os.replace(tmp_path, dest)
+        except FileNotFoundError:
+            # Missing, or evicted by another process while we copied it.
+            self._count("misses")
+            return False
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._count("hits")
+        return True
+
+    def store(self, key: str, source: Path) -> None:
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = entry_path.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            clone_file(source, tmp_path)
+            added = tmp_path.stat().st_size
+            try:
+                added -= entry_path.stat().st_size
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, entry_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        self._count("stores")
+        with _DirectoryLock(self.root / ".lock"):
+            stats = self._read_stats()
+            total = stats.get("bytes")
+            if (
+                total is None
+                or total + added > self.max_bytes
+                or time.time() - stats.get("scanned_at", 0) > _RESCAN_SECONDS
+            ):
+                self._evict_locked(stats)
+            else:
+                stats["bytes"] = total + added
+            self._write_stats(stats)
+
+    def evict(self) -> None:
+        """List the entries, evict the oldest if over ``max_bytes`` and save the total."""
+        with _DirectoryLock(self.root / ".lock"):
+            stats = self._read_stats()
+            self._evict_locked(stats)
+            self._write_stats(stats)
+
+    def _evict_locked(self, stats: dict) -> None:
+        entries = []
+        total = 0
+        for entry in self._iter_entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        target = self.max_bytes * _EVICT_TO if total > self.max_bytes else total
+        entries.sort()
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self._count("evictions")
+            logger.debug("Evicted %s from the OCR cache", path)
+        stats["bytes"] = total
+        stats["scanned_at"] = round(time.time(), 3)
+
+    def _read_stats(self) -> dict:
+        stats_path = self.root / "stats.json"
+        if not stats_path.exists():
+            return {}
+        return json.loads(stats_path.read_text(encoding="utf-8"))
+
+    def _write_stats(self, stats: dict) -> None:
+        stats_path = self.root / "stats.json"
+        tmp_path = stats_path.with_name("stats.json.tmp")
+        tmp_path.write_text(json.dumps(stats, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, stats_path)
+
+    def close(self) -> dict:
+        """Add this instance's counters to ``stats.json`` and return the totals."""
+        with self._counter_lock:
+            run_counters = dict(self.counters)
+        logger.info(
+            "OCR cache: %s hit(s), %s miss(es), %s store(s), %s eviction(s)",
+            run_counters["hits"],
+            run_counters["misses"],
+            run_counters["stores"],
+            run_counters["evictions"],
+        )
+        with _DirectoryLock(self.root / ".lock"):
+            totals = {name: 0 for name in self.counters}
+            totals.update(self._read_stats())
+            with self._counter_lock:
+                for name, value in self.counters.items():
+                    totals[name] = totals.get(name, 0) + value
+                    self.counters[name] = 0
+            self._write_stats(totals)
+        return totals
@@ -2,18 +2,57 @@
 
 from __future__ import annotations
 
+import contextvars
 import importlib.util
-import json
-import shutil
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+from . import metrics
+from .inprocess_ocr import InprocessOcrPool
+from .ocr_cache import DEFAULT_MAX_BYTES, OcrCache, cache_key, page_content_hash
 from .runner import (
+    DOCKER_IMAGE,
+    CommandCancelled,
+    DockerContainerPool,
+    DockerNotFoundError,
+    GhostscriptNotFoundError,
+    OcrmypdfNotFoundError,
+    TesseractNotFoundError,
+    _resolve_optimize_level,
+    cancel_commands,
     docker_available,
     local_ocrmypdf_ready,
+    reset_cancellation,
     run_docker_ocrmypdf,
     run_local_ocrmypdf,
 )
+from .prescan import SCAN_VERSION, needs_ocr, scan_pages
+from .progress import DEFAULT_INTERVAL, ProgressTracker
+from .profiles import DEFAULT_PROFILE, PROFILES, CpuBudget, CpuLimits, OcrProfile, get_profile
+from .scratch import DEFAULT_RESERVE_BYTES, ScratchSpace
+from .staging import stage_source
+from .status_store import StatusStore
+
+if TYPE_CHECKING:
+    from .pdf_ops import MergeInput
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("auto", "docker", "local", "inprocess")
+CHUNKING_MODES = ("fixed", "cost")
+_CHUNK_NAME = re.compile(r"^chunk_(\d+)-(\d+)\.pdf$")
+# Runs of at most this many text or blank pages between pages that need OCR
+# stay inside a chunk; OCRmyPDF's --skip-text passes them through.
+MAX_TEXT_GAP = 5
 
 
 def _require_pypdf() -> tuple[type, type]:
@@ -26,134 +65,1258 @@ def _require_pypdf() -> tuple[type, type]:
     return PdfReader, PdfWriter
 
 
-def _load_status(status_path: Path) -> dict:
-    if status_path.exists():
-        return json.loads(status_path.read_text(encoding="utf-8"))
-    return {"chunks": {}}
+# Failures that another attempt cannot fix, or that must not be retried.
+_PERMANENT_ERRORS = (
+    CommandCancelled,
+    DockerNotFoundError,
+    GhostscriptNotFoundError,
+    OcrmypdfNotFoundError,
+    TesseractNotFoundError,
+    ValueError,
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often a failed chunk is retried, and how long one attempt may run.
+
+    Attempt ``n`` that fails is retried after ``backoff_seconds * 2 ** (n - 1)``
+    seconds, at most ``max_backoff_seconds``, until ``attempts`` have been made.
+    A chunk of ``p`` pages is stopped after ``timeout_seconds +
+    timeout_per_page * p`` seconds; leaving both None means no limit. The
+    defaults make one attempt without a limit.
+
+    When a chunk has used up its attempts, chunks already running finish and
+    are recorded, then the book's first failure in page order is raised. With
+    :attr:`OcrSettings.keep_going` every other chunk is OCR'd first and all
+    failures are raised together as :class:`ChunkFailures`.
+    """
+
+    attempts: int = 1
+    backoff_seconds: float = 5.0
+    max_backoff_seconds: float = 300.0
+    timeout_seconds: Optional[float] = None
+    timeout_per_page: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        if self.attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        limits = (self.backoff_seconds, self.timeout_seconds or 0, self.timeout_per_page or 0)
+        if min(limits) < 0:
+            raise ValueError("backoff and timeouts must not be negative")
+
+    def delay(self, attempt: int) -> float:
+        return min(self.backoff_seconds * 2 ** (attempt - 1), self.max_backoff_seconds)
 
+    def timeout(self, pages: int) -> Optional[float]:
+        if self.timeout_seconds is None and self.timeout_per_page is None:
+            return None
+        return (self.timeout_seconds or 0.0) + (self.timeout_per_page or 0.0) * pages
 
-def _write_status(status_path: Path, status_data: dict) -> None:
-    status_path.write_text(
-        json.dumps(status_data, indent=2, sort_keys=True), encoding="utf-8"
+
+class ChunkFailures(RuntimeError):
+    """Several chunks of a book failed; ``errors`` maps chunk names to errors."""
+
+    def __init__(self, source: Path, errors: Dict[str, Exception]) -> None:
+        self.errors = dict(sorted(errors.items()))
+        details = "; ".join(f"{name}: {exc}" for name, exc in self.errors.items())
+        super().__init__(f"{len(self.errors)} chunk(s) of {source.name} failed: {details}")
+
+
+@dataclass
+class OcrSettings:
+    """Backend and OCR options shared by every chunk of a run.
+
+    ``workdir`` is the folder mounted into Docker; every chunk input and output
+    must live under it (for a library run it is the run folder). With
+    ``keep_going``, a failed chunk does not stop the other chunks of its book.
+    With ``scratch``, chunk inputs are split into it instead of the workdir and
+    it is mounted into Docker as ``/scratch``. ``profile`` picks the OCRmyPDF
+    speed/quality options, and ``cpu_budget`` caps the page jobs and Tesseract
+    threads of each chunk; without one, OCRmyPDF's defaults apply. An
+    ``"auto"`` backend is resolved by :meth:`resolve_backend` when the first
+    chunk needs it, so a run without pages to OCR needs no OCR tools.
+
+    :func:`backend_pools` fills in ``docker_pool`` (long-lived containers
+    that run chunks with ``docker exec``) and ``inprocess_pool`` (worker
+    processes calling ``ocrmypdf.ocr``). With ``cache``, chunks whose pages
+    and OCR settings match an earlier run are copied from it instead of OCR'd.
+    """
+
+    backend: str
+    workdir: Path
+    lang: str
+    clean: bool
+    dry_run: bool
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    keep_going: bool = False
+    profile: OcrProfile = PROFILES[DEFAULT_PROFILE]
+    cpu_budget: Optional[CpuBudget] = None
+    docker_pool: Optional[DockerContainerPool] = None
+    inprocess_pool: Optional[InprocessOcrPool] = None
+    cache: Optional[OcrCache] = None
+    scratch: Optional[ScratchSpace] = None
+    _cache_identity: Optional[dict] = field(default=None, repr=False)
+    _backend_lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
     )
 
+    def resolve_backend(self) -> str:
+        """Replace an ``"auto"`` backend with the one available, once."""
+        with self._backend_lock:
+            if self.backend == "auto":
+                self.backend = resolve_backend(self.backend)
+        return self.backend
+
+    def cache_identity(self) -> dict:
+        """The settings that change OCR output, used in OCR cache keys."""
+        self.resolve_backend()
+        if self._cache_identity is None:
+            self._cache_identity = {
+                "lang": self.lang,
+                "clean": self.clean,
+                "optimize": _resolve_optimize_level(self.profile.optimize),
+                "deskew": self.profile.deskew,
+                "output_type": self.profile.output_type,
+                "backend": DOCKER_IMAGE if self.backend == "docker" else self.backend,
+                "extra_args": [],
+            }
+        return self._cache_identity
 
-def ocr_pdf_in_chunks(
-    input_pdf: str,
-    workdir: str,
-    chunk_size: int = 25,
-    lang: str = "eng",
-    clean: bool = False,
-    dry_run: bool = False,
-    force: bool = False,
-    backend: str = "auto",
-) -> List[Path]:
-    workdir_path = Path(workdir)
-    workdir_path.mkdir(parents=True, exist_ok=True)
-    chunks_dir = workdir_path / "chunks"
-    chunks_dir.mkdir(parents=True, exist_ok=True)
 
-    source_path = Path(input_pdf).resolve()
-    local_input = workdir_path / "input.pdf"
-    if source_path != local_input:
-        shutil.copy2(source_path, local_input)
+def _run_backend(
+    settings: OcrSettings,
+    chunk_input: Path,
+    chunk_path: Path,
+    chunk_pages: int,
+    timeout_sec: Optional[float] = None,
+    cpu: Optional[CpuLimits] = None,
+    log_path: Optional[Path] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    sidecar_path: Optional[Path] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> None:
+    """Run the chunk on the settings' backend, writing its text to
+    ``sidecar_path``. The subprocess backends capture their output to
+    ``log_path`` and report pages done to ``progress``. Every backend stops
+    the chunk once ``cancelled()`` is true."""
+    settings.resolve_backend()
+    scratch = None
+    if settings.scratch is not None and settings.scratch.path is not None:
+        scratch = str(settings.scratch.path)
+    sidecar = None if sidecar_path is None else str(sidecar_path)
+    if settings.backend == "inprocess":
+        assert settings.inprocess_pool is not None
+        settings.inprocess_pool.run(
+            in_pdf=str(chunk_input),
+            out_pdf=str(chunk_path),
+            pages_range=(1, chunk_pages),
+            lang=settings.lang,
+            clean=settings.clean,
+            extra_options=None,
+            timeout_sec=timeout_sec,
+            dry_run=settings.dry_run,
+            profile=settings.profile,
+            cpu=cpu,
+            sidecar=sidecar,
+            cancelled=cancelled,
+        )
+    elif settings.backend == "docker" and settings.docker_pool is not None:
+        with settings.docker_pool.acquire() as container:
+            run_docker_ocrmypdf(
+                workdir=str(settings.workdir),
+                scratch=scratch,
+                in_pdf=str(chunk_input),
+                out_pdf=str(chunk_path),
+                pages_range=(1, chunk_pages),
+                lang=settings.lang,
+                clean=settings.clean,
+                extra_args=None,
+                timeout_sec=timeout_sec,
+                dry_run=settings.dry_run,
+                container=container,
+                profile=settings.profile,
+                cpu=cpu,
+                log_path=log_path,
+                progress=progress,
+                sidecar=sidecar,
+                cancelled=cancelled,
+            )
+    elif settings.backend == "docker":
+        run_docker_ocrmypdf(
+            workdir=str(settings.workdir),
+            scratch=scratch,
+            in_pdf=str(chunk_input),
+            out_pdf=str(chunk_path),
+            pages_range=(1, chunk_pages),
+            lang=settings.lang,
+            clean=settings.clean,
+            extra_args=None,
+            timeout_sec=timeout_sec,
+            dry_run=settings.dry_run,
+            profile=settings.profile,
+            cpu=cpu,
+            log_path=log_path,
+            progress=progress,
+            sidecar=sidecar,
+            cancelled=cancelled,
+        )
+    else:
+        run_local_ocrmypdf(
+            in_pdf=str(chunk_input),
+            out_pdf=str(chunk_path),
+            pages_range=(1, chunk_pages),
+            lang=settings.lang,
+            clean=settings.clean,
+            extra_args=None,
+            timeout_sec=timeout_sec,
+            dry_run=settings.dry_run,
+            profile=settings.profile,
+            cpu=cpu,
+            log_path=log_path,
+            progress=progress,
+            sidecar=sidecar,
+            cancelled=cancelled,
+        )
 
-    PdfReader, PdfWriter = _require_pypdf()
-    reader = PdfReader(str(local_input))
-    page_count = len(reader.pages)
 
-    status_path = workdir_path / "status.json"
-    status_data = _load_status(status_path)
-    chunk_records = status_data.setdefault("chunks", {})
+def _check_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of: {', '.join(BACKENDS)}")
+
+
+def resolve_backend(backend: str) -> str:
+    _check_backend(backend)
+
+    if backend != "auto":
+        return backend
+    if docker_available():
+        return "docker"
+    if local_ocrmypdf_ready():
+        return "local"
+    raise RuntimeError(
+        "Neither docker nor a complete local OCR stack is available. "
+        "Install Docker or ensure ocrmypdf, tesseract, and ghostscript are on PATH."
+    )
+
 
-    chunk_paths: List[Path] = []
+_shared_inprocess_pool: Optional[InprocessOcrPool] = None
 
-    if backend not in {"auto", "docker", "local"}:
-        raise ValueError("backend must be one of: auto, docker, local")
 
-    if backend == "auto":
-        if docker_available():
-            resolved_backend = "docker"
-        elif local_ocrmypdf_ready():
-            resolved_backend = "local"
+def share_inprocess_pool(pool: Optional[InprocessOcrPool]) -> None:
+    """Run every ``inprocess`` job on ``pool`` instead of a pool per run.
+
+    Long-lived processes (the job server) set this so that workers import
+    OCRmyPDF once; the caller starts and closes ``pool``. ``None`` goes back
+    to a pool per run.
+    """
+    global _shared_inprocess_pool
+    _shared_inprocess_pool = pool
+
+
+@contextmanager
+def backend_pools(
+    settings: OcrSettings, jobs: int, reuse_containers: bool = False
+) -> Iterator[OcrSettings]:
+    """Start the long-lived workers ``settings`` needs and stop them afterwards.
+
+    The OCR cache in ``settings``, if any, is closed on the way out as well,
+    and the scratch space is created first and removed last.
+    """
+    budget = settings.cpu_budget
+    if budget is not None and settings.backend != "none":
+        logger.info(
+            "Profile %s; %s CPU(s) for %s concurrent chunk(s), up to %s each",
+            settings.profile.name,
+            budget.cpus,
+            budget.jobs,
+            budget.limits(budget.cpus).ocr_jobs,
+        )
+        if budget.oversubscribed:
+            logger.warning(
+                "%s concurrent chunks on %s CPU(s): each runs single-threaded and "
+                "they compete for cores",
+                budget.jobs,
+                budget.cpus,
+            )
+    if settings.scratch is not None and not settings.dry_run:
+        settings.scratch.start()
+    scratch = None
+    if settings.scratch is not None and settings.scratch.path is not None:
+        scratch = str(settings.scratch.path)
+    # The containers start up front, so an "auto" backend is resolved now.
+    if reuse_containers and not settings.dry_run and settings.backend != "none":
+        if settings.resolve_backend() == "docker":
+            settings.docker_pool = DockerContainerPool(
+                str(settings.workdir), size=jobs, scratch=scratch
+            )
+            settings.docker_pool.start()
+    own_pool = settings.backend == "inprocess" and _shared_inprocess_pool is None
+    if settings.backend == "inprocess":
+        settings.inprocess_pool = _shared_inprocess_pool or InprocessOcrPool(workers=jobs)
+        if not settings.dry_run:
+            settings.inprocess_pool.start()
+    try:
+        yield settings
+    finally:
+        if settings.inprocess_pool is not None:
+            if own_pool:
+                settings.inprocess_pool.close()
+            settings.inprocess_pool = None
+        if settings.docker_pool is not None:
+            settings.docker_pool.close()
+        if settings.cache is not None:
+            settings.cache.close()
+        if settings.scratch is not None:
+            settings.scratch.close()
+
+
+@dataclass
+class _Chunk:
+    start_page: int
+    end_page: int
+    output_path: Path
+    input_path: Path
+    cache_key: Optional[str] = None
+    cost: float = 0.0
+    split_metrics: Optional[dict] = None
+
+    @property
+    def name(self) -> str:
+        return self.output_path.name
+
+    @property
+    def pages(self) -> int:
+        return self.end_page - self.start_page + 1
+
+    @property
+    def sidecar_path(self) -> Path:
+        """OCRmyPDF's text output for the chunk."""
+        return self.output_path.with_suffix(".txt")
+
+
+def _merge_chunks(
+    segments: List[MergeInput],
+    segment_pages: List[int],
+    merged_path: Path,
+    store: StatusStore,
+    force: bool,
+) -> Path:
+    _require_pypdf()
+    from .pdf_ops import merge_pdfs
+
+    inputs = []
+    for segment in segments:
+        path, page_range = (
+            (segment[0], list(segment[1:])) if isinstance(segment, tuple) else (segment, None)
+        )
+        inputs.append([path.name, path.stat().st_size, path.stat().st_mtime_ns, page_range])
+    previous = store.get("merge", default={})
+    if (
+        not force
+        and merged_path.exists()
+        and previous.get("status") == "completed"
+        and previous.get("inputs") == inputs
+    ):
+        logger.info("Chunks unchanged; keeping merged PDF %s", merged_path)
+        return merged_path
+
+    store.set(("merge",), {"status": "running", "path": str(merged_path)})
+    merge_pdfs(segments, merged_path, expected_pages=segment_pages)
+    store.set(
+        ("merge",),
+        {
+            "status": "completed",
+            "path": str(merged_path),
+            "pages": sum(segment_pages),
+            "inputs": inputs,
+        },
+    )
+    return merged_path
+
+
+class BookOcrJob:
+    """OCR state for one book: staging, chunk planning, per-chunk work, merge.
+
+    The source is staged as ``workdir/input.pdf`` with ``staging`` (see
+    :func:`src.staging.stage_source`) and not restaged while it is unchanged.
+    With ``prescan`` every page is classified first (see :mod:`src.prescan`):
+    chunks are built only from pages that need OCR, other pages go straight
+    to the merge, and a book with a text layer on every page never touches
+    the OCR backend. ``chunking="cost"`` sizes chunks by the pre-scan's
+    estimated cost instead of page count (see :meth:`_cost_ranges`). Once
+    every chunk has succeeded and ``merge`` is set, the chunks are merged into
+    ``workdir/<source stem>_ocr.pdf``, which is not redone while they are
+    unchanged. Each chunk's text is kept as an OCRmyPDF sidecar beside it
+    (see :func:`chunk_sidecars`).
+
+    The methods are driven by :func:`run_book_jobs`, which interleaves the
+    chunks of many books on one worker pool. Chunk outcomes, timings, profile
+    and CPU limits are recorded in the book's
+    :class:`~src.status_store.StatusStore`.
+    """
+
+    def __init__(
+        self,
+        input_pdf: Path,
+        workdir: Path,
+        settings: OcrSettings,
+        chunk_size: int = 25,
+        force: bool = False,
+        staging: str = "auto",
+        merge: bool = True,
+        store: Optional[StatusStore] = None,
+        prescan: bool = True,
+        chunking: str = "fixed",
+        min_chunk_pages: int = 1,
+        max_chunk_pages: Optional[int] = None,
+        expected_pages: Optional[int] = None,
+    ) -> None:
+        if chunking not in CHUNKING_MODES:
+            raise ValueError(
+                f"Unknown chunking mode '{chunking}'. Choose from: {', '.join(CHUNKING_MODES)}."
+            )
+        max_chunk_pages = max_chunk_pages or 2 * chunk_size
+        if chunk_size < 1 or not 1 <= min_chunk_pages <= max_chunk_pages:
+            raise ValueError(
+                "chunk_size must be at least 1 and "
+                "1 <= min_chunk_pages <= max_chunk_pages must hold."
+            )
+        self.source_path = Path(input_pdf).resolve()
+        self.workdir = Path(workdir)
+        self.chunks_dir = self.workdir / "chunks"
+        self.settings = settings
+        self.chunk_size = chunk_size
+        self.force = force
+        self.staging = staging
+        self.merge = merge
+        self.prescan = prescan
+        self.chunking = chunking
+        self.min_chunk_pages = min_chunk_pages
+        self.max_chunk_pages = max_chunk_pages
+        # A page count known before prepare(), used for run progress estimates.
+        self.expected_pages = expected_pages
+        self.store = store or StatusStore(self.workdir / "status.json")
+        self.merged_path = self.workdir / f"{self.source_path.stem}_ocr.pdf"
+        self.chunks: List[_Chunk] = []
+        self.page_count = 0
+        self.page_codes = ""
+        self.page_costs: List[float] = []
+        self.prepared = False
+        self.failed = threading.Event()
+        self.abandoned = False
+        self.errors: Dict[str, Exception] = {}
+        self._reader = None
+        self._PdfWriter: Optional[type] = None
+        self._local_input: Optional[Path] = None
+        self._staged_copy = False
+        self._timings: List[tuple] = []
+        self._started: Optional[float] = None
+        self._bytes_per_page = 0.0
+        # Set by run_book_jobs.
+        self.progress: Optional[ProgressTracker] = None
+
+    @property
+    def chunk_paths(self) -> List[Path]:
+        return [chunk.output_path for chunk in self.chunks]
+
+    def prepare(self) -> None:
+        """Stage the source, open it, pre-scan its pages and plan the chunks."""
+        self._started = time.perf_counter()
+        self.chunks_dir.mkdir(parents=True, exist_ok=True)
+        with metrics.span("stage") as stage_span:
+            local_input, source_record = stage_source(
+                self.source_path,
+                self.workdir / "input.pdf",
+                strategy=self.staging,
+                previous=None if self.force else self.store.get("source"),
+            )
+            if source_record["strategy"] == "copy":
+                stage_span.add(bytes=source_record["size"])
+        self._record_stage(stage_span)
+        self.store.set(("source",), source_record)
+        self._local_input = local_input
+        self._staged_copy = source_record["strategy"] not in {"reference", "in_place"}
+
+        PdfReader, self._PdfWriter = _require_pypdf()
+        self._reader = PdfReader(str(local_input))
+        self.page_count = len(self._reader.pages)
+        self._bytes_per_page = source_record["size"] / max(self.page_count, 1)
+        if self.prescan or self.chunking == "cost":
+            self.page_codes, self.page_costs = self._prescan(source_record)
+        if not self.prescan:
+            self.page_codes = "i" * self.page_count
+        if self.chunking == "fixed":
+            ranges = self._ocr_ranges()
         else:
-            raise RuntimeError(
-                "Neither docker nor a complete local OCR stack is available. "
-                "Install Docker or ensure ocrmypdf, tesseract, and ghostscript are on PATH."
+            ranges = self._cost_ranges()
+
+        for start_page, end_page in ranges:
+            stem = f"chunk_{start_page:04d}-{end_page:04d}"
+            self.chunks.append(
+                _Chunk(
+                    start_page=start_page,
+                    end_page=end_page,
+                    output_path=self.chunks_dir / f"{stem}.pdf",
+                    input_path=self.chunks_dir / f"{stem}_input.pdf",
+                    cost=round(sum(self.page_costs[start_page - 1 : end_page]), 3),
+                )
             )
-    else:
-        resolved_backend = backend
+        self.store.set(("plan",), self.plan())
+        self.prepared = True
+
+    def plan(self) -> dict:
+        """The options that decide chunk boundaries and OCR output, so a retry
+        can rebuild the same chunks (see :func:`src.batch_folder.retry_failed`)."""
+        return {
+            "chunk_size": self.chunk_size,
+            "chunking": self.chunking,
+            "min_chunk_pages": self.min_chunk_pages,
+            "max_chunk_pages": self.max_chunk_pages,
+            "prescan": self.prescan,
+            "lang": self.settings.lang,
+            "clean": self.settings.clean,
+            "profile": self.settings.profile.name,
+        }
+
+    def _prescan(self, source_record: dict) -> tuple:
+        previous = self.store.get("prescan", default={})
+        if (
+            not self.force
+            and previous.get("version") == SCAN_VERSION
+            and previous.get("size") == source_record["size"]
+            and previous.get("mtime_ns") == source_record["mtime_ns"]
+            and len(previous.get("pages", "")) == self.page_count
+            and len(previous.get("costs", [])) == self.page_count
+        ):
+            return previous["pages"], previous["costs"]
+
+        started = time.perf_counter()
+        with metrics.span("prescan", pages=self.page_count) as prescan_span:
+            codes, costs = scan_pages(self._reader)
+        self._record_stage(prescan_span)
+        counts = {code: codes.count(code) for code in sorted(set(codes))}
+        self.store.set(
+            ("prescan",),
+            {
+                "version": SCAN_VERSION,
+                "size": source_record["size"],
+                "mtime_ns": source_record["mtime_ns"],
+                "pages": codes,
+                "costs": costs,
+                "counts": counts,
+                "seconds": round(time.perf_counter() - started, 3),
+            },
+        )
+        logger.info(
+            "Pre-scan of %s: %s of %s page(s) need OCR",
+            self.source_path.name,
+            sum(1 for code in codes if needs_ocr(code)),
+            self.page_count,
+        )
+        return codes, costs
+
+    def _ocr_ranges(self) -> Iterator[tuple]:
+        """Yield (start, end) page ranges of at most chunk_size pages."""
+        for run_start, run_end in self._runs():
+            for start_page in range(run_start, run_end + 1, self.chunk_size):
+                yield start_page, min(start_page + self.chunk_size - 1, run_end)
 
-    for start_page in range(1, page_count + 1, chunk_size):
-        end_page = min(start_page + chunk_size - 1, page_count)
-        chunk_name = f"chunk_{start_page:04d}-{end_page:04d}.pdf"
-        chunk_path = chunks_dir / chunk_name
-        chunk_input = chunks_dir / f"chunk_{start_page:04d}-{end_page:04d}_input.pdf"
-        chunk_paths.append(chunk_path)
+    def _cost_ranges(self) -> List[tuple]:
+        """Page ranges of roughly equal estimated OCR cost.
 
-        record = chunk_records.get(
-            chunk_name, {"attempts": 0, "last_error": None, "status": "pending"}
+        The target cost is what ``chunk_size`` pages cost on average in this
+        book, so dense plates get shorter chunks and plain scans longer ones.
+        Each chunk has between ``min_chunk_pages`` and ``max_chunk_pages``
+        pages unless its run of OCR pages is shorter. The ranges depend only on
+        the stored pre-scan, so chunk names are stable across resumes.
+        """
+        ocr_pages = [
+            page for page in range(1, self.page_count + 1)
+            if needs_ocr(self.page_codes[page - 1])
+        ]
+        if not ocr_pages:
+            return []
+        target = (
+            sum(self.page_costs[page - 1] for page in ocr_pages)
+            / len(ocr_pages)
+            * self.chunk_size
         )
 
-        if chunk_path.exists() and not force:
-            record["status"] = "skipped"
-            chunk_records[chunk_name] = record
-            _write_status(status_path, status_data)
-            if chunk_input.exists():
-                chunk_input.unlink()
-            continue
+        ranges: List[tuple] = []
+        for run_start, run_end in self._runs():
+            start_index = len(ranges)
+            start_page = run_start
+            cost = 0.0
+            for page in range(run_start, run_end + 1):
+                page_cost = self.page_costs[page - 1]
+                pages = page - start_page
+                # Close the chunk before this page if that lands nearer the target.
+                if pages >= self.max_chunk_pages or (
+                    pages >= self.min_chunk_pages
+                    and cost + page_cost - target > target - cost
+                ):
+                    ranges.append((start_page, page - 1))
+                    start_page = page
+                    cost = 0.0
+                cost += page_cost
+            ranges.append((start_page, run_end))
+            if len(ranges) - start_index > 1:
+                # Fold a short tail into the previous chunk when it fits.
+                tail_start, tail_end = ranges[-1]
+                previous_start = ranges[-2][0]
+                if (
+                    tail_end - tail_start + 1 < self.min_chunk_pages
+                    and tail_end - previous_start + 1 <= self.max_chunk_pages
+                ):
+                    ranges[-2:] = [(previous_start, tail_end)]
+        return ranges
+
+    def _runs(self) -> Iterator[tuple]:
+        """Yield (start, end) runs of pages that need OCR.
+
+        A run may hold gaps of up to ``MAX_TEXT_GAP`` pages that do not, so
+        a book that mixes scans and born-digital pages is not cut into
+        one-page chunks, and its merge into many small segments.
+        """
+        ocr_pages = [
+            page for page in range(1, self.page_count + 1)
+            if needs_ocr(self.page_codes[page - 1])
+        ]
+        if not ocr_pages:
+            return
+        run_start = previous = ocr_pages[0]
+        for page in ocr_pages[1:]:
+            if page - previous - 1 > MAX_TEXT_GAP:
+                yield run_start, previous
+                run_start = page
+            previous = page
+        yield run_start, previous
 
-        record["attempts"] = record.get("attempts", 0) + 1
-        chunk_records[chunk_name] = record
-        _write_status(status_path, status_data)
+    def _record_stage(self, record: metrics.Span) -> None:
+        self.store.update(("metrics", "stages"), {record.name: record.as_dict()})
 
+    @property
+    def needs_ocr(self) -> bool:
+        return bool(self.chunks)
+
+    def _merge_segments(self) -> tuple:
+        """Chunks and untouched source page ranges, in page order."""
+        segments: List[MergeInput] = []
+        pages: List[int] = []
+        chunks_by_start = {chunk.start_page: chunk for chunk in self.chunks}
+        page = 1
+        while page <= self.page_count:
+            chunk = chunks_by_start.get(page)
+            if chunk is not None:
+                segments.append(chunk.output_path)
+                pages.append(chunk.pages)
+                page = chunk.end_page + 1
+                continue
+            end_page = page
+            while end_page < self.page_count and end_page + 1 not in chunks_by_start:
+                end_page += 1
+            segments.append((self._local_input, page, end_page))
+            pages.append(end_page - page + 1)
+            page = end_page + 1
+        return segments, pages
+
+    def _update_record(self, chunk: _Chunk, **changes: object) -> None:
+        if self.store.get("chunks", chunk.name) is None:
+            changes = {"attempts": 0, "last_error": None, "status": "pending", **changes}
+        self.store.update(("chunks", chunk.name), changes)
+
+    def _start_attempt(self, chunk: _Chunk, **changes: object) -> None:
+        attempts = self.store.get("chunks", chunk.name, "attempts", default=0)
+        self._update_record(chunk, attempts=attempts + 1, **changes)
+
+    def _fail(self, chunk: _Chunk, exc: Exception) -> None:
+        if not self.settings.keep_going:
+            self.failed.set()
+        self.errors[chunk.name] = exc
+        logger.error("Chunk %s failed: %s", chunk.output_path, exc)
+
+    def abandon(self) -> None:
+        """Stop work on the book because another worker has taken it over.
+
+        No further chunks start and the book's status and files are left to
+        the new owner. Chunks already running are stopped within a fraction
+        of a second; their partial output is only ever a ``.part`` file, so
+        it cannot pass for a finished chunk.
+        """
+        self.abandoned = True
+        self.store.freeze()
+        self.failed.set()
+        logger.warning("Abandoning %s to another worker", self.source_path.name)
+
+    def pending_chunks(self) -> Iterator[_Chunk]:
+        """Yield chunks that need OCR, recording the rest as skipped."""
+        for chunk in self.chunks:
+            if self.failed.is_set():
+                return
+            if chunk.output_path.exists() and not self.force:
+                self._update_record(chunk, status="skipped")
+                if chunk.input_path.exists():
+                    chunk.input_path.unlink()
+                continue
+            yield chunk
+
+    def fetch_cached(self, chunk: _Chunk) -> bool:
+        """Fill the chunk from the OCR cache; returns True on a hit."""
+        cache = self.settings.cache
+        if cache is None or self.settings.dry_run:
+            return False
+        content_hash = page_content_hash(
+            self._reader, range(chunk.start_page - 1, chunk.end_page)
+        )
+        chunk.cache_key = cache_key(content_hash, self.settings.cache_identity())
+        if not cache.fetch(chunk.cache_key, chunk.output_path):
+            return False
+        # The cache holds PDFs only; an older sidecar may not match this one.
+        chunk.sidecar_path.unlink(missing_ok=True)
+        self._update_record(
+            chunk,
+            status="cached",
+            last_error=None,
+            cache_key=chunk.cache_key,
+            profile=self.settings.profile.name,
+        )
+        return True
+
+    def split(self, chunk: _Chunk) -> Optional[float]:
+        """Write the chunk's input PDF; returns the time taken, or None on failure."""
+        started = time.perf_counter()
+        try:
+            with metrics.span("split") as split_span:
+                if not self.settings.dry_run and (self.force or not chunk.input_path.exists()):
+                    chunk.input_path = self._input_path(chunk)
+                    writer = self._PdfWriter()
+                    for page_index in range(chunk.start_page - 1, chunk.end_page):
+                        writer.add_page(self._reader.pages[page_index])
+                    with chunk.input_path.open("wb") as handle:
+                        writer.write(handle)
+                    split_span.add(pages=chunk.pages, bytes=chunk.input_path.stat().st_size)
+        except Exception as exc:
+            self._fail(chunk, exc)
+            self._start_attempt(chunk, status="failed", last_error=str(exc))
+            self.discard(chunk)
+            return None
+        chunk.split_metrics = split_span.as_dict()
+        return round(time.perf_counter() - started, 3)
+
+    def _input_path(self, chunk: _Chunk) -> Path:
+        """Where to write the chunk's input: scratch space if it has room for
+        it, otherwise the chunks folder of the workdir."""
+        scratch = self.settings.scratch
+        if scratch is None or scratch.path is None:
+            return chunk.input_path
+        # Split chunks repeat shared fonts and images, hence the margin.
+        estimate = int(self._bytes_per_page * chunk.pages * 1.5) + 1024 * 1024
+        if not scratch.has_room(estimate):
+            logger.warning(
+                "Scratch space is low; writing %s to the workdir", chunk.input_path.name
+            )
+            return chunk.input_path
+        return scratch.folder(self.workdir.name) / chunk.input_path.name
+
+    def discard(self, chunk: _Chunk) -> None:
+        if chunk.input_path.exists() and not self.abandoned:
+            chunk.input_path.unlink()
+
+    def run_chunk(self, chunk: _Chunk, split_seconds: float) -> None:
+        """OCR a split chunk and record the outcome; failures are not raised.
+
+        Failed attempts are retried as the settings' :class:`RetryPolicy`
+        allows; every attempt is counted in the chunk's ``attempts``.
+        """
+        policy = self.settings.retry
         try:
-            if not dry_run and (force or not chunk_input.exists()):
-                writer = PdfWriter()
-                for page_index in range(start_page - 1, end_page):
-                    writer.add_page(reader.pages[page_index])
-                with chunk_input.open("wb") as handle:
-                    writer.write(handle)
-            chunk_pages = end_page - start_page + 1
-            if resolved_backend == "docker":
-                run_docker_ocrmypdf(
-                    workdir=str(workdir_path),
-                    in_pdf=str(chunk_input),
-                    out_pdf=str(chunk_path),
-                    pages_range=(1, chunk_pages),
-                    lang=lang,
-                    clean=clean,
-                    extra_args=None,
-                    timeout_sec=None,
-                    dry_run=dry_run,
+            for attempt in range(1, policy.attempts + 1):
+                if self.failed.is_set():
+                    # Another chunk of this book failed before this one started.
+                    return
+                error = self._attempt(chunk, split_seconds, policy.timeout(chunk.pages))
+                if error is None:
+                    return
+                if attempt == policy.attempts or isinstance(error, _PERMANENT_ERRORS):
+                    self._fail(chunk, error)
+                    return
+                delay = policy.delay(attempt)
+                logger.warning(
+                    "Chunk %s failed (attempt %s of %s), retrying in %.1fs: %s",
+                    chunk.name,
+                    attempt,
+                    policy.attempts,
+                    delay,
+                    error,
                 )
-            else:
-                run_local_ocrmypdf(
-                    in_pdf=str(chunk_input),
-                    out_pdf=str(chunk_path),
-                    pages_range=(1, chunk_pages),
-                    lang=lang,
-                    clean=clean,
-                    extra_args=None,
-                    timeout_sec=None,
-                    dry_run=dry_run,
+                self._update_record(chunk, status="retrying")
+                # Woken early if the book fails or the run is interrupted.
+                self.failed.wait(delay)
+        finally:
+            self.discard(chunk)
+
+    def _progress_callback(self, chunk: _Chunk) -> Optional[Callable[[int], None]]:
+        """Report the chunk's pages to the run's tracker as OCRmyPDF does them.
+
+        If OCRmyPDF prints no progress bar the callback is never called, and
+        the chunk's pages are counted when it completes instead.
+        """
+        tracker = self.progress
+        if tracker is None:
+            return None
+        tracker.update(self, chunk.name, 0)
+
+        def on_pages(pages: int) -> None:
+            tracker.update(self, chunk.name, min(pages, chunk.pages))
+
+        return on_pages
+
+    def _attempt(
+        self, chunk: _Chunk, split_seconds: float, timeout_sec: Optional[float]
+    ) -> Optional[Exception]:
+        """Run the OCR backend on the chunk once; returns the error, if any."""
+        started = time.perf_counter()
+        ocr_span = metrics.Span("ocr")
+        budget = self.settings.cpu_budget
+        cpu = None if budget is None else budget.limits(chunk.pages)
+        tracker = self.progress
+        on_pages = self._progress_callback(chunk)
+        # Backends write beside the chunk and the result is renamed into place,
+        # so output_path only ever holds a whole chunk. The name is unique to
+        # this attempt, as a worker that lost the book may still be writing.
+        token = uuid.uuid4().hex[:12]
+        output_part = chunk.output_path.with_name(f"{chunk.output_path.name}.{token}.part")
+        sidecar_part = chunk.sidecar_path.with_name(f"{chunk.sidecar_path.name}.{token}.part")
+        try:
+            self._start_attempt(
+                chunk,
+                status="running",
+                split_seconds=split_seconds,
+                estimated_cost=chunk.cost,
+                profile=self.settings.profile.name,
+                cpu=None if cpu is None else cpu.as_dict(),
+            )
+            with metrics.span("ocr", pages=chunk.pages) as ocr_span:
+                _run_backend(
+                    self.settings,
+                    chunk.input_path,
+                    output_part,
+                    chunk.pages,
+                    timeout_sec=timeout_sec,
+                    cpu=cpu,
+                    log_path=chunk.output_path.with_suffix(".log"),
+                    progress=on_pages,
+                    sidecar_path=sidecar_part,
+                    cancelled=lambda: self.abandoned,
                 )
-            record["status"] = "dry_run" if dry_run else "completed"
-            record["last_error"] = None
+                if self.abandoned:
+                    raise CommandCancelled(f"{chunk.name} was taken over by another worker.")
+                if not self.settings.dry_run:
+                    # The sidecar goes first: a chunk PDF implies its text is there.
+                    if sidecar_part.exists():
+                        os.replace(sidecar_part, chunk.sidecar_path)
+                    else:
+                        chunk.sidecar_path.unlink(missing_ok=True)
+                    os.replace(output_part, chunk.output_path)
+                    ocr_span.add(bytes=chunk.output_path.stat().st_size)
+        except Exception as exc:
+            output_part.unlink(missing_ok=True)
+            sidecar_part.unlink(missing_ok=True)
+            # With force, an older output must not pass for this attempt's.
+            if not self.abandoned:
+                chunk.output_path.unlink(missing_ok=True)
+                chunk.sidecar_path.unlink(missing_ok=True)
+            if tracker is not None:
+                tracker.chunk_stopped(self, chunk.name)
+            self._update_record(
+                chunk,
+                status="failed",
+                last_error=str(exc),
+                ocr_seconds=round(time.perf_counter() - started, 3),
+                metrics=self._chunk_metrics(chunk, ocr_span),
+            )
+            return exc
+
+        ocr_seconds = round(time.perf_counter() - started, 3)
+        if tracker is not None:
+            tracker.chunk_done(self, chunk.name, chunk.pages)
+        self._update_record(
+            chunk,
+            status="dry_run" if self.settings.dry_run else "completed",
+            last_error=None,
+            ocr_seconds=ocr_seconds,
+            metrics=self._chunk_metrics(chunk, ocr_span),
+        )
+        if chunk.cost > 0:
+            logger.debug(
+                "Chunk %s: estimated cost %.2f, took %.1fs",
+                chunk.name,
+                chunk.cost,
+                ocr_seconds,
+            )
+            self._timings.append((chunk.cost, ocr_seconds))
+        if self.settings.cache is not None and chunk.cache_key is not None:
+            try:
+                self.settings.cache.store(chunk.cache_key, chunk.output_path)
+            except OSError as exc:
+                logger.warning("Could not cache %s: %s", chunk.output_path, exc)
+        return None
+
+    @staticmethod
+    def _chunk_metrics(chunk: _Chunk, ocr_span: metrics.Span) -> dict:
+        chunk_metrics = {"ocr": ocr_span.as_dict()}
+        if chunk.split_metrics is not None:
+            chunk_metrics["split"] = chunk.split_metrics
+        return chunk_metrics
+
+    def release_reader(self) -> None:
+        self._reader = None
+
+    def _log_cost_model(self) -> None:
+        """Compare estimated chunk costs with the OCR time they actually took."""
+        if len(self._timings) < 2 or self.settings.dry_run:
+            return
+        total_cost = sum(cost for cost, _ in self._timings)
+        total_seconds = sum(seconds for _, seconds in self._timings)
+        if total_seconds <= 0:
+            return
+        rate = total_seconds / total_cost
+        ratios = sorted(seconds / (cost * rate) for cost, seconds in self._timings)
+        logger.info(
+            "Cost model for %s: %.2fs per cost unit; chunk time vs estimate "
+            "ranged %.2fx-%.2fx (median %.2fx) over %s chunk(s)",
+            self.source_path.name,
+            rate,
+            ratios[0],
+            ratios[-1],
+            ratios[len(ratios) // 2],
+            len(ratios),
+        )
+        self.store.set(
+            ("cost_model",),
+            {
+                "seconds_per_unit": round(rate, 3),
+                "min_ratio": round(ratios[0], 3),
+                "max_ratio": round(ratios[-1], 3),
+                "chunks": len(ratios),
+            },
+        )
+
+    def finish(self) -> Optional[Path]:
+        """Raise the first chunk failure (all of them as :class:`ChunkFailures`
+        with ``keep_going``), otherwise merge; returns the merged path."""
+        self.release_reader()
+        self._log_cost_model()
+        try:
+            if self.abandoned:
+                raise RuntimeError(f"{self.source_path.name} was taken over by another worker")
+            if self.errors and self.settings.keep_going:
+                raise ChunkFailures(self.source_path, self.errors)
+            if self.errors:
+                raise self.errors[min(self.errors)]
+            merged = None
+            if self.merge and not self.settings.dry_run:
+                segments, segment_pages = self._merge_segments()
+                with metrics.span("merge") as merge_span:
+                    merged = _merge_chunks(
+                        segments,
+                        segment_pages,
+                        self.merged_path,
+                        self.store,
+                        self.force,
+                    )
+                self._record_stage(merge_span)
+            if (
+                self.settings.clean
+                and not self.settings.dry_run
+                and self._staged_copy
+                and self._local_input is not None
+                and self._local_input.exists()
+            ):
+                self._local_input.unlink()
+            return merged
+        finally:
+            self.record_status_metrics()
+            self.store.compact()
+
+    def record_status_metrics(self) -> None:
+        """Store the book's elapsed time and the cost of its status writes."""
+        changes: Dict[str, object] = {
+            "status": {
+                "wall_seconds": round(self.store.write_seconds, 4),
+                "bytes": self.store.bytes_written,
+                "pages": 0,
+            }
+        }
+        self.store.update(("metrics", "stages"), changes)
+        if self._started is not None:
+            self.store.update(
+                ("metrics",),
+                {"elapsed_seconds": round(time.perf_counter() - self._started, 3)},
+            )
+
+
+def chunk_sidecars(
+    merged_pdf: Path, store: Optional[StatusStore] = None
+) -> List[Tuple[int, int, Path]]:
+    """``(first_page, last_page, path)`` of the OCRmyPDF sidecars of the
+    chunks merged into ``merged_pdf``.
+
+    The chunks are read from the merge recorded in ``store``, by default the
+    status.json beside ``merged_pdf``. Chunk page numbers are those of the
+    source, which the merge keeps. Chunks restored from the OCR cache, or
+    OCR'd before sidecars were written, have none and are left out.
+    """
+    merged_pdf = Path(merged_pdf)
+    if store is None:
+        store = StatusStore(merged_pdf.parent / "status.json")
+    merge = store.get("merge", default={})
+    merged_name = Path(merge.get("path", "")).name
+    if merge.get("status") != "completed" or merged_name != merged_pdf.name:
+        return []
+    sidecars = []
+    for name, _size, _mtime_ns, page_range in merge.get("inputs", []):
+        match = _CHUNK_NAME.match(name)
+        sidecar = (merged_pdf.parent / "chunks" / name).with_suffix(".txt")
+        if page_range is None and match is not None and sidecar.exists():
+            sidecars.append((int(match.group(1)), int(match.group(2)), sidecar))
+    return sidecars
+
+
+def run_book_jobs(
+    books: Sequence[BookOcrJob],
+    jobs: int = 1,
+    lookahead: int = 2,
+    on_book_done: Optional[
+        Callable[[BookOcrJob, Optional[Path], Optional[BaseException]], None]
+    ] = None,
+    progress_interval: float = DEFAULT_INTERVAL,
+) -> Dict[int, Optional[BaseException]]:
+    """OCR the chunks of ``books`` on one pool of ``jobs`` workers.
+
+    The calling thread prepares books in the given order and splits their
+    chunk inputs ahead of the workers, keeping at most ``lookahead`` prepared
+    inputs waiting for a free worker. Chunks from every book share the same
+    queue, so a large book does not serialize the run and later books fill
+    idle workers. When a book's last chunk finishes, it is finished (merged)
+    on a worker thread and ``on_book_done(book, merged_path, error)`` is called.
+
+    A failed chunk stops only its own book: its queued chunks are dropped and
+    running ones finish. With ``keep_going`` in the settings, the book's other
+    chunks all run and its failures are reported together when it finishes.
+    Returns each book's error (or None), keyed by index.
+
+    Pages done, pages per second and the ETA of the run and of each book
+    being OCR'd are logged every ``progress_interval`` seconds (0 turns this
+    off; see :class:`~src.progress.ProgressTracker`). On Ctrl-C, running OCR
+    commands are killed, no further chunks start, and ``KeyboardInterrupt``
+    is re-raised once the workers have stopped.
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    if lookahead < 0:
+        raise ValueError("lookahead must not be negative")
+
+    prepared_slots = threading.Semaphore(jobs + lookahead)
+    condition = threading.Condition()
+    outstanding: Dict[int, int] = {}
+    submitted_all: Dict[int, bool] = {}
+    results: Dict[int, Optional[BaseException]] = {}
+    tracker = ProgressTracker(progress_interval)
+    for book in books:
+        tracker.add_book(book, book.source_path.stem, book.expected_pages)
+        book.progress = tracker
+
+    def finish_book(index: int) -> None:
+        book = books[index]
+        merged: Optional[Path] = None
+        error: Optional[BaseException] = None
+        try:
+            merged = book.finish()
         except Exception as exc:
-            record["status"] = "failed"
-            record["last_error"] = str(exc)
-            chunk_records[chunk_name] = record
-            _write_status(status_path, status_data)
-            raise
+            error = exc
+        if on_book_done is not None:
+            try:
+                on_book_done(book, merged, error)
+            except Exception:
+                logger.exception("Book completion handler failed for %s", book.source_path)
+        with condition:
+            results[index] = error
+            condition.notify_all()
+
+    def book_fail_early(index: int, exc: BaseException) -> None:
+        logger.error("Could not prepare %s: %s", books[index].source_path, exc)
+        if on_book_done is not None:
+            on_book_done(books[index], None, exc)
+        with condition:
+            results[index] = exc
+            condition.notify_all()
+
+    def chunk_task(index: int, chunk: _Chunk, split_seconds: float) -> None:
+        try:
+            books[index].run_chunk(chunk, split_seconds)
         finally:
-            if chunk_input.exists():
-                chunk_input.unlink()
+            prepared_slots.release()
+            with condition:
+                outstanding[index] -= 1
+                last = outstanding[index] == 0 and submitted_all[index]
+            if last:
+                finish_book(index)
+
+    executor = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="ocr-chunk")
+    tracker.start()
+    try:
+        for index, book in enumerate(books):
+            with condition:
+                outstanding[index] = 0
+                submitted_all[index] = False
+            try:
+                if not book.prepared:
+                    book.prepare()
+            except Exception as exc:
+                tracker.planned(book)
+                book_fail_early(index, exc)
+                continue
+
+            for chunk in book.pending_chunks():
+                if book.fetch_cached(chunk):
+                    continue
+                acquired = False
+                while not acquired and not book.failed.is_set():
+                    acquired = prepared_slots.acquire(timeout=0.2)
+                if book.failed.is_set():
+                    if acquired:
+                        prepared_slots.release()
+                    break
+                split_seconds = book.split(chunk)
+                if split_seconds is None:
+                    prepared_slots.release()
+                    if book.failed.is_set():
+                        break
+                    continue
+                with condition:
+                    outstanding[index] += 1
+                tracker.queue(book, chunk.pages)
+                # Chunk threads inherit the caller's context (e.g. the daemon's job).
+                executor.submit(
+                    contextvars.copy_context().run, chunk_task, index, chunk, split_seconds
+                )
+
+            # The reader is only needed for splitting.
+            book.release_reader()
+            tracker.planned(book)
+            with condition:
+                submitted_all[index] = True
+                idle = outstanding[index] == 0
+            if idle:
+                executor.submit(contextvars.copy_context().run, finish_book, index)
+
+        with condition:
+            while len(results) < len(books):
+                condition.wait(timeout=0.5)
+    except KeyboardInterrupt:
+        for book in books:
+            book.failed.set()
+        stopped = cancel_commands()
+        pools = {id(book.settings.inprocess_pool): book.settings.inprocess_pool for book in books}
+        stopped += sum(pool.cancel() for pool in pools.values() if pool is not None)
+        logger.warning("Interrupted; stopped %s running OCR command(s)", stopped)
+        raise
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        tracker.stop()
+        reset_cancellation()
+    return results
 
-        chunk_records[chunk_name] = record
-        _write_status(status_path, status_data)
 
-    if clean and not dry_run and source_path != local_input and local_input.exists():
-        local_input.unlink()
+def ocr_pdf_in_chunks(
+    input_pdf: str,
+    workdir: str,
+    chunk_size: int = 25,
+    lang: str = "eng",
+    clean: bool = False,
+    dry_run: bool = False,
+    force: bool = False,
+    backend: str = "auto",
+    jobs: int = 1,
+    reuse_containers: bool = False,
+    staging: str = "auto",
+    lookahead: int = 2,
+    merge: bool = True,
+    cache_dir: Optional[Path] = None,
+    cache_max_bytes: int = DEFAULT_MAX_BYTES,
+    prescan: bool = True,
+    chunking: str = "fixed",
+    min_chunk_pages: int = 1,
+    max_chunk_pages: Optional[int] = None,
+    retry: Optional[RetryPolicy] = None,
+    keep_going: bool = False,
+    scratch_dir: Optional[Path] = None,
+    scratch_reserve_bytes: int = DEFAULT_RESERVE_BYTES,
+    profile: str = DEFAULT_PROFILE,
+    cpus: Optional[int] = None,
+    progress_interval: float = DEFAULT_INTERVAL,
+) -> List[Path]:
+    """OCR ``input_pdf`` in page chunks, running up to ``jobs`` chunks at once.
+
+    The book is staged, pre-scanned and cut into chunks as described on
+    :class:`BookOcrJob`. The options its chunks share go into
+    :class:`OcrSettings`; see :class:`RetryPolicy` for ``retry`` and
+    ``keep_going``, and :class:`~src.scratch.ScratchSpace` for ``scratch_dir``.
+    Chunks run through :func:`run_book_jobs`. Progress is recorded in
+    ``workdir/status.json``, so an interrupted call resumes where it stopped.
+
+    Returns the OCR'd chunk paths in page order, after merging them into
+    ``workdir/<source stem>_ocr.pdf`` when ``merge`` is set.
+    """
+    _check_backend(backend)
+    workdir_path = Path(workdir)
+    workdir_path.mkdir(parents=True, exist_ok=True)
+
+    settings = OcrSettings(
+        backend=backend,
+        workdir=workdir_path,
+        lang=lang,
+        clean=clean,
+        dry_run=dry_run,
+        retry=retry or RetryPolicy(),
+        keep_going=keep_going,
+        profile=get_profile(profile),
+        cpu_budget=CpuBudget.for_jobs(jobs, cpus),
+        cache=OcrCache(cache_dir, cache_max_bytes) if cache_dir else None,
+        scratch=ScratchSpace(scratch_dir, scratch_reserve_bytes) if scratch_dir else None,
+    )
+    book = BookOcrJob(
+        Path(input_pdf),
+        workdir_path,
+        settings,
+        chunk_size=chunk_size,
+        force=force,
+        staging=staging,
+        merge=merge,
+        prescan=prescan,
+        chunking=chunking,
+        min_chunk_pages=min_chunk_pages,
+        max_chunk_pages=max_chunk_pages,
+    )
+    book.prepare()
+    if book.needs_ocr:
+        settings.backend = resolve_backend(backend)
+    else:
+        logger.info("%s has a text layer on every page; skipping OCR", book.source_path)
+        settings.backend = "none"
+
+    with backend_pools(settings, jobs, reuse_containers):
+        results = run_book_jobs(
+            [book], jobs=jobs, lookahead=lookahead, progress_interval=progress_interval
+        )
+        if settings.docker_pool is not None:
+            settings.docker_pool.close()
+            book.store.set(("docker_pool",), settings.docker_pool.summary())
+            book.store.compact()
 
-    return chunk_paths
+    error = results.get(0)
+    if error is not None:
+        raise error
+    return book.chunk_paths
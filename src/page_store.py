@@ -0,0 +1,209 @@
+"""Packed page-text store with constant-time random page access.
+
+File layout (little-endian)::
+
+    header      magic, version, book count, book table offset, page index offset
+    page data   one blob per page, UTF-8, optionally zlib-compressed
+    page index  16 bytes per page: data offset (u64), length (u32), flags (u8)
+    book table  JSON list of {"name", "first", "pages"}
+
+Reading page N of a book is one index lookup and one slice of the mapped
+file, so only the pages asked for are touched.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"LBPAGES\x00"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIQQ")
+_ENTRY = struct.Struct("<QIB3x")
+_FLAG_ZLIB = 1
+# Pages shorter than this are stored as-is; zlib gains little on them.
+_MIN_COMPRESS_BYTES = 256
+
+_MARKER = re.compile(r"===== PAGE (\d+) =====")
+
+
+class PageStoreWriter:
+    """Write books' page text into a new store at ``path``.
+
+    Pages are written as they are added; only the 16-byte index entries are
+    kept in memory. The file is built as ``<path>.part`` and renamed into
+    place by :meth:`close`.
+    """
+
+    def __init__(self, path: Path, compress: bool = False) -> None:
+        self.path = Path(path)
+        self.compress = compress
+        self._part_path = self.path.with_name(self.path.name + ".part")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self._part_path.open("wb")
+        self._handle.write(_HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self._entries: List[bytes] = []
+        self._books: List[dict] = []
+        self._names: set = set()
+
+    def __enter__(self) -> "PageStoreWriter":
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._handle.close()
+            self._part_path.unlink(missing_ok=True)
+
+    def add_book(self, name: str, pages: Iterable[str]) -> int:
+        """Append a book's pages, in order; returns the number of pages."""
+        if name in self._names:
+            raise ValueError(f"Book '{name}' is already in {self.path}.")
+        first = len(self._entries)
+        for text in pages:
+            data = text.encode("utf-8")
+            flags = 0
+            if self.compress and len(data) >= _MIN_COMPRESS_BYTES:
+                packed = zlib.compress(data, 6)
+                if len(packed) < len(data):
+                    data, flags = packed, _FLAG_ZLIB
+            self._entries.append(_ENTRY.pack(self._handle.tell(), len(data), flags))
+            self._handle.write(data)
+        count = len(self._entries) - first
+        self._names.add(name)
+        self._books.append({"name": name, "first": first, "pages": count})
+        return count
+
+    def close(self) -> Path:
+        if self._handle.closed:
+            return self.path
+        index_offset = self._handle.tell()
+        self._handle.write(b"".join(self._entries))
+        books_offset = self._handle.tell()
+        self._handle.write(json.dumps(self._books, separators=(",", ":")).encode("utf-8"))
+        self._handle.seek(0)
+        self._handle.write(
+            _HEADER.pack(MAGIC, VERSION, len(self._books), books_offset, index_offset)
+        )
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._handle.close()
+        os.replace(self._part_path, self.path)
+        logger.info(
+            "Packed %s page(s) of %s book(s) into %s",
+            len(self._entries),
+            len(self._books),
+            self.path,
+        )
+        return self.path
+
+
+class PageStore:
+    """Read-only, memory-mapped access to a page store."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._handle = self.path.open("rb")
+        try:
+            self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as exc:
+            self._handle.close()
+            raise ValueError(f"{self.path} is not a page store.") from exc
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{self.path} is not a page store.")
+        magic, version, _, books_offset, self._index_offset = _HEADER.unpack_from(
+            self._map
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} page store.")
+        books = json.loads(self._map[books_offset:].decode("utf-8"))
+        self._books: Dict[str, Tuple[int, int]] = {
+            book["name"]: (book["first"], book["pages"]) for book in books
+        }
+
+    def __enter__(self) -> "PageStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._handle.close()
+
+    @property
+    def books(self) -> List[str]:
+        return list(self._books)
+
+    def _book(self, book: Optional[str]) -> Tuple[int, int]:
+        if book is None:
+            if len(self._books) != 1:
+                raise ValueError(
+                    f"{self.path} holds {len(self._books)} books; name the one to read."
+                )
+            return next(iter(self._books.values()))
+        try:
+            return self._books[book]
+        except KeyError:
+            raise KeyError(f"No book '{book}' in {self.path}.") from None
+
+    def page_count(self, book: Optional[str] = None) -> int:
+        return self._book(book)[1]
+
+    def get_page(self, page_number: int, book: Optional[str] = None) -> str:
+        """Return the text of 1-based ``page_number``; ``book`` may be omitted
+        for a single-book store."""
+        first, pages = self._book(book)
+        if not 1 <= page_number <= pages:
+            raise IndexError(f"Page {page_number} is out of range 1-{pages}.")
+        offset, length, flags = _ENTRY.unpack_from(
+            self._map, self._index_offset + (first + page_number - 1) * _ENTRY.size
+        )
+        data = self._map[offset : offset + length]
+        if flags & _FLAG_ZLIB:
+            data = zlib.decompress(data)
+        return data.decode("utf-8")
+
+    def iter_pages(self, book: Optional[str] = None) -> Iterator[str]:
+        for page_number in range(1, self.page_count(book) + 1):
+            yield self.get_page(page_number, book)
+
+
+def read_text_pages(text_path: Path) -> Iterator[str]:
+    """Yield the page texts of a ``===== PAGE NNNN =====`` text file, streaming."""
+    lines: Optional[List[str]] = None
+    with text_path.open("r", encoding="utf-8", newline="") as handle:
+        for line in handle:
+            if _MARKER.fullmatch(line.rstrip("\r\n")):
+                if lines is not None:
+                    # The newline before a marker separates pages.
+                    yield "".join(lines)[:-1]
+                lines = []
+            elif lines is not None:
+                lines.append(line)
+    if lines is not None:
+        yield "".join(lines)
+
+
+def pack_text_files(
+    text_paths: Sequence[Path], store_path: Path, compress: bool = False
+) -> Path:
+    """Pack extracted ``.txt`` files into one store, one book per file stem."""
+    with PageStoreWriter(store_path, compress=compress) as writer:
+        for text_path in text_paths:
+            writer.add_book(text_path.stem, read_text_pages(text_path))
+    return store_path
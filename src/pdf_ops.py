@@ -1,52 +1,299 @@
+"""PDF helper operations."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections import deque
 from pathlib import Path
-from typing import Iterable
+from typing import BinaryIO, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NullObject,
+    PdfObject,
+    StreamObject,
+)
+
+from .metrics import count
+
+logger = logging.getLogger(__name__)
 
-from pypdf import PdfReader, PdfWriter
+_CATALOG_ID = 1
+_PAGES_ID = 2
+_PDF_HEADER = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"
 
+# A whole PDF, or ``(path, first_page, last_page)`` with 1-based inclusive pages.
+MergeInput = Union[Path, Tuple[Path, int, int]]
+
+
+def count_pages(pdf_path: Path) -> int:
+    """Pages in ``pdf_path``, read from the page tree's ``/Count``.
+
+    The reader is given an open file rather than a path, so only the trailer,
+    the cross-reference table and the catalog are read, not the whole file.
+    The page tree is walked only if the root ``/Count`` is missing or invalid.
+    """
+    with open(pdf_path, "rb") as handle:
+        reader = PdfReader(handle)
+        try:
+            page_count = reader.trailer["/Root"]["/Pages"]["/Count"]
+        except (KeyError, TypeError, AttributeError):
+            page_count = None
+        if isinstance(page_count, int) and page_count > 0:
+            return int(page_count)
+        return len(reader.pages)
+
+
+class _StreamingPdfWriter:
+    """Write a PDF object by object, copying pages from one reader at a time.
+
+    Unlike ``PdfWriter``, objects are serialized as soon as they are copied, so
+    only the current input's reader is held in memory. The page tree and the
+    catalog are written by :meth:`finish`.
+    """
 
-def merge_pdfs(chunk_paths: Iterable[Path], merged_path: Path) -> Path:
-    writer = PdfWriter()
-    expected_pages = 0
+    def __init__(
+        self,
+        handle: BinaryIO,
+        offsets: Optional[Dict[int, int]] = None,
+        kids: Optional[List[int]] = None,
+        next_id: int = _PAGES_ID + 1,
+    ) -> None:
+        self.handle = handle
+        self.offsets: Dict[int, int] = offsets or {}
+        self.kids: List[int] = kids or []
+        self.next_id = next_id
+        if handle.tell() == 0:
+            handle.write(_PDF_HEADER)
 
-    for chunk_path in chunk_paths:
-        reader = PdfReader(str(chunk_path))
-        expected_pages += len(reader.pages)
-        for page in reader.pages:
-            writer.add_page(page)
+    def _write_object(self, object_id: int, obj: PdfObject) -> None:
+        self.offsets[object_id] = self.handle.tell()
+        self.handle.write(f"{object_id} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(self.handle)
+        self.handle.write(b"\nendobj\n")
 
-    merged_path.parent.mkdir(parents=True, exist_ok=True)
-    with merged_path.open("wb") as output_file:
-        writer.write(output_file)
+    def copy_pages(self, reader: PdfReader, page_indices: Sequence[int]) -> int:
+        """Copy ``page_indices`` of ``reader`` and everything they reference."""
+        pages = [reader.pages[index] for index in page_indices]
+        selected = {
+            (page.indirect_reference.idnum, page.indirect_reference.generation)
+            for page in pages
+        }
+        mapping: Dict[Tuple[int, int], int] = {}
+        queue: Deque[Tuple[int, IndirectObject]] = deque()
 
-    merged_reader = PdfReader(str(merged_path))
-    merged_count = len(merged_reader.pages)
+        def remap(value: PdfObject) -> PdfObject:
+            if isinstance(value, IndirectObject):
+                key = (value.idnum, value.generation)
+                if key not in mapping:
+                    target = value.get_object()
+                    if isinstance(target, DictionaryObject):
+                        node_type = target.get("/Type")
+                        if node_type == "/Pages":
+                            return IndirectObject(_PAGES_ID, 0, None)
+                        if node_type == "/Page" and key not in selected:
+                            # e.g. a link to a page that is not being copied.
+                            return NullObject()
+                    mapping[key] = self.next_id
+                    self.next_id += 1
+                    queue.append((mapping[key], value))
+                return IndirectObject(mapping[key], 0, None)
+            if isinstance(value, StreamObject):
+                copied = value.__class__()
+                copied._data = value._data
+                for key, item in value.items():
+                    if key != "/Length":
+                        copied[NameObject(key)] = remap(item)
+                return copied
+            if isinstance(value, DictionaryObject):
+                copied_dict = DictionaryObject()
+                for key, item in value.items():
+                    copied_dict[NameObject(key)] = remap(item)
+                return copied_dict
+            if isinstance(value, ArrayObject):
+                return ArrayObject(remap(item) for item in value)
+            return value
 
-    if merged_count != expected_pages:
-        raise ValueError(
-            f"Merged PDF page count mismatch: expected {expected_pages}, got {merged_count}."
+        for page in pages:
+            page_id = remap(page.indirect_reference)
+            assert isinstance(page_id, IndirectObject)
+            self.kids.append(page_id.idnum)
+            while queue:
+                object_id, reference = queue.popleft()
+                copied = remap(reference.get_object())
+                if isinstance(copied, DictionaryObject) and copied.get("/Type") == "/Page":
+                    copied[NameObject("/Parent")] = IndirectObject(_PAGES_ID, 0, None)
+                self._write_object(object_id, copied)
+        return len(pages)
+
+    def finish(self) -> None:
+        kids = " ".join(f"{kid} 0 R" for kid in self.kids)
+        pages = f"<< /Type /Pages /Kids [ {kids} ] /Count {len(self.kids)} >>"
+        catalog = f"<< /Type /Catalog /Pages {_PAGES_ID} 0 R >>"
+        for object_id, body in ((_PAGES_ID, pages), (_CATALOG_ID, catalog)):
+            self.offsets[object_id] = self.handle.tell()
+            self.handle.write(f"{object_id} 0 obj\n{body}\nendobj\n".encode("ascii"))
+
+        xref_offset = self.handle.tell()
+        size = self.next_id
+        lines = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+        for object_id in range(1, size):
+            offset = self.offsets.get(object_id)
+            if offset is None:
+                lines.append("0000000000 65535 f \n")
+            else:
+                lines.append(f"{offset:010d} 00000 n \n")
+        lines.append(
+            f"trailer\n<< /Size {size} /Root {_CATALOG_ID} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
         )
+        self.handle.write("".join(lines).encode("ascii"))
 
-    return merged_path
-"""PDF helper operations."""
 
-from __future__ import annotations
+def _write_checkpoint(checkpoint_path: Path, payload: dict) -> None:
+    tmp_path = checkpoint_path.with_name(checkpoint_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+    os.replace(tmp_path, checkpoint_path)
 
-import logging
-from pathlib import Path
 
-from pypdf import PdfReader
+def _load_checkpoint(
+    checkpoint_path: Path, part_path: Path, inputs: List[list]
+) -> Optional[dict]:
+    if not checkpoint_path.exists() or not part_path.exists():
+        return None
+    try:
+        checkpoint = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+    if checkpoint.get("inputs") != inputs:
+        return None
+    if part_path.stat().st_size < checkpoint.get("size", 0):
+        return None
+    return checkpoint
 
-logger = logging.getLogger(__name__)
 
+def _split_merge_input(item: MergeInput) -> Tuple[Path, Optional[Tuple[int, int]]]:
+    if isinstance(item, tuple):
+        path, first_page, last_page = item
+        return Path(path), (first_page, last_page)
+    return Path(item), None
 
-def count_pages(pdf_path: Path) -> int:
-    reader = PdfReader(str(pdf_path))
-    return len(reader.pages)
 
+def merge_pdfs(
+    inputs: Sequence[MergeInput],
+    output_path: Path,
+    expected_pages: Optional[Sequence[int]] = None,
+) -> Path:
+    """Merge ``inputs`` into ``output_path`` with bounded memory.
 
-def merge_pdfs(inputs: list[Path], output_path: Path) -> None:
-    """Placeholder for merging PDFs.
+    Each input is a whole PDF or a ``(path, first_page, last_page)`` range, so
+    OCR'd chunks can be interleaved with untouched pages of the source.
 
-    This is a stub to be implemented later.
+    Pages are streamed to ``<output>.part`` one input at a time, so peak memory
+    depends on the largest input rather than the whole book. After each input a
+    checkpoint (``<output>.part.json``) is saved; an interrupted merge of the
+    same inputs resumes from the last completed input. The finished file is
+    moved into place with an atomic rename.
+
+    ``expected_pages`` gives the page count each input should contribute (for
+    OCR chunks this is known from the chunk's page range), so the result is
+    checked without re-parsing the merged file.
     """
-    logger.info("merge_pdfs placeholder: %s -> %s", inputs, output_path)
+    segments = [_split_merge_input(item) for item in inputs]
+    if expected_pages is not None and len(expected_pages) != len(segments):
+        raise ValueError("expected_pages must have one entry per input.")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = output_path.with_name(output_path.name + ".part")
+    checkpoint_path = output_path.with_name(output_path.name + ".part.json")
+    input_names = [
+        [
+            str(path),
+            path.stat().st_size,
+            path.stat().st_mtime_ns,
+            list(page_range) if page_range else None,
+        ]
+        for path, page_range in segments
+    ]
+
+    checkpoint = _load_checkpoint(checkpoint_path, part_path, input_names)
+    if checkpoint is not None:
+        handle = part_path.open("r+b")
+        handle.truncate(checkpoint["size"])
+        handle.seek(checkpoint["size"])
+        writer = _StreamingPdfWriter(
+            handle,
+            offsets={int(key): value for key, value in checkpoint["offsets"].items()},
+            kids=checkpoint["kids"],
+            next_id=checkpoint["next_id"],
+        )
+        first_input = checkpoint["done"]
+        logger.info(
+            "Resuming merge into %s after %s of %s input(s)",
+            output_path,
+            first_input,
+            len(segments),
+        )
+    else:
+        handle = part_path.open("wb")
+        writer = _StreamingPdfWriter(handle)
+        first_input = 0
+
+    try:
+        for index in range(first_input, len(segments)):
+            input_path, page_range = segments[index]
+            reader = PdfReader(str(input_path))
+            page_total = len(reader.pages)
+            if page_range is None:
+                page_indices = range(page_total)
+            elif 1 <= page_range[0] <= page_range[1] <= page_total:
+                page_indices = range(page_range[0] - 1, page_range[1])
+            else:
+                raise ValueError(
+                    f"{input_path.name} has {page_total} pages; "
+                    f"cannot take pages {page_range[0]}-{page_range[1]}."
+                )
+            if expected_pages is not None and len(page_indices) != expected_pages[index]:
+                raise ValueError(
+                    f"{input_path.name} has {len(page_indices)} pages, "
+                    f"expected {expected_pages[index]}."
+                )
+            writer.copy_pages(reader, page_indices)
+            del reader
+            count(pages=len(page_indices), bytes=input_path.stat().st_size)
+
+            handle.flush()
+            os.fsync(handle.fileno())
+            _write_checkpoint(
+                checkpoint_path,
+                {
+                    "inputs": input_names,
+                    "done": index + 1,
+                    "size": handle.tell(),
+                    "offsets": writer.offsets,
+                    "kids": writer.kids,
+                    "next_id": writer.next_id,
+                },
+            )
+
+        if expected_pages is not None and len(writer.kids) != sum(expected_pages):
+            raise ValueError(
+                f"Merged PDF page count mismatch: expected {sum(expected_pages)}, "
+                f"got {len(writer.kids)}."
+            )
+        writer.finish()
+        handle.flush()
+        os.fsync(handle.fileno())
+    finally:
+        handle.close()
+
+    os.replace(part_path, output_path)
+    checkpoint_path.unlink(missing_ok=True)
+    logger.info("Merged %s page(s) into %s", len(writer.kids), output_path)
+    return output_path
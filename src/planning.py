@@ -0,0 +1,271 @@
+"""Plan a library run: page counts, a wall-time estimate and the book order."""
+
+from __future__ import annotations
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import metrics
+from .batch_folder import iter_pdfs
+from .pdf_ops import count_pages
+from .prescan import needs_ocr
+from .profiles import DEFAULT_PROFILE
+from .progress import format_duration
+from .status_store import StatusStore
+
+logger = logging.getLogger(__name__)
+
+PAGE_COUNT_CACHE = "page_counts.json"
+# What simulate() assumes about chunking, stated in every plan.
+SCHEDULE_MODEL = (
+    "contiguous chunks of chunk_size OCR pages at one rate per page; "
+    "no cost-balanced chunks, text gaps or lookahead"
+)
+DEFAULT_SCAN_JOBS = 8
+# OCR seconds per page of one chunk, assumed when no earlier run has timings.
+DEFAULT_SECONDS_PER_PAGE = 2.0
+
+
+@dataclass
+class BookPlan:
+    name: str
+    path: Path
+    size: int
+    pages: Optional[int] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class Rates:
+    """Throughput measured in earlier runs, or assumed without them.
+
+    ``seconds_per_page`` is OCR wall time per page of one chunk, so ``jobs``
+    concurrent chunks OCR ``jobs / seconds_per_page`` pages a second.
+    ``ocr_fraction`` is the share of pages the prescan sent to OCR, and
+    ``other_seconds_per_page`` the time of the other stages per book page.
+    """
+
+    seconds_per_page: float = DEFAULT_SECONDS_PER_PAGE
+    ocr_fraction: float = 1.0
+    other_seconds_per_page: float = 0.0
+    ocr_pages: int = 0
+    source: str = "no earlier runs"
+
+
+def _scan_one(pdf_path: Path, cache: Optional[StatusStore]) -> BookPlan:
+    key = str(pdf_path.resolve())
+    try:
+        stat = pdf_path.stat()
+    except OSError as exc:
+        return BookPlan(pdf_path.stem, pdf_path, 0, error=str(exc))
+    book = BookPlan(pdf_path.stem, pdf_path, stat.st_size)
+    entry = cache.get(key) if cache is not None else None
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        book.pages = entry["pages"]
+        book.cached = True
+        return book
+    try:
+        book.pages = count_pages(pdf_path)
+    except Exception as exc:
+        book.error = str(exc)
+        return book
+    if cache is not None:
+        cache.set(
+            (key,), {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "pages": book.pages}
+        )
+    return book
+
+
+def scan_library(
+    input_folder: Path,
+    cache_path: Optional[Path] = None,
+    jobs: int = DEFAULT_SCAN_JOBS,
+) -> List[BookPlan]:
+    """Count the pages of every PDF in ``input_folder``, ``jobs`` at a time.
+
+    Counts are kept in the status store at ``cache_path`` by resolved path,
+    with the file's size and mtime; a file whose size and mtime still match
+    is not opened again. Reading a count is mostly waiting on the disk or
+    network share, so the files are read on threads.
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    pdfs = list(iter_pdfs(Path(input_folder)))
+    cache = StatusStore(cache_path) if cache_path is not None else None
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            books = list(pool.map(lambda path: _scan_one(path, cache), pdfs))
+    finally:
+        if cache is not None:
+            cache.close()
+    for book in books:
+        if book.error:
+            logger.error("Could not read %s: %s", book.path, book.error)
+    logger.info(
+        "Counted pages of %s PDF(s), %s from the cache",
+        len(books),
+        sum(book.cached for book in books),
+    )
+    return books
+
+
+def historical_rates(
+    runs_folder: Path, profile: str = DEFAULT_PROFILE, prescan: bool = True
+) -> Rates:
+    """OCR and pipeline throughput of every earlier run under ``runs_folder``.
+
+    The OCR rate of ``profile`` is used when earlier runs OCR'd with it, and
+    that of all profiles together otherwise.
+    """
+    runs_folder = Path(runs_folder)
+    statuses = metrics.load_statuses(runs_folder) if runs_folder.is_dir() else []
+    summary = metrics.summarize(statuses)
+    rates = Rates()
+    profiles = summary["profiles"]
+    if profile in profiles:
+        measured = [profiles[profile]]
+        rates.source = f"{profile} OCR in earlier runs"
+    else:
+        measured = list(profiles.values())
+        if measured:
+            rates.source = f"OCR in earlier runs with {', '.join(sorted(profiles))}"
+    ocr_pages = sum(entry["pages"] for entry in measured)
+    ocr_seconds = sum(entry["wall_seconds"] for entry in measured)
+    if ocr_pages and ocr_seconds:
+        rates.seconds_per_page = ocr_seconds / ocr_pages
+        rates.ocr_pages = ocr_pages
+
+    book_pages = sum(status.get("pages") or 0 for _, status in statuses)
+    other_seconds = sum(
+        stage["wall_seconds"] for name, stage in summary["stages"].items() if name != "ocr"
+    )
+    if book_pages:
+        rates.other_seconds_per_page = other_seconds / book_pages
+
+    scanned = needing_ocr = 0
+    for _, status in statuses:
+        for code, count in status.get("prescan", {}).get("counts", {}).items():
+            scanned += count
+            needing_ocr += count if needs_ocr(code) else 0
+    if prescan and scanned:
+        rates.ocr_fraction = needing_ocr / scanned
+    return rates
+
+
+def simulate(
+    books: Sequence[Tuple[str, int]], jobs: int, chunk_size: int, rates: Rates
+) -> Tuple[float, Dict[str, float]]:
+    """Wall time of running ``books`` in order, and when each one finishes.
+
+    This follows :func:`src.batch_folder.run_books`: the chunks of each book
+    in turn go to whichever of the ``jobs`` workers is free first, and the
+    worker that finishes a book's last chunk then merges and extracts it.
+
+    It is a model of that, not a replay. A book's OCR pages are taken as one
+    run cut into evenly sized chunks of ``chunk_size`` pages, each page costing
+    ``rates.seconds_per_page``. ``--chunking cost`` ranges, the text pages left
+    inside chunks, and the split lookahead are not modelled; they need the
+    prescan, which planning does not run.
+    """
+    workers = [0.0] * jobs
+    finished: Dict[str, float] = {}
+    for name, pages in books:
+        ocr_pages = math.ceil(pages * rates.ocr_fraction)
+        last_worker = min(range(jobs), key=workers.__getitem__)
+        for first in range(0, ocr_pages, chunk_size):
+            worker = min(range(jobs), key=workers.__getitem__)
+            workers[worker] += min(chunk_size, ocr_pages - first) * rates.seconds_per_page
+            if first == 0 or workers[worker] >= workers[last_worker]:
+                last_worker = worker
+        workers[last_worker] += pages * rates.other_seconds_per_page
+        finished[name] = workers[last_worker]
+    return max(workers, default=0.0), finished
+
+
+def plan_library(
+    input_folder: Path,
+    runs_folder: Path,
+    jobs: int = 1,
+    chunk_size: int = 25,
+    profile: str = DEFAULT_PROFILE,
+    prescan: bool = True,
+    scan_jobs: int = DEFAULT_SCAN_JOBS,
+) -> dict:
+    """Page counts, the estimated wall time and the book order for a run of
+    ``input_folder`` with ``jobs`` concurrent chunks.
+
+    Page counts are cached in ``runs_folder/page_counts.json``. Books are
+    ordered longest first, as :func:`src.batch_folder.run_books` queues them,
+    so short books fill idle workers at the end; the estimate for input
+    (alphabetical) order is given for comparison.
+    """
+    if jobs < 1 or chunk_size < 1:
+        raise ValueError("jobs and chunk_size must be at least 1")
+    runs_folder = Path(runs_folder)
+    runs_folder.mkdir(parents=True, exist_ok=True)
+    books = scan_library(input_folder, runs_folder / PAGE_COUNT_CACHE, scan_jobs)
+    rates = historical_rates(runs_folder, profile, prescan)
+    readable = [book for book in books if book.pages is not None]
+    order = sorted(readable, key=lambda book: (-book.pages, book.name))
+    wall, finished = simulate([(b.name, b.pages) for b in order], jobs, chunk_size, rates)
+    input_wall, _ = simulate([(b.name, b.pages) for b in readable], jobs, chunk_size, rates)
+    return {
+        "books": len(readable),
+        "unreadable": [str(book.path) for book in books if book.pages is None],
+        "pages": sum(book.pages for book in readable),
+        "bytes": sum(book.size for book in readable),
+        "cached_counts": sum(book.cached for book in readable),
+        "jobs": jobs,
+        "chunk_size": chunk_size,
+        "model": SCHEDULE_MODEL,
+        "profile": profile,
+        "rates": {
+            key: round(value, 4) if isinstance(value, float) else value
+            for key, value in asdict(rates).items()
+        },
+        "estimated_seconds": round(wall, 1),
+        "input_order_seconds": round(input_wall, 1),
+        "order": [
+            {
+                "book": book.name,
+                "path": str(book.path),
+                "pages": book.pages,
+                "bytes": book.size,
+                "finishes_at_seconds": round(finished[book.name], 1),
+            }
+            for book in order
+        ],
+    }
+
+
+def format_plan(plan: dict, top: Optional[int] = None) -> str:
+    rates = plan["rates"]
+    lines = [
+        f"{plan['books']} book(s), {plan['pages']} page(s), "
+        f"{plan['bytes'] / 1e6:.1f} MB ({plan['cached_counts']} page count(s) cached)",
+        f"OCR: {rates['seconds_per_page']:.2f}s/page per chunk, "
+        f"{100 * rates['ocr_fraction']:.0f}% of pages, from {rates['source']}",
+        f"Estimated wall time with {plan['jobs']} job(s): "
+        f"{format_duration(plan['estimated_seconds'])} "
+        f"(input order: {format_duration(plan['input_order_seconds'])})",
+        f"Assumes {plan['model']}",
+    ]
+    if plan["unreadable"]:
+        lines.append(f"Unreadable: {', '.join(plan['unreadable'])}")
+    order = plan["order"] if top is None else plan["order"][:top]
+    if order:
+        lines.extend(["", "Order (longest first):"])
+        width = len(str(len(plan["order"])))
+        for position, book in enumerate(order, start=1):
+            lines.append(
+                f"  {position:>{width}}. {book['book']}: {book['pages']} page(s), "
+                f"done after {format_duration(book['finishes_at_seconds'])}"
+            )
+        if len(order) < len(plan["order"]):
+            lines.append(f"  ... {len(plan['order']) - len(order)} more")
+    return "\n".join(lines)
@@ -0,0 +1,146 @@
+"""Fast per-page classification of PDFs before OCR."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+TEXT = "t"
+IMAGE = "i"
+BLANK = "b"
+# Stored with saved scans; bumped when pages would be classified differently.
+SCAN_VERSION = 2
+
+_MAX_FORM_DEPTH = 3
+# Content stream operators that show text: Tj, TJ, ' and ".
+_TEXT_OPERATORS = frozenset((b"Tj", b"TJ", b"'", b'"'))
+# How pypdf reports an inline image (BI ... ID ... EI).
+_INLINE_IMAGE = b"INLINE IMAGE"
+
+# Estimated OCR cost, in units of roughly one plain scanned page. Every page
+# pays a fixed overhead (rasterizing, page setup); image pages add cost by
+# pixel count (what Tesseract processes) and encoded size (what has to be
+# decoded). Pages with a text layer are left alone by --skip-text.
+_BASE_PAGE_COST = 0.2
+_COST_PER_MEGAPIXEL = 0.08
+_COST_PER_MEGABYTE = 0.1
+_TEXT_PAGE_COST = 0.05
+
+
+@dataclass
+class PageSignals:
+    has_fonts: bool = False
+    images: int = 0
+    pixels: int = 0
+    image_bytes: int = 0
+    shows_text: bool = False
+    forms: List[Any] = field(default_factory=list)
+
+
+def _resource_signals(resources: Any, signals: PageSignals, depth: int = 0) -> None:
+    """Add the fonts, images and form XObjects of a resource dict and its forms."""
+    if resources is None:
+        return
+    resources = resources.get_object()
+    if resources.get("/Font"):
+        signals.has_fonts = True
+    xobjects = resources.get("/XObject")
+    if not xobjects:
+        return
+    for reference in xobjects.get_object().values():
+        xobject = reference.get_object()
+        subtype = xobject.get("/Subtype")
+        if subtype == "/Image":
+            signals.images += 1
+            signals.pixels += int(xobject.get("/Width", 0)) * int(xobject.get("/Height", 0))
+            signals.image_bytes += len(getattr(xobject, "_data", b""))
+        elif subtype == "/Form" and depth < _MAX_FORM_DEPTH:
+            signals.forms.append(xobject)
+            _resource_signals(xobject.get("/Resources"), signals, depth + 1)
+
+
+def _shows_text(operands: Any) -> bool:
+    """Whether the operands of a text-showing operator hold a non-empty string."""
+    for operand in operands:
+        if isinstance(operand, list):
+            if _shows_text(operand):
+                return True
+        elif isinstance(operand, (str, bytes)) and operand:
+            return True
+    return False
+
+
+def _content_signals(contents: Any, signals: PageSignals) -> None:
+    """Add the shown text and inline images of a content stream.
+
+    Only the operators are looked at; fonts are not decoded, so this is much
+    cheaper than extracting the text. Stops at the first string shown.
+    """
+    from pypdf.generic import ContentStream
+
+    try:
+        if not isinstance(contents, ContentStream):
+            contents = ContentStream(contents, None)
+        operations = contents.operations
+    except Exception as exc:
+        logger.debug("Content stream parsing failed during pre-scan: %s", exc)
+        return
+    for operands, operator in operations:
+        if operator in _TEXT_OPERATORS and _shows_text(operands):
+            signals.shows_text = True
+            return
+        if operator == _INLINE_IMAGE:
+            settings = operands["settings"]
+            width = settings.get("/W", settings.get("/Width", 0))
+            height = settings.get("/H", settings.get("/Height", 0))
+            signals.images += 1
+            signals.pixels += int(width) * int(height)
+            signals.image_bytes += len(operands["data"])
+
+
+def scan_page(page: Any) -> Tuple[str, float]:
+    """Classify a page and estimate what OCRing it costs.
+
+    The code is text-bearing, image-only or blank. A page is text-bearing if
+    its content stream, or a form XObject it uses, shows a string (Tj, TJ,
+    ' or "); those are the pages OCRmyPDF's ``--skip-text`` would leave alone
+    anyway. Content streams are parsed only on pages with fonts or without
+    image XObjects, so plain scans are classified from their resources.
+    Inline images count as images.
+    """
+    signals = PageSignals()
+    _resource_signals(page.get("/Resources"), signals)
+    if signals.has_fonts or not signals.images:
+        for contents in [page.get_contents(), *signals.forms]:
+            if contents is not None:
+                _content_signals(contents, signals)
+            if signals.shows_text:
+                break
+    if signals.shows_text:
+        return TEXT, _TEXT_PAGE_COST
+    if not signals.images and not signals.has_fonts:
+        return BLANK, _TEXT_PAGE_COST
+    cost = (
+        _BASE_PAGE_COST
+        + _COST_PER_MEGAPIXEL * signals.pixels / 1e6
+        + _COST_PER_MEGABYTE * signals.image_bytes / 1e6
+    )
+    return IMAGE, cost
+
+
+def scan_pages(reader: Any) -> Tuple[str, List[float]]:
+    """Return one classification code per page (e.g. ``"ttiib"``) and page costs."""
+    codes = []
+    costs = []
+    for page in reader.pages:
+        code, cost = scan_page(page)
+        codes.append(code)
+        costs.append(round(cost, 3))
+    return "".join(codes), costs
+
+
+def needs_ocr(code: str) -> bool:
+    return code == IMAGE
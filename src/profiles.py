@@ -0,0 +1,96 @@
+"""Named OCR speed profiles and the CPU budget shared by concurrent chunks."""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+DEFAULT_PROFILE = "archival"
+
+
+@dataclass(frozen=True)
+class OcrProfile:
+    """OCRmyPDF options that trade speed for output quality and size.
+
+    ``optimize`` is OCRmyPDF's ``--optimize`` level (2 and 3 need pngquant).
+    ``output_type`` None keeps OCRmyPDF's default, PDF/A; ``"pdf"`` skips the
+    Ghostscript PDF/A conversion.
+    """
+
+    name: str
+    optimize: int
+    deskew: bool
+    output_type: Optional[str] = None
+
+
+PROFILES: Dict[str, OcrProfile] = {
+    profile.name: profile
+    for profile in (
+        OcrProfile("fast", optimize=0, deskew=False, output_type="pdf"),
+        OcrProfile("balanced", optimize=1, deskew=True),
+        OcrProfile("archival", optimize=3, deskew=True),
+    )
+}
+
+
+def get_profile(name: str) -> OcrProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown profile '{name}'. Choose from: {', '.join(PROFILES)}."
+        ) from None
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (its affinity mask where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class CpuLimits:
+    """Parallelism of one chunk: OCRmyPDF ``--jobs`` and Tesseract threads."""
+
+    ocr_jobs: int
+    tesseract_threads: int
+
+    def env(self) -> Dict[str, str]:
+        """Environment that caps Tesseract's OpenMP threads."""
+        return {"OMP_THREAD_LIMIT": str(self.tesseract_threads)}
+
+    def as_dict(self) -> dict:
+        return {"ocr_jobs": self.ocr_jobs, "tesseract_threads": self.tesseract_threads}
+
+
+@dataclass(frozen=True)
+class CpuBudget:
+    """Divides ``cpus`` between ``jobs`` concurrent chunks.
+
+    Each chunk gets ``cpus // jobs`` cores (at least one). OCRmyPDF runs one
+    page per core, which parallelises better than Tesseract's own threads, so
+    a chunk uses its cores for pages first; only a chunk with fewer pages than
+    cores gives Tesseract more than one thread per page.
+    """
+
+    jobs: int
+    cpus: int
+
+    def __post_init__(self) -> None:
+        if self.jobs < 1 or self.cpus < 1:
+            raise ValueError("jobs and cpus must be at least 1")
+
+    @classmethod
+    def for_jobs(cls, jobs: int, cpus: Optional[int] = None) -> "CpuBudget":
+        return cls(jobs=jobs, cpus=cpus or available_cpus())
+
+    @property
+    def oversubscribed(self) -> bool:
+        return self.jobs > self.cpus
+
+    def limits(self, pages: int) -> CpuLimits:
+        cores = max(1, self.cpus // self.jobs)
+        ocr_jobs = max(1, min(cores, pages))
+        return CpuLimits(ocr_jobs=ocr_jobs, tesseract_threads=max(1, cores // ocr_jobs))
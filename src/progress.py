@@ -0,0 +1,187 @@
+"""Live OCR progress: pages done, throughput and ETA per book and per run."""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 30.0
+
+
+@dataclass
+class _BookProgress:
+    name: str
+    estimated_pages: Optional[int] = None
+    queued_pages: int = 0
+    planned: bool = False
+    finished_pages: int = 0
+    running: Dict[str, int] = field(default_factory=dict)
+    started: Optional[float] = None
+
+    @property
+    def done(self) -> int:
+        return self.finished_pages + sum(self.running.values())
+
+    @property
+    def total(self) -> int:
+        if self.planned:
+            return self.queued_pages
+        return max(self.queued_pages, self.estimated_pages or 0)
+
+
+def _rate_and_eta(done: int, total: int, started: Optional[float], now: float) -> dict:
+    elapsed = now - started if started is not None else 0.0
+    rate = done / elapsed if elapsed > 0 and done else None
+    return {
+        "pages_done": done,
+        "pages_total": total,
+        "pages_per_second": None if rate is None else round(rate, 3),
+        "eta_seconds": None if rate is None else round(max(total - done, 0) / rate, 1),
+    }
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "unknown"
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m"
+    if minutes:
+        return f"{minutes}m{seconds:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressTracker:
+    """Pages OCR'd so far, per book and for the run, with rate and ETA.
+
+    Books are registered with :meth:`add_book`, optionally with an estimate of
+    their pages that is used until every chunk of the book has been queued
+    (:meth:`queue`, :meth:`planned`). Running chunks report pages done as
+    OCRmyPDF finishes them (:meth:`update`), so throughput moves within a
+    chunk and not only when it completes. Rates are measured from the first
+    chunk started; chunks restored from the cache or an earlier run are not
+    counted.
+
+    :meth:`start` logs a summary every ``interval`` seconds on a background
+    thread, in the caller's context so the job server attributes it to the
+    right job, and :meth:`stop` logs a last one. Each record carries the
+    :meth:`snapshot` as ``progress``.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        self.interval = interval
+        self._books: Dict[Hashable, _BookProgress] = {}
+        self._lock = threading.Lock()
+        self._started: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_book(self, key: Hashable, name: str, estimated_pages: Optional[int] = None) -> None:
+        with self._lock:
+            self._books[key] = _BookProgress(name=name, estimated_pages=estimated_pages)
+
+    def queue(self, key: Hashable, pages: int) -> None:
+        with self._lock:
+            self._books[key].queued_pages += pages
+
+    def planned(self, key: Hashable) -> None:
+        """Every chunk of the book has been queued; its total is now exact."""
+        with self._lock:
+            self._books[key].planned = True
+
+    def update(self, key: Hashable, chunk: str, pages_done: int) -> None:
+        with self._lock:
+            book = self._books[key]
+            now = time.monotonic()
+            if book.started is None:
+                book.started = now
+            if self._started is None:
+                self._started = now
+            book.running[chunk] = pages_done
+
+    def chunk_done(self, key: Hashable, chunk: str, pages: int) -> None:
+        with self._lock:
+            book = self._books[key]
+            book.running.pop(chunk, None)
+            book.finished_pages += pages
+
+    def chunk_stopped(self, key: Hashable, chunk: str) -> None:
+        """A chunk attempt failed; its partial pages no longer count."""
+        with self._lock:
+            self._books[key].running.pop(chunk, None)
+
+    def snapshot(self) -> dict:
+        """``{"run": {...}, "books": {name: {...}}}`` with pages done and
+        total, pages per second and the ETA in seconds of each."""
+        now = time.monotonic()
+        with self._lock:
+            books = {
+                book.name: {
+                    **_rate_and_eta(book.done, book.total, book.started, now),
+                    "running_chunks": len(book.running),
+                }
+                for book in self._books.values()
+            }
+            run = _rate_and_eta(
+                sum(book.done for book in self._books.values()),
+                sum(book.total for book in self._books.values()),
+                self._started,
+                now,
+            )
+        return {"run": run, "books": books}
+
+    def report(self) -> dict:
+        snapshot = self.snapshot()
+        run = snapshot["run"]
+        if self._started is None:
+            return snapshot
+        lines: List[str] = [self._describe("OCR progress", run)]
+        for name, book in snapshot["books"].items():
+            if book["running_chunks"]:
+                lines.append(self._describe(f"  {name}", book))
+        logger.info("\n".join(lines), extra={"progress": snapshot})
+        return snapshot
+
+    @staticmethod
+    def _describe(label: str, stats: dict) -> str:
+        done, total = stats["pages_done"], stats["pages_total"]
+        percent = f" ({100 * done / total:.0f}%)" if total else ""
+        rate = stats["pages_per_second"]
+        if rate is None:
+            return f"{label}: {done}/{total} pages{percent}"
+        return (
+            f"{label}: {done}/{total} pages{percent}, {rate:.2f} pages/s, "
+            f"ETA {format_duration(stats['eta_seconds'])}"
+        )
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        context = contextvars.copy_context()
+        self._thread = threading.Thread(
+            target=context.run,
+            args=(self._report_until_stopped,),
+            name="ocr-progress",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _report_until_stopped(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.report()
+
+    def stop(self) -> None:
+        """Stop reporting, after one last report of the final counts."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.report()
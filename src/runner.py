@@ -2,26 +2,62 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import queue
+import re
 import shlex
 import shutil
+import signal
 import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Optional, Sequence, Tuple
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .metrics import current_span
+from .profiles import DEFAULT_PROFILE, PROFILES, CpuLimits, OcrProfile
 
 logger = logging.getLogger(__name__)
 
+DOCKER_IMAGE = "jbarlow83/ocrmypdf-alpine"
+
 __all__ = [
+    "DOCKER_IMAGE",
+    "CommandCancelled",
+    "CommandResult",
+    "DockerContainerPool",
     "DockerNotFoundError",
     "GhostscriptNotFoundError",
     "OcrmypdfNotFoundError",
     "TesseractNotFoundError",
+    "cache_tool_lookups",
+    "cancel_commands",
     "docker_available",
     "ghostscript_available",
     "local_ocrmypdf_ready",
+    "ocr_progress_listener",
     "ocrmypdf_available",
+    "reset_cancellation",
+    "run_command",
     "run_docker_ocrmypdf",
     "run_local_ocrmypdf",
     "tesseract_available",
@@ -44,6 +80,27 @@ class GhostscriptNotFoundError(RuntimeError):
     pass
 
 
+_tool_paths: Optional[Dict[str, Optional[str]]] = None
+
+
+def cache_tool_lookups(enabled: bool = True) -> None:
+    """Remember where tools were found instead of searching PATH per call.
+
+    Long-lived processes (the job server) turn this on; tools installed or
+    removed afterwards are not noticed until it is turned off again.
+    """
+    global _tool_paths
+    _tool_paths = {} if enabled else None
+
+
+def _which(name: str) -> Optional[str]:
+    if _tool_paths is None:
+        return shutil.which(name)
+    if name not in _tool_paths:
+        _tool_paths[name] = shutil.which(name)
+    return _tool_paths[name]
+
+
 def _format_command_for_display(command: Iterable[str]) -> str:
     if os.name == "nt":
         return subprocess.list2cmdline(list(command))
@@ -51,20 +108,20 @@ def _format_command_for_display(command: Iterable[str]) -> str:
 
 
 def docker_available() -> bool:
-    return shutil.which("docker") is not None
+    return _which("docker") is not None
 
 
 def ocrmypdf_available() -> bool:
-    return shutil.which("ocrmypdf") is not None
+    return _which("ocrmypdf") is not None
 
 
 def tesseract_available() -> bool:
-    return shutil.which("tesseract") is not None
+    return _which("tesseract") is not None
 
 
 def ghostscript_available() -> bool:
     return any(
-        shutil.which(candidate) is not None
+        _which(candidate) is not None
         for candidate in ("gs", "gswin64c", "gswin32c")
     )
 
@@ -77,8 +134,19 @@ def local_ocrmypdf_ready() -> bool:
     )
 
 
+def _container_path(path: Path, mounts: Dict[str, Path]) -> Optional[str]:
+    """``path`` as seen inside a container with ``mounts`` (target -> host)."""
+    resolved = path.resolve()
+    for target, host in mounts.items():
+        try:
+            return f"{target}/{resolved.relative_to(host).as_posix()}"
+        except ValueError:
+            continue
+    return None
+
+
 def _resolve_optimize_level(requested_level: int) -> int:
-    if requested_level in {2, 3} and shutil.which("pngquant") is None:
+    if requested_level in {2, 3} and _which("pngquant") is None:
         logger.warning(
             "pngquant not found; falling back to optimize=1. "
             "Install pngquant to enable optimize=%s.",
@@ -88,6 +156,47 @@ def _resolve_optimize_level(requested_level: int) -> int:
     return requested_level
 
 
+def _ocrmypdf_args(
+    pages_range: Tuple[int, int],
+    lang: str,
+    clean: bool,
+    extra_args: Optional[Iterable[str]],
+    profile: OcrProfile,
+    cpu: Optional[CpuLimits],
+    sidecar: Optional[str] = None,
+) -> List[str]:
+    """OCRmyPDF options shared by the Docker and local runners."""
+    start_page, end_page = pages_range
+    args = ["--skip-text"]
+    if profile.deskew:
+        args.append("--deskew")
+    args.extend(["--optimize", str(_resolve_optimize_level(profile.optimize))])
+    if profile.output_type is not None:
+        args.extend(["--output-type", profile.output_type])
+    if cpu is not None:
+        args.extend(["--jobs", str(cpu.ocr_jobs)])
+    args.extend(["--language", lang, "--pages", f"{start_page}-{end_page}"])
+    if clean:
+        args.append("--clean")
+    if sidecar is not None:
+        args.extend(["--sidecar", sidecar])
+    if extra_args:
+        args.extend(extra_args)
+    return args
+
+
+def _failure_message(
+    tool: str, exc: subprocess.CalledProcessError, log_path: Optional[Path]
+) -> str:
+    lines = (exc.stderr or exc.output or "").splitlines()
+    message = f"{tool} failed with exit code {exc.returncode}"
+    if lines:
+        message += f": {lines[-1].strip()}"
+    if log_path is not None:
+        message += f" (full output in {log_path})"
+    return message + "."
+
+
 def run_docker_ocrmypdf(
     workdir: str,
     in_pdf: str,
@@ -96,56 +205,71 @@ def run_docker_ocrmypdf(
     lang: str,
     clean: bool = False,
     extra_args: Optional[Iterable[str]] = None,
-    timeout_sec: Optional[int] = None,
+    timeout_sec: Optional[float] = None,
     dry_run: bool = False,
+    container: Optional[str] = None,
+    scratch: Optional[str] = None,
+    profile: OcrProfile = PROFILES[DEFAULT_PROFILE],
+    cpu: Optional[CpuLimits] = None,
+    log_path: Optional[Path] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    sidecar: Optional[str] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
 ) -> str:
-    workdir_path = Path(workdir).resolve()
-    in_path = Path(in_pdf).resolve()
-    out_path = Path(out_pdf).resolve()
-
-    try:
-        rel_in = in_path.relative_to(workdir_path)
-        rel_out = out_path.relative_to(workdir_path)
-    except ValueError as exc:
-        raise ValueError("Input and output PDFs must be within the workdir.") from exc
+    """Run OCRmyPDF in Docker on a PDF inside ``workdir``.
+
+    By default a fresh container is started per call. When ``container`` names
+    a running container from a :class:`DockerContainerPool` (with ``workdir``
+    mounted at ``/data``), the job is sent to it with ``docker exec`` instead.
+    The input may also live in ``scratch``, which is mounted at ``/scratch``.
+    ``profile`` selects the speed/quality options and ``cpu`` caps OCRmyPDF's
+    page jobs and Tesseract's threads inside the container. With ``sidecar``
+    (a path within ``workdir``), the recognized text is written there too.
+
+    The command runs on the shared engine (see :func:`run_command`): its
+    output is captured to ``log_path``, ``progress`` is called with the
+    number of pages OCRmyPDF reports done, and it is stopped once
+    ``cancelled()`` returns True.
+    """
+    mounts = {"/data": Path(workdir).resolve()}
+    if scratch is not None:
+        mounts["/scratch"] = Path(scratch).resolve()
+    in_container = _container_path(Path(in_pdf), mounts)
+    out_container = _container_path(Path(out_pdf), {"/data": mounts["/data"]})
+    sidecar_container = (
+        None if sidecar is None else _container_path(Path(sidecar), {"/data": mounts["/data"]})
+    )
+    if (
+        in_container is None
+        or out_container is None
+        or (sidecar is not None and sidecar_container is None)
+    ):
+        raise ValueError(
+            "The input PDF must be within the workdir or scratch folder, "
+            "and the output PDF and sidecar within the workdir."
+        )
 
-    if shutil.which("docker") is None:
+    if _which("docker") is None:
         raise DockerNotFoundError(
             "Docker not found. Install Docker Desktop and ensure 'docker' is on PATH."
         )
 
-    start_page, end_page = pages_range
-    pages_spec = f"{start_page}-{end_page}"
-
-    optimize_level = _resolve_optimize_level(3)
-    args = [
-        "--skip-text",
-        "--deskew",
-        "--optimize",
-        str(optimize_level),
-        "--language",
-        lang,
-        "--pages",
-        pages_spec,
+    args = _ocrmypdf_args(pages_range, lang, clean, extra_args, profile, cpu, sidecar_container)
+    env_args = [] if cpu is None else [
+        part for name, value in cpu.env().items() for part in ("-e", f"{name}={value}")
     ]
-    if clean:
-        args.append("--clean")
-    if extra_args:
-        args.extend(extra_args)
 
-    volume_arg = f"{workdir_path}:/data"
+    if container:
+        launcher = ["docker", "exec", *env_args, container, "ocrmypdf"]
+    else:
+        # Named so it can be removed if it times out.
+        name = f"lawbooks-ocr-{uuid.uuid4().hex[:12]}"
+        launcher = ["docker", "run", "--rm", "--name", name, *env_args]
+        for target, host in mounts.items():
+            launcher.extend(["-v", f"{host}:{target}"])
+        launcher.append(DOCKER_IMAGE)
 
-    command = [
-        "docker",
-        "run",
-        "--rm",
-        "-v",
-        volume_arg,
-        "jbarlow83/ocrmypdf-alpine",
-        *args,
-        f"/data/{rel_in.as_posix()}",
-        f"/data/{rel_out.as_posix()}",
-    ]
+    command = [*launcher, *args, in_container, out_container]
 
     display_command = _format_command_for_display(command)
     if dry_run:
@@ -153,15 +277,29 @@ def run_docker_ocrmypdf(
         return display_command
 
     try:
-        subprocess.run(command, check=True, timeout=timeout_sec)
+        run_command(
+            command,
+            timeout_sec,
+            log_path=log_path,
+            on_output=ocr_progress_listener(progress),
+            cancelled=cancelled,
+        )
     except FileNotFoundError as exc:
         raise DockerNotFoundError(
             "Docker not found. Install Docker Desktop and ensure 'docker' is on PATH."
         ) from exc
-    except subprocess.TimeoutExpired as exc:
-        raise TimeoutError("OCRmyPDF timed out.") from exc
+    except (subprocess.TimeoutExpired, CommandCancelled) as exc:
+        # Killing the docker client leaves OCRmyPDF running in the container.
+        if container:
+            cleanup = ["docker", "restart", "-t", "0", container]
+        else:
+            cleanup = ["docker", "rm", "-f", name]
+        subprocess.run(cleanup, check=False, capture_output=True)
+        if isinstance(exc, CommandCancelled):
+            raise
+        raise TimeoutError(f"OCRmyPDF timed out after {timeout_sec:.0f}s.") from exc
     except subprocess.CalledProcessError as exc:
-        raise RuntimeError("OCRmyPDF failed. See docker output for details.") from exc
+        raise RuntimeError(_failure_message("OCRmyPDF", exc, log_path)) from exc
 
     return display_command
 
@@ -173,8 +311,14 @@ def run_local_ocrmypdf(
     lang: str,
     clean: bool = False,
     extra_args: Optional[Iterable[str]] = None,
-    timeout_sec: Optional[int] = None,
+    timeout_sec: Optional[float] = None,
     dry_run: bool = False,
+    profile: OcrProfile = PROFILES[DEFAULT_PROFILE],
+    cpu: Optional[CpuLimits] = None,
+    log_path: Optional[Path] = None,
+    progress: Optional[Callable[[int], None]] = None,
+    sidecar: Optional[str] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
 ) -> str:
     if not ocrmypdf_available():
         raise OcrmypdfNotFoundError(
@@ -189,24 +333,8 @@ def run_local_ocrmypdf(
             "ghostscript not found. Install it locally or use the docker backend."
         )
 
-    start_page, end_page = pages_range
-    pages_spec = f"{start_page}-{end_page}"
-
-    optimize_level = _resolve_optimize_level(3)
-    args = [
-        "--skip-text",
-        "--deskew",
-        "--optimize",
-        str(optimize_level),
-        "--language",
-        lang,
-        "--pages",
-        pages_spec,
-    ]
-    if clean:
-        args.append("--clean")
-    if extra_args:
-        args.extend(extra_args)
+    args = _ocrmypdf_args(pages_range, lang, clean, extra_args, profile, cpu, sidecar)
+    env = None if cpu is None else {**os.environ, **cpu.env()}
 
     command = [
         "ocrmypdf",
@@ -216,36 +344,584 @@ def run_local_ocrmypdf(
     ]
 
     display_command = _format_command_for_display(command)
+    if cpu is not None:
+        display_command = " ".join(
+            [*(f"{name}={value}" for name, value in cpu.env().items()), display_command]
+        )
     if dry_run:
         print(f"DRY RUN: {display_command}")
         return display_command
 
     try:
-        subprocess.run(command, check=True, timeout=timeout_sec)
+        run_command(
+            command,
+            timeout_sec,
+            env=env,
+            log_path=log_path,
+            on_output=ocr_progress_listener(progress),
+            cancelled=cancelled,
+        )
     except FileNotFoundError as exc:
         raise OcrmypdfNotFoundError(
             "ocrmypdf not found. Install it locally or use the docker backend."
         ) from exc
     except subprocess.TimeoutExpired as exc:
-        raise TimeoutError("ocrmypdf timed out.") from exc
+        raise TimeoutError(f"ocrmypdf timed out after {timeout_sec:.0f}s.") from exc
     except subprocess.CalledProcessError as exc:
-        raise RuntimeError("ocrmypdf failed. See output for details.") from exc
+        raise RuntimeError(_failure_message("ocrmypdf", exc, log_path)) from exc
 
     return display_command
 
 
+class DockerContainerPool:
+    """A fixed set of long-lived OCRmyPDF containers sharing one workdir mount.
+
+    Each container idles on ``tail -f /dev/null`` with ``workdir`` mounted at
+    ``/data`` (and ``scratch``, if given, at ``/scratch``); chunk jobs are run
+    inside it with ``docker exec``, so container create/start/teardown is paid
+    once per container rather than per chunk. With ``measure_overhead``,
+    :meth:`start` also times one ``docker run`` against one ``docker exec``,
+    which the benchmarks use to report what the pool saves per chunk.
+    Use it as a context manager and lease containers with :meth:`acquire`.
+    """
+
+    def __init__(
+        self,
+        workdir: str,
+        size: int,
+        image: str = DOCKER_IMAGE,
+        measure_overhead: bool = False,
+        scratch: Optional[str] = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.workdir = Path(workdir).resolve()
+        self.scratch = None if scratch is None else Path(scratch).resolve()
+        self.size = size
+        self.image = image
+        self.measure_overhead = measure_overhead
+        self.containers: List[str] = []
+        self.jobs_run = 0
+        self.startup_seconds = 0.0
+        self.cold_run_seconds: Optional[float] = None
+        self.exec_seconds: Optional[float] = None
+        self._idle: "queue.Queue[str]" = queue.Queue()
+        self._closed = False
+
+    def __enter__(self) -> "DockerContainerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        if _which("docker") is None:
+            raise DockerNotFoundError(
+                "Docker not found. Install Docker Desktop and ensure 'docker' is on PATH."
+            )
+        started = time.perf_counter()
+        try:
+            for _ in range(self.size):
+                result = subprocess.run(
+                    [
+                        "docker",
+                        "run",
+                        "-d",
+                        "--rm",
+                        "-v",
+                        f"{self.workdir}:/data",
+                        *(["-v", f"{self.scratch}:/scratch"] if self.scratch else []),
+                        "--entrypoint",
+                        "tail",
+                        self.image,
+                        "-f",
+                        "/dev/null",
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                container_id = result.stdout.strip()
+                self.containers.append(container_id)
+                self._idle.put(container_id)
+        except subprocess.CalledProcessError as exc:
+            self.close()
+            raise RuntimeError(
+                f"Failed to start OCRmyPDF container: {exc.stderr.strip()}"
+            ) from exc
+        self.startup_seconds = time.perf_counter() - started
+        logger.info(
+            "Started %s OCRmyPDF container(s) in %.2fs",
+            len(self.containers),
+            self.startup_seconds,
+        )
+        if self.measure_overhead:
+            self._measure_overhead()
+
+    def _measure_overhead(self) -> None:
+        """Time a no-op OCRmyPDF call via ``docker run`` and via ``docker exec``."""
+        probes = {
+            "cold_run_seconds": ["docker", "run", "--rm", self.image, "--version"],
+            "exec_seconds": ["docker", "exec", self.containers[0], "ocrmypdf", "--version"],
+        }
+        for attribute, command in probes.items():
+            started = time.perf_counter()
+            try:
+                subprocess.run(command, check=True, capture_output=True)
+            except subprocess.CalledProcessError:
+                logger.warning("Could not measure docker overhead with %s", command)
+                return
+            setattr(self, attribute, time.perf_counter() - started)
+
+    @property
+    def overhead_saved_per_chunk(self) -> Optional[float]:
+        if self.cold_run_seconds is None or self.exec_seconds is None:
+            return None
+        return self.cold_run_seconds - self.exec_seconds
+
+    @contextmanager
+    def acquire(self) -> Iterator[str]:
+        container_id = self._idle.get()
+        try:
+            yield container_id
+        finally:
+            self.jobs_run += 1
+            self._idle.put(container_id)
+
+    def summary(self) -> dict:
+        saved = self.overhead_saved_per_chunk
+        return {
+            "containers": len(self.containers),
+            "jobs_run": self.jobs_run,
+            "startup_seconds": round(self.startup_seconds, 3),
+            "cold_run_seconds": (
+                None if self.cold_run_seconds is None else round(self.cold_run_seconds, 3)
+            ),
+            "exec_seconds": (
+                None if self.exec_seconds is None else round(self.exec_seconds, 3)
+            ),
+            "saved_per_chunk_seconds": None if saved is None else round(saved, 3),
+            "saved_total_seconds": (
+                None
+                if saved is None
+                else round(saved * self.jobs_run - self.startup_seconds, 3)
+            ),
+        }
+
+    def close(self) -> None:
+        if self._closed or not self.containers:
+            return
+        self._closed = True
+        subprocess.run(
+            ["docker", "rm", "-f", *self.containers],
+            check=False,
+            capture_output=True,
+        )
+        summary = self.summary()
+        if summary["saved_per_chunk_seconds"] is not None:
+            logger.info(
+                "Docker pool ran %s chunk(s) in %s container(s); saved ~%.2fs per "
+                "chunk, ~%.2fs in total after %.2fs startup",
+                summary["jobs_run"],
+                summary["containers"],
+                summary["saved_per_chunk_seconds"],
+                summary["saved_total_seconds"],
+                summary["startup_seconds"],
+            )
+
+
+# --- Command engine ----------------------------------------------------------
+
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+_TAIL_LINES = 20
+# How long output may keep arriving after a command exits (from its children).
+_DRAIN_SECONDS = 5.0
+# How often a command's ``cancelled`` callback is checked.
+_CANCEL_POLL_SECONDS = 0.2
+# Wait for children with os.wait4 so each one's CPU time and peak RSS are known.
+_WAIT4 = hasattr(os, "wait4")
+# Output is split into lines on "\r" too, so progress bars yield one line per update.
+_LINE_BREAK = re.compile(rb"[\r\n]")
+# OCRmyPDF's progress bar: "OCR:  50%|#####     | 2/4 [00:05<00:05, ...]" from tqdm,
+# or rich's "OCR <bar> 50% 2/4 0:00:05", possibly with colour codes.
+_OCR_PROGRESS = re.compile(
+    r"^(?:\s|\x1b\[[0-9;?]*[A-Za-z])*OCR\b.*?(\d+)(?:\.\d+)?/(\d+)(?:\.\d+)?"
+)
+
+
+class CommandCancelled(RuntimeError):
+    """The command was stopped by :func:`cancel_commands` or its ``cancelled`` check."""
+
+
 @dataclass
 class CommandResult:
+    """A finished command; ``stdout`` and ``stderr`` hold their last lines."""
+
     args: Sequence[str]
     returncode: int
     stdout: str = ""
     stderr: str = ""
+    seconds: float = 0.0
+    log_path: Optional[Path] = None
+
 
+class _RotatingLog:
+    """Captured output of one command.
 
-def run_command(args: Sequence[str]) -> CommandResult:
-    """Placeholder subprocess helper.
+    Like :class:`logging.handlers.RotatingFileHandler`, the previous log at
+    ``path`` becomes ``path.1`` (and so on, keeping ``backups`` files) when a
+    command starts, and again whenever the log grows past ``max_bytes``.
+    """
 
-    This function does not execute anything yet; it returns a dummy result.
+    def __init__(self, path: Path, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._rotate()
+        self._handle = self.path.open("wb")
+        self._size = 0
+
+    def _backup(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}")
+
+    def _rotate(self) -> None:
+        if not self.path.exists():
+            return
+        if self.backups < 1:
+            self.path.unlink()
+            return
+        for index in range(self.backups - 1, 0, -1):
+            if self._backup(index).exists():
+                os.replace(self._backup(index), self._backup(index + 1))
+        os.replace(self.path, self._backup(1))
+
+    def write(self, line: bytes) -> None:
+        if self._size and self._size + len(line) > self.max_bytes:
+            self._handle.close()
+            self._rotate()
+            self._handle = self.path.open("wb")
+            self._size = 0
+        self._handle.write(line)
+        self._size += len(line)
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+@dataclass(eq=False)
+class _Child:
+    kill: Callable[[], None]
+    streams: Dict[str, asyncio.StreamReader]
+    exit: "asyncio.Future[Tuple[int, object]]"
+    cancelled: bool = False
+
+
+async def _wait4(process: subprocess.Popen) -> Tuple[int, object]:
+    """Reap ``process`` with ``os.wait4``, returning its exit code and usage."""
+    loop = asyncio.get_running_loop()
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            pass
+    if pidfd is not None:
+        # The pidfd becomes readable when the process exits (Linux 5.3+).
+        exited = loop.create_future()
+        loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+        try:
+            await exited
+        finally:
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+    delay = 0.001
+    while True:
+        pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+        if pid:
+            process.returncode = os.waitstatus_to_exitcode(status)
+            return process.returncode, usage
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.05)
+
+
+async def _stream_reader(pipe: object) -> asyncio.StreamReader:
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    return reader
+
+
+def _kill(process: Union[subprocess.Popen, asyncio.subprocess.Process]) -> None:
+    try:
+        if isinstance(process, subprocess.Popen):
+            # The whole session, so OCRmyPDF's Tesseract children die with it.
+            if process.returncode is None:
+                os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+class _CommandEngine:
+    """Runs subprocesses on one asyncio event loop in a background thread.
+
+    Callers on any thread block in :meth:`run` while the loop reads the
+    output of every running command. Where ``os.wait4`` exists, children are
+    reaped with it so their CPU time and peak RSS can be charged to the
+    caller's :mod:`~src.metrics` span; elsewhere asyncio's own subprocess
+    support is used.
     """
-    logger.info("run_command placeholder: %s", args)
-    return CommandResult(args=args, returncode=0)
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._running: Set[_Child] = set()
+        self._cancelled = False
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="command-engine", daemon=True
+                ).start()
+            return self._loop
+
+    def run(
+        self,
+        command: Sequence[str],
+        timeout_sec: Optional[float],
+        env: Optional[Mapping[str, str]],
+        log_path: Optional[Path],
+        on_output: Optional[Callable[[str], None]],
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> CommandResult:
+        record = current_span()
+        future = asyncio.run_coroutine_threadsafe(
+            self._run(list(command), timeout_sec, env, log_path, on_output, cancelled),
+            self._event_loop(),
+        )
+        result, usage = future.result()
+        if usage is not None and record is not None:
+            record.add_child_usage(usage)
+        return result
+
+    async def _start(
+        self, command: List[str], env: Optional[Mapping[str, str]]
+    ) -> _Child:
+        if _WAIT4:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env,
+                start_new_session=True,
+            )
+            child = _Child(
+                kill=lambda: _kill(process),
+                streams={},
+                exit=asyncio.ensure_future(_wait4(process)),
+            )
+            self._running.add(child)
+            child.streams = {
+                "stdout": await _stream_reader(process.stdout),
+                "stderr": await _stream_reader(process.stderr),
+            }
+            return child
+
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env,
+        )
+
+        async def wait() -> Tuple[int, object]:
+            return await process.wait(), None
+
+        child = _Child(
+            kill=lambda: _kill(process),
+            streams={"stdout": process.stdout, "stderr": process.stderr},
+            exit=asyncio.ensure_future(wait()),
+        )
+        self._running.add(child)
+        return child
+
+    async def _run(
+        self,
+        command: List[str],
+        timeout_sec: Optional[float],
+        env: Optional[Mapping[str, str]],
+        log_path: Optional[Path],
+        on_output: Optional[Callable[[str], None]],
+        cancelled: Optional[Callable[[], bool]],
+    ) -> Tuple[CommandResult, object]:
+        if self._cancelled or (cancelled is not None and cancelled()):
+            raise CommandCancelled(f"Cancelled before starting {command[0]}.")
+        started = time.perf_counter()
+        log = _RotatingLog(log_path) if log_path is not None else None
+        tails: Dict[str, Deque[str]] = {
+            "stdout": deque(maxlen=_TAIL_LINES),
+            "stderr": deque(maxlen=_TAIL_LINES),
+        }
+        child: Optional[_Child] = None
+        try:
+            child = await self._start(command, env)
+            pumps = [
+                asyncio.ensure_future(self._pump(reader, tails[name], log, on_output))
+                for name, reader in child.streams.items()
+            ]
+            done = await self._wait(child, timeout_sec, cancelled)
+            returncode, usage = await child.exit
+            _, stuck = await asyncio.wait(pumps, timeout=_DRAIN_SECONDS)
+            for pump in stuck:
+                pump.cancel()
+        finally:
+            if child is not None:
+                self._running.discard(child)
+            if log is not None:
+                log.close()
+        if child.cancelled:
+            raise CommandCancelled(f"{command[0]} was cancelled.")
+        stdout, stderr = ("\n".join(tails[name]) for name in ("stdout", "stderr"))
+        if not done:
+            raise subprocess.TimeoutExpired(command, timeout_sec, output=stdout, stderr=stderr)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command, output=stdout, stderr=stderr)
+        result = CommandResult(
+            args=command,
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
+            seconds=time.perf_counter() - started,
+            log_path=log_path,
+        )
+        return result, usage
+
+    @staticmethod
+    async def _wait(
+        child: _Child, timeout_sec: Optional[float], cancelled: Optional[Callable[[], bool]]
+    ) -> bool:
+        """Wait for ``child`` to exit, killing it on timeout or once
+        ``cancelled()`` is true; returns whether it exited by itself."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout_sec is None else loop.time() + timeout_sec
+        while True:
+            steps = [] if cancelled is None else [_CANCEL_POLL_SECONDS]
+            if deadline is not None:
+                steps.append(max(deadline - loop.time(), 0.0))
+            done, _ = await asyncio.wait({child.exit}, timeout=min(steps, default=None))
+            if done:
+                return True
+            if cancelled is not None and cancelled():
+                child.cancelled = True
+            if child.cancelled or (deadline is not None and loop.time() >= deadline):
+                child.kill()
+                return False
+
+    @staticmethod
+    async def _pump(
+        reader: asyncio.StreamReader,
+        tail: Deque[str],
+        log: Optional[_RotatingLog],
+        on_output: Optional[Callable[[str], None]],
+    ) -> None:
+        pending = b""
+        while True:
+            data = await reader.read(64 * 1024)
+            *lines, pending = _LINE_BREAK.split(pending + data) if data else [pending, b""]
+            for line in lines:
+                if not line.strip():
+                    continue
+                if log is not None:
+                    log.write(line + b"\n")
+                text = line.decode("utf-8", "replace").rstrip()
+                tail.append(text)
+                if on_output is not None:
+                    try:
+                        on_output(text)
+                    except Exception:
+                        logger.exception("Output handler failed")
+            if not data:
+                return
+
+    def cancel(self) -> int:
+        """Kill every running command and refuse new ones until :meth:`reset`."""
+        self._cancelled = True
+        with self._lock:
+            loop = self._loop
+        if loop is None:
+            return 0
+        return asyncio.run_coroutine_threadsafe(self._kill_all(), loop).result()
+
+    async def _kill_all(self) -> int:
+        for child in self._running:
+            child.cancelled = True
+            child.kill()
+        return len(self._running)
+
+    def reset(self) -> None:
+        self._cancelled = False
+
+
+_engine = _CommandEngine()
+
+
+def run_command(
+    args: Sequence[str],
+    timeout_sec: Optional[float] = None,
+    env: Optional[Mapping[str, str]] = None,
+    log_path: Optional[Path] = None,
+    on_output: Optional[Callable[[str], None]] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> CommandResult:
+    """Run ``args`` to completion on the shared command engine.
+
+    Any number of threads may call this at once; their commands run
+    concurrently on one event loop. stdout and stderr are captured line by
+    line (``\r`` also ends a line), written to ``log_path`` (rotated, see
+    :class:`_RotatingLog`) and passed to ``on_output``, which runs on the
+    engine's thread and must not block. The last lines of each stream are
+    kept on the result and on the exceptions.
+
+    Raises ``FileNotFoundError``, ``subprocess.TimeoutExpired`` and
+    ``subprocess.CalledProcessError`` like ``subprocess.run(check=True)``,
+    and :class:`CommandCancelled` after :func:`cancel_commands` or once
+    ``cancelled()``, checked on the engine's thread, returns True.
+    """
+    return _engine.run(args, timeout_sec, env, log_path, on_output, cancelled)
+
+
+def cancel_commands() -> int:
+    """Kill all running commands (e.g. on Ctrl-C); returns how many there were.
+
+    Commands started afterwards raise :class:`CommandCancelled` until
+    :func:`reset_cancellation` is called.
+    """
+    return _engine.cancel()
+
+
+def reset_cancellation() -> None:
+    _engine.reset()
+
+
+def ocr_progress_listener(
+    on_pages: Optional[Callable[[int], None]]
+) -> Optional[Callable[[str], None]]:
+    """An ``on_output`` handler that reports the pages OCRmyPDF has finished,
+    as read from its progress bar."""
+    if on_pages is None:
+        return None
+
+    def listen(line: str) -> None:
+        match = _OCR_PROGRESS.match(line)
+        if match:
+            on_pages(int(match.group(1)))
+
+    return listen
@@ -0,0 +1,132 @@
+"""Scratch space for transient files, kept apart from the durable workdir."""
+
+from __future__ import annotations
+
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: an open lock file cannot be deleted instead.
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESERVE_BYTES = 256 * 1024 * 1024
+_PREFIX = "lawbooks-"
+# New folders are locked under this name, which remove_stale ignores.
+_NEW_PREFIX = ".new-lawbooks-"
+# Folders younger than this are never stale, e.g. while one is being locked.
+_GRACE_SECONDS = 60.0
+_LOCK_NAME = ".lock"
+
+
+def _owner_gone(folder: Path) -> bool:
+    """True if no live process holds ``folder``'s lock file."""
+    lock_path = folder / _LOCK_NAME
+    if fcntl is None:
+        try:
+            lock_path.unlink()
+        except FileNotFoundError:
+            return True
+        except OSError:
+            return False
+        return True
+    try:
+        handle = lock_path.open("r")
+    except FileNotFoundError:
+        return True
+    with handle:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+    return True
+
+
+def remove_stale(root: Path) -> int:
+    """Delete scratch folders under ``root`` left by processes that died."""
+    removed = 0
+    now = time.time()
+    for folder in root.glob(f"{_PREFIX}*"):
+        try:
+            if not folder.is_dir() or now - folder.stat().st_mtime < _GRACE_SECONDS:
+                continue
+        except FileNotFoundError:
+            continue
+        if _owner_gone(folder):
+            shutil.rmtree(folder, ignore_errors=True)
+            removed += 1
+    if removed:
+        logger.info("Removed %s stale scratch folder(s) from %s", removed, root)
+    return removed
+
+
+class ScratchSpace:
+    """A private folder under ``root`` for the files of one process.
+
+    The folder holds a lock for as long as the process runs, so a later
+    process can tell a crashed owner's folder from a running one and remove
+    it. The folder is created and locked under a hidden name and only then
+    renamed into view, so a process starting at the same moment never sees
+    it unlocked; folders younger than a minute are never removed either.
+    :meth:`has_room` keeps ``reserve_bytes`` free on the scratch filesystem,
+    which matters when it is a RAM disk such as ``/dev/shm``; a chunk input
+    that does not fit is split into the workdir instead.
+    """
+
+    def __init__(self, root: Path, reserve_bytes: int = DEFAULT_RESERVE_BYTES) -> None:
+        if reserve_bytes < 0:
+            raise ValueError("reserve_bytes must not be negative")
+        self.root = Path(root)
+        self.reserve_bytes = reserve_bytes
+        self.path: Optional[Path] = None
+        self._lock = None
+
+    def __enter__(self) -> "ScratchSpace":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        remove_stale(self.root)
+        new_path = Path(tempfile.mkdtemp(prefix=_NEW_PREFIX, dir=self.root)).resolve()
+        self.path = new_path.with_name(_PREFIX + new_path.name[len(_NEW_PREFIX):])
+        if fcntl is not None:
+            self._lock = (new_path / _LOCK_NAME).open("w")
+            fcntl.flock(self._lock, fcntl.LOCK_EX)
+            new_path.rename(self.path)
+        else:
+            # A folder holding an open file cannot be renamed on Windows; the
+            # grace period in remove_stale covers the moment before it is open.
+            new_path.rename(self.path)
+            self._lock = (self.path / _LOCK_NAME).open("w")
+        logger.info("Using scratch folder %s", self.path)
+        return self.path
+
+    def folder(self, name: str) -> Path:
+        """A subfolder for one book, created on first use."""
+        if self.path is None:
+            raise RuntimeError("Scratch space is not started.")
+        folder = self.path / name
+        folder.mkdir(exist_ok=True)
+        return folder
+
+    def has_room(self, size: int) -> bool:
+        """Whether ``size`` bytes fit while leaving the reserve free."""
+        return shutil.disk_usage(self.root).free - size >= self.reserve_bytes
+
+    def close(self) -> None:
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
@@ -0,0 +1,335 @@
+"""On-disk inverted index over extracted page text, backed by SQLite."""
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .page_store import read_text_pages
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[0-9a-z]+")
+# "s. 12(3)", "ss 4-6" (as "ss.4"), "Art. 21", "r. 5(1)(b)" ...
+_CITATION = re.compile(
+    r"\b(s|ss|sec|r|rr|o|art|arts|para|paras|cl|reg|regs|sch)\.?\s?"
+    r"(\d+[a-z]?(?:\([0-9a-z]+\))*)"
+)
+# A bare subsection reference such as "12(3)(a)".
+_SUBSECTION = re.compile(r"\b\d+[a-z]?(?:\([0-9a-z]+\))+")
+_PHRASE = re.compile(r'"([^"]*)"')
+# Below this many candidate pages, postings are read by primary key per page.
+_POINT_LOOKUP_LIMIT = 2000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    pages INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    book_id INTEGER NOT NULL,
+    page INTEGER NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term_id, book_id, page)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_book ON postings (book_id);
+"""
+
+
+def tokenize(text: str) -> List[Tuple[int, str]]:
+    """Return ``(position, token)`` pairs for ``text``.
+
+    Words are lower-cased runs of letters and digits, numbered in order.
+    Citations are added as one extra token at the position of their first
+    word: "s. 12(3)" gives ``s.12(3)`` as well as ``s``, ``12`` and ``3``, so
+    they can be searched as a unit or as part of a phrase.
+    """
+    text = text.lower()
+    starts: List[int] = []
+    tokens: List[Tuple[int, str]] = []
+    for position, match in enumerate(_WORD.finditer(text)):
+        starts.append(match.start())
+        tokens.append((position, match.group()))
+    for match in _CITATION.finditer(text):
+        position = bisect_left(starts, match.start())
+        tokens.append((position, f"{match.group(1)}.{match.group(2)}"))
+    for match in _SUBSECTION.finditer(text):
+        position = bisect_left(starts, match.start())
+        tokens.append((position, match.group()))
+    return tokens
+
+
+def _query_terms(text: str) -> List[str]:
+    """Unquoted query terms: citations as one term each, then the other words."""
+    text = text.lower()
+    terms = []
+    for pattern in (_CITATION, _SUBSECTION):
+        for match in pattern.finditer(text):
+            if pattern is _CITATION:
+                terms.append(f"{match.group(1)}.{match.group(2)}")
+            else:
+                terms.append(match.group())
+        text = pattern.sub(" ", text)
+    terms.extend(_WORD.findall(text))
+    return terms
+
+
+def _pack_positions(positions: Sequence[int]) -> bytes:
+    packed = array("I", positions)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_positions(blob: bytes) -> Set[int]:
+    positions = array("I")
+    positions.frombytes(blob)
+    if sys.byteorder == "big":
+        positions.byteswap()
+    return set(positions)
+
+
+@dataclass
+class SearchHit:
+    book: str
+    page: int
+    score: int
+
+
+class SearchIndex:
+    """Inverted index of ``term -> (book, page, positions)`` in one SQLite file.
+
+    Books are indexed from ``===== PAGE NNNN =====`` text files and keyed by
+    file stem. :meth:`update` only re-indexes files whose size or mtime changed.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path))
+        self._db.executescript(_SCHEMA)
+        self._term_ids: Dict[str, int] = {}
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            self._db.execute("INSERT OR IGNORE INTO terms (term) VALUES (?)", (term,))
+            (term_id,) = self._db.execute(
+                "SELECT id FROM terms WHERE term = ?", (term,)
+            ).fetchone()
+            self._term_ids[term] = term_id
+        return term_id
+
+    def _remove_book(self, book_id: int) -> None:
+        self._db.execute("DELETE FROM postings WHERE book_id = ?", (book_id,))
+        self._db.execute("DELETE FROM books WHERE id = ?", (book_id,))
+
+    def _index_book(self, text_path: Path) -> int:
+        stat = text_path.stat()
+        cursor = self._db.execute(
+            "INSERT INTO books (name, path, size, mtime_ns, pages) VALUES (?, ?, ?, ?, 0)",
+            (text_path.stem, str(text_path), stat.st_size, stat.st_mtime_ns),
+        )
+        book_id = cursor.lastrowid
+        pages = 0
+        for pages, text in enumerate(read_text_pages(text_path), start=1):
+            positions: Dict[str, List[int]] = defaultdict(list)
+            for position, token in tokenize(text):
+                positions[token].append(position)
+            self._db.executemany(
+                "INSERT INTO postings (term_id, book_id, page, positions) VALUES (?, ?, ?, ?)",
+                [
+                    (self._term_id(term), book_id, pages, _pack_positions(found))
+                    for term, found in positions.items()
+                ],
+            )
+        self._db.execute("UPDATE books SET pages = ? WHERE id = ?", (pages, book_id))
+        return pages
+
+    def update(self, text_paths: Iterable[Path], prune: bool = True) -> dict:
+        """Index new and changed text files; with ``prune``, drop books whose
+        file is not among ``text_paths``. Returns counts of what changed."""
+        started = time.perf_counter()
+        known = {
+            name: (book_id, size, mtime_ns)
+            for book_id, name, size, mtime_ns in self._db.execute(
+                "SELECT id, name, size, mtime_ns FROM books"
+            )
+        }
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "pages": 0}
+        seen: Set[str] = set()
+        for text_path in text_paths:
+            name = text_path.stem
+            seen.add(name)
+            stat = text_path.stat()
+            previous = known.get(name)
+            if previous is not None and previous[1:] == (stat.st_size, stat.st_mtime_ns):
+                counts["unchanged"] += 1
+                continue
+            try:
+                with self._db:
+                    if previous is not None:
+                        self._remove_book(previous[0])
+                    counts["pages"] += self._index_book(text_path)
+            except Exception:
+                # Terms added in the rolled-back transaction are gone again.
+                self._term_ids.clear()
+                raise
+            counts["updated" if previous is not None else "added"] += 1
+            logger.info("Indexed %s", text_path)
+        if prune:
+            with self._db:
+                for name, (book_id, _, _) in known.items():
+                    if name not in seen:
+                        self._remove_book(book_id)
+                        counts["removed"] += 1
+                        logger.info("Removed %s from the index", name)
+        logger.info(
+            "Index update: %s added, %s updated, %s removed, %s unchanged in %.1fs",
+            counts["added"],
+            counts["updated"],
+            counts["removed"],
+            counts["unchanged"],
+            time.perf_counter() - started,
+        )
+        return counts
+
+    def _term_lookup(self, term: str) -> Tuple[Optional[int], int]:
+        """The term's id and how many pages it occurs on."""
+        row = self._db.execute("SELECT id FROM terms WHERE term = ?", (term,)).fetchone()
+        if row is None:
+            return None, 0
+        (pages,) = self._db.execute(
+            "SELECT COUNT(*) FROM postings WHERE term_id = ?", row
+        ).fetchone()
+        return row[0], pages
+
+    def _postings(
+        self, term_id: int, pages: Optional[Set[Tuple[int, int]]] = None
+    ) -> Dict[Tuple[int, int], bytes]:
+        """Position blobs of a term, limited to ``pages`` when given."""
+        if pages is not None and len(pages) <= _POINT_LOOKUP_LIMIT:
+            found = {}
+            for book_id, page in pages:
+                row = self._db.execute(
+                    "SELECT positions FROM postings "
+                    "WHERE term_id = ? AND book_id = ? AND page = ?",
+                    (term_id, book_id, page),
+                ).fetchone()
+                if row is not None:
+                    found[(book_id, page)] = row[0]
+            return found
+        found = {
+            (book_id, page): blob
+            for book_id, page, blob in self._db.execute(
+                "SELECT book_id, page, positions FROM postings WHERE term_id = ?",
+                (term_id,),
+            )
+        }
+        if pages is not None:
+            found = {key: blob for key, blob in found.items() if key in pages}
+        return found
+
+    def _phrase_pages(
+        self,
+        tokens: List[Tuple[int, str]],
+        pages: Optional[Set[Tuple[int, int]]] = None,
+    ) -> Dict[Tuple[int, int], int]:
+        """Pages containing every token at its offset; values count matches.
+
+        Terms are read rarest first, and once the candidate pages are few the
+        remaining terms are looked up for those pages only.
+        """
+        lookups = []
+        for offset, term in tokens:
+            term_id, frequency = self._term_lookup(term)
+            if term_id is None:
+                return {}
+            lookups.append((frequency, offset, term_id))
+        lookups.sort()
+
+        postings = []
+        for _, offset, term_id in lookups:
+            blobs = self._postings(term_id, pages)
+            if not blobs:
+                return {}
+            postings.append((offset, blobs))
+            pages = set(blobs)
+        if len(postings) == 1:
+            # Four bytes per position.
+            return {key: len(blob) // 4 for key, blob in postings[0][1].items()}
+
+        matches: Dict[Tuple[int, int], int] = {}
+        for page_key in pages:
+            starts: Optional[Set[int]] = None
+            for offset, blobs in postings:
+                shifted = {position - offset for position in _unpack_positions(blobs[page_key])}
+                starts = shifted if starts is None else starts & shifted
+                if not starts:
+                    break
+            if starts:
+                matches[page_key] = len(starts)
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """Pages matching every word and every ``"quoted phrase"`` in ``query``.
+
+        Hits are ranked by the number of matches on the page.
+        """
+        clauses: List[List[Tuple[int, str]]] = [
+            tokenize(phrase) for phrase in _PHRASE.findall(query)
+        ]
+        clauses.extend([(0, term)] for term in _query_terms(_PHRASE.sub(" ", query)))
+        clauses = [clause for clause in clauses if clause]
+        if not clauses:
+            return []
+
+        scores: Optional[Dict[Tuple[int, int], int]] = None
+        for clause in clauses:
+            first = min(position for position, _ in clause)
+            matches = self._phrase_pages(
+                [(position - first, term) for position, term in clause],
+                None if scores is None else set(scores),
+            )
+            if scores is None:
+                scores = matches
+            else:
+                scores = {
+                    key: scores[key] + count for key, count in matches.items() if key in scores
+                }
+            if not scores:
+                return []
+
+        names = dict(self._db.execute("SELECT id, name FROM books"))
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], names[item[0][0]], item[0][1]))
+        return [
+            SearchHit(book=names[book_id], page=page, score=score)
+            for (book_id, page), score in ranked[:limit]
+        ]
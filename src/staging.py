@@ -0,0 +1,146 @@
+"""Staging of source PDFs into a run's workdir without copying where possible."""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STAGING_STRATEGIES = ("auto", "reflink", "hardlink", "symlink", "reference", "copy")
+
+# Linux FICLONE ioctl: share the source's extents copy-on-write (btrfs, XFS, ...).
+_FICLONE = 0x40049409
+
+
+def source_fingerprint(source_path: Path) -> dict:
+    stat = source_path.stat()
+    return {
+        "path": str(source_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _reflink(source_path: Path, dest_path: Path) -> None:
+    try:
+        import fcntl
+    except ImportError as exc:
+        raise OSError("reflink is not supported on this platform") from exc
+
+    with source_path.open("rb") as src, dest_path.open("wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            dest_path.unlink()
+            raise
+    shutil.copystat(source_path, dest_path)
+
+
+def _hardlink(source_path: Path, dest_path: Path) -> None:
+    os.link(source_path, dest_path)
+
+
+def _symlink(source_path: Path, dest_path: Path) -> None:
+    os.symlink(source_path, dest_path)
+
+
+def _copy(source_path: Path, dest_path: Path) -> None:
+    shutil.copy2(source_path, dest_path)
+
+
+def clone_file(source_path: Path, dest_path: Path) -> None:
+    """Copy a file, sharing its blocks copy-on-write when the filesystem can."""
+    try:
+        _reflink(source_path, dest_path)
+    except OSError:
+        _copy(source_path, dest_path)
+
+
+_STAGERS = {
+    "reflink": _reflink,
+    "hardlink": _hardlink,
+    "symlink": _symlink,
+    "copy": _copy,
+}
+
+
+def _candidate_strategies(strategy: str) -> Tuple[str, ...]:
+    if strategy != "auto":
+        return (strategy,)
+    # The staged source is only read on the host; Docker sees split chunk inputs.
+    return ("reflink", "hardlink", "symlink", "copy")
+
+
+def _remove_staged(dest_path: Path) -> None:
+    # Unlink rather than overwrite: writing through a hardlink or symlink would
+    # modify the original source file.
+    if dest_path.is_symlink() or dest_path.exists():
+        dest_path.unlink()
+
+
+def stage_source(
+    source_path: Path,
+    dest_path: Path,
+    strategy: str = "auto",
+    previous: Optional[dict] = None,
+) -> Tuple[Path, dict]:
+    """Make ``source_path`` available at ``dest_path`` as cheaply as possible.
+
+    ``auto`` tries a reflink, then a hardlink, then a symlink, and copies only
+    as a last resort. ``reference`` stages nothing and reads the source in place.
+
+    ``previous`` is the record returned by an earlier call; if the source's
+    size and mtime are unchanged and the staged file is still present, nothing
+    is restaged. Returns the path to read and a record for ``status.json``.
+    """
+    if strategy not in STAGING_STRATEGIES:
+        raise ValueError(f"strategy must be one of: {', '.join(STAGING_STRATEGIES)}")
+
+    fingerprint = source_fingerprint(source_path)
+    if source_path == dest_path.resolve():
+        return dest_path, {**fingerprint, "strategy": "in_place", "staged_path": str(dest_path)}
+
+    if previous and all(previous.get(key) == value for key, value in fingerprint.items()):
+        staged_path = Path(previous.get("staged_path", ""))
+        requested = strategy in {"auto", previous.get("strategy")}
+        if requested and staged_path.exists():
+            logger.info(
+                "Source unchanged; reusing %s staging at %s",
+                previous["strategy"],
+                staged_path,
+            )
+            return staged_path, dict(previous)
+
+    if strategy == "reference":
+        _remove_staged(dest_path)
+        return source_path, {
+            **fingerprint,
+            "strategy": "reference",
+            "staged_path": str(source_path),
+        }
+
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    errors = []
+    for candidate in _candidate_strategies(strategy):
+        _remove_staged(dest_path)
+        try:
+            _STAGERS[candidate](source_path, dest_path)
+        except OSError as exc:
+            logger.debug("Staging with %s failed: %s", candidate, exc)
+            errors.append(f"{candidate}: {exc}")
+            continue
+        logger.info("Staged %s -> %s using %s", source_path, dest_path, candidate)
+        return dest_path, {
+            **fingerprint,
+            "strategy": candidate,
+            "staged_path": str(dest_path),
+        }
+
+    raise RuntimeError(
+        f"Could not stage {source_path} into {dest_path}: {'; '.join(errors)}"
+    )
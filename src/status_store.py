@@ -0,0 +1,195 @@
+"""Crash-safe status storage: a JSON snapshot plus an append-only journal."""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPACT_EVERY = 1000
+
+
+class StatusStore:
+    """Status for a run or book, kept as ``status.json`` plus ``status.journal``.
+
+    ``status.json`` is a plain snapshot, so existing status files are imported
+    as-is. Every change is appended to the journal as one JSON line with a
+    single ``write`` call, which survives the process being killed. On load,
+    the journal is replayed over the snapshot and a torn final line (from a
+    crash mid-write) is skipped. Loading never writes, so readers such as
+    ``stats`` are safe beside a live run; the torn line is cut off only when
+    this store first appends to the journal. Journal events are absolute ``set`` or
+    ``update`` operations, so replaying them over a newer snapshot is
+    harmless. Once ``compact_every`` events have accumulated, the snapshot is
+    rewritten atomically and the journal is truncated. After :meth:`freeze`,
+    nothing more is written.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        compact_every: int = DEFAULT_COMPACT_EVERY,
+        durable: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix(".journal")
+        self.compact_every = compact_every
+        self.durable = durable
+        self._lock = threading.RLock()
+        self._journal_fd: Optional[int] = None
+        self._pending_events = 0
+        # Length of the journal's valid prefix, if it ends in a torn line.
+        self._torn_at: Optional[int] = None
+        self.frozen = False
+        # Time and bytes spent writing the journal and snapshots.
+        self.write_seconds = 0.0
+        self.bytes_written = 0
+        self._data = self._load()
+
+    def __enter__(self) -> "StatusStore":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def exists(self) -> bool:
+        return self.path.exists() or self.journal_path.exists()
+
+    def _load(self) -> dict:
+        data: dict = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        if not self.journal_path.exists():
+            return data
+
+        good_bytes = 0
+        with self.journal_path.open("rb") as handle:
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    break
+                _apply(data, event)
+                good_bytes += len(line)
+                self._pending_events += 1
+        if good_bytes != self.journal_path.stat().st_size:
+            logger.warning(
+                "Ignoring torn tail of %s after %s byte(s)",
+                self.journal_path,
+                good_bytes,
+            )
+            self._torn_at = good_bytes
+        return data
+
+    @property
+    def data(self) -> dict:
+        """A deep copy of the current status."""
+        with self._lock:
+            return copy.deepcopy(self._data)
+
+    def get(self, *keys: str, default: Any = None) -> Any:
+        with self._lock:
+            node: Any = self._data
+            for key in keys:
+                if not isinstance(node, dict) or key not in node:
+                    return default
+                node = node[key]
+            return copy.deepcopy(node)
+
+    def set(self, keys: Sequence[str], value: Any) -> None:
+        self._record({"op": "set", "keys": list(keys), "value": value})
+
+    def update(self, keys: Sequence[str], changes: dict) -> None:
+        """Merge ``changes`` into the dict at ``keys``, creating it if needed."""
+        self._record({"op": "update", "keys": list(keys), "value": changes})
+
+    def _record(self, event: dict) -> None:
+        line = json.dumps(event, separators=(",", ":"), sort_keys=True) + "\n"
+        with self._lock:
+            started = time.perf_counter()
+            _apply(self._data, json.loads(line))
+            if self.frozen:
+                return
+            if self._journal_fd is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self._torn_at is not None:
+                    try:
+                        with self.journal_path.open("r+b") as handle:
+                            handle.truncate(self._torn_at)
+                    except FileNotFoundError:
+                        pass
+                    self._torn_at = None
+                self._journal_fd = os.open(
+                    self.journal_path,
+                    os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0),
+                    0o644,
+                )
+            data = line.encode("utf-8")
+            os.write(self._journal_fd, data)
+            if self.durable:
+                os.fsync(self._journal_fd)
+            self.write_seconds += time.perf_counter() - started
+            self.bytes_written += len(data)
+            self._pending_events += 1
+            if self._pending_events >= self.compact_every:
+                self.compact()
+
+    def compact(self) -> None:
+        """Write the snapshot atomically and truncate the journal."""
+        with self._lock:
+            if self.frozen or (self._pending_events == 0 and self.path.exists()):
+                return
+            started = time.perf_counter()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump(self._data, handle, indent=2, sort_keys=True)
+                handle.flush()
+                os.fsync(handle.fileno())
+                self.bytes_written += handle.tell()
+            os.replace(tmp_path, self.path)
+            if self._journal_fd is not None:
+                os.close(self._journal_fd)
+                self._journal_fd = None
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self._torn_at = None
+            self._pending_events = 0
+            self.write_seconds += time.perf_counter() - started
+
+    def freeze(self) -> None:
+        """Stop writing, e.g. once another process has taken the status over;
+        later changes are applied in memory only."""
+        with self._lock:
+            self.frozen = True
+            if self._journal_fd is not None:
+                os.close(self._journal_fd)
+                self._journal_fd = None
+
+    def close(self) -> None:
+        with self._lock:
+            self.compact()
+            if self._journal_fd is not None:
+                os.close(self._journal_fd)
+                self._journal_fd = None
+
+
+def _apply(data: dict, event: dict) -> None:
+    keys = event["keys"]
+    node = data
+    for key in keys[:-1]:
+        node = node.setdefault(key, {})
+    if event["op"] == "set":
+        node[keys[-1]] = event["value"]
+    else:
+        target = node.setdefault(keys[-1], {})
+        target.update(event["value"])
@@ -1,13 +1,274 @@
-"""Text extraction placeholder."""
+"""Text extraction from PDFs."""
 
 from __future__ import annotations
 
+import importlib.util
 import logging
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAGES_PER_TASK = 25
 
-def extract_text(pdf_path: Path, output_path: Path) -> None:
-    """Placeholder text extraction."""
-    logger.info("extract_text placeholder: %s -> %s", pdf_path, output_path)
+# (first page, last page, path) of an OCRmyPDF --sidecar file.
+Sidecar = Tuple[int, int, Path]
+# What OCRmyPDF writes in a sidecar for a page it did not OCR.
+_SKIPPED_PAGE = re.compile(r"\[OCR skipped on page \d+\]")
+
+# The file and reader most recently opened by this worker process, keyed by path.
+_worker_reader: Optional[Tuple[str, BinaryIO, Any]] = None
+
+
+def _require_pypdf() -> type:
+    if importlib.util.find_spec("pypdf") is None:
+        raise RuntimeError(
+            "Missing dependency 'pypdf'. Install with `pip install -r requirements.txt`."
+        )
+    from pypdf import PdfReader
+
+    return PdfReader
+
+
+def _text_block(page_number: int, text: str) -> str:
+    return f"===== PAGE {page_number:04d} =====\n{text}"
+
+
+def _page_block(page_number: int, page: Any) -> str:
+    return _text_block(page_number, page.extract_text() or "")
+
+
+def read_sidecars(sidecars: Sequence[Sidecar]) -> Dict[int, str]:
+    """Page text from OCRmyPDF sidecar files, keyed by page number.
+
+    A sidecar holds one page per form feed. Pages OCRmyPDF skipped because
+    they already had text are left out, and so is a sidecar whose page count
+    does not match its range; those pages are extracted with pypdf instead.
+    """
+    texts: Dict[int, str] = {}
+    for first_page, last_page, path in sidecars:
+        pages = path.read_text(encoding="utf-8").split("\f")
+        if len(pages) != last_page - first_page + 1:
+            logger.warning(
+                "Ignoring %s: %s page(s) for pages %s-%s", path, len(pages), first_page, last_page
+            )
+            continue
+        for number, text in enumerate(pages, start=first_page):
+            if not _SKIPPED_PAGE.fullmatch(text.strip()):
+                texts[number] = text.rstrip("\n")
+    return texts
+
+
+def _page_runs(page_count: int, known: Mapping[int, str]) -> Iterator[Tuple[int, int, bool]]:
+    """``(first, last, known)`` runs of pages that are all in ``known`` or all not."""
+    first = 1
+    while first <= page_count:
+        in_known = first in known
+        last = first
+        while last < page_count and (last + 1 in known) == in_known:
+            last += 1
+        yield first, last, in_known
+        first = last + 1
+
+
+def _page_ranges(page_count: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    return [
+        (start, min(start + pages_per_task - 1, page_count))
+        for start in range(1, page_count + 1, pages_per_task)
+    ]
+
+
+def _extract_range(pdf_path: str, first_page: int, last_page: int) -> str:
+    """Worker: the marked-up text of pages ``first_page``-``last_page``."""
+    global _worker_reader
+    if _worker_reader is None or _worker_reader[0] != pdf_path:
+        if _worker_reader is not None:
+            _worker_reader[1].close()
+            _worker_reader = None
+        # An open file, not a path: pypdf then reads objects on demand instead
+        # of loading the whole file into memory.
+        handle = open(pdf_path, "rb")
+        _worker_reader = (pdf_path, handle, _require_pypdf()(handle))
+    reader = _worker_reader[2]
+    return "\n".join(
+        _page_block(number, reader.pages[number - 1])
+        for number in range(first_page, last_page + 1)
+    )
+
+
+class _TextOutput:
+    """Page text written in order to ``<output>.part``, renamed when complete."""
+
+    def __init__(
+        self, pdf_path: Path, output_path: Path, page_count: int, from_sidecars: int = 0
+    ) -> None:
+        self.pdf_path = pdf_path
+        self.output_path = output_path
+        self.page_count = page_count
+        self.from_sidecars = from_sidecars
+        self.error: Optional[BaseException] = None
+        self._part_path = output_path.with_name(output_path.name + ".part")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self._part_path.open("w", encoding="utf-8", newline="")
+        self._empty = True
+
+    def write(self, block: str) -> None:
+        if not self._empty:
+            self._handle.write("\n")
+        self._handle.write(block)
+        self._empty = False
+
+    def finish(self) -> None:
+        self._handle.close()
+        if self.error is not None:
+            self._part_path.unlink(missing_ok=True)
+            return
+        os.replace(self._part_path, self.output_path)
+        logger.info(
+            "Extracted %s page(s) of text to %s%s",
+            self.page_count,
+            self.output_path,
+            f" ({self.from_sidecars} from OCR sidecars)" if self.from_sidecars else "",
+        )
+
+
+def extract_texts(
+    books: Sequence[Tuple[Path, Path]],
+    jobs: int,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+    sidecars: Optional[Mapping[Path, Sequence[Sidecar]]] = None,
+) -> Dict[Path, Optional[BaseException]]:
+    """Extract ``(pdf_path, output_path)`` pairs on one pool of ``jobs`` processes.
+
+    Every book is split into ranges of ``pages_per_task`` pages, submitted in
+    book order, so workers move on to the next book while the previous one's
+    last ranges finish. Results are written in page order as they arrive and
+    at most ``2 * jobs`` ranges are in flight, so memory does not grow with
+    book size. A failure only affects its own book. Pages covered by a book's
+    ``sidecars`` (see :func:`read_sidecars`) are taken from them instead of
+    being extracted. Returns each book's error, or None.
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    _require_pypdf()
+    from .pdf_ops import count_pages
+
+    results: Dict[Path, Optional[BaseException]] = {}
+    pending: Deque[Tuple[_TextOutput, Union[Future, str, None]]] = deque()
+
+    def drain_one() -> None:
+        output, future = pending.popleft()
+        if future is None:
+            output.finish()
+            results[output.pdf_path] = output.error
+            return
+        if isinstance(future, str):
+            if output.error is None:
+                output.write(future)
+            return
+        try:
+            block = future.result()
+        except Exception as exc:
+            if output.error is None:
+                logger.error("Text extraction failed for %s: %s", output.pdf_path, exc)
+                output.error = exc
+            return
+        if output.error is None:
+            output.write(block)
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        for pdf_path, output_path in books:
+            try:
+                page_count = count_pages(pdf_path)
+                known = read_sidecars((sidecars or {}).get(pdf_path, ()))
+                output = _TextOutput(pdf_path, output_path, page_count, len(known))
+            except Exception as exc:
+                logger.error("Text extraction failed for %s: %s", pdf_path, exc)
+                results[pdf_path] = exc
+                continue
+            for run_first, run_last, in_known in _page_runs(page_count, known):
+                if in_known:
+                    while len(pending) >= 2 * jobs:
+                        drain_one()
+                    block = "\n".join(
+                        _text_block(number, known[number])
+                        for number in range(run_first, run_last + 1)
+                    )
+                    pending.append((output, block))
+                    continue
+                for first_page, last_page in _page_ranges(
+                    run_last - run_first + 1, pages_per_task
+                ):
+                    while len(pending) >= 2 * jobs:
+                        drain_one()
+                    future = executor.submit(
+                        _extract_range,
+                        str(pdf_path),
+                        run_first + first_page - 1,
+                        run_first + last_page - 1,
+                    )
+                    pending.append((output, future))
+            pending.append((output, None))
+        while pending:
+            drain_one()
+    return results
+
+
+def extract_text(
+    pdf_path: Path,
+    output_path: Path,
+    jobs: int = 1,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+    sidecars: Sequence[Sidecar] = (),
+) -> Path:
+    """Write the text of every page to ``output_path`` with page markers.
+
+    Text is streamed to the output page by page. With ``jobs`` above 1, page
+    ranges are extracted in parallel by :func:`extract_texts`. Pages covered
+    by OCRmyPDF ``sidecars`` are copied from them, so only pages that were not
+    OCR'd (or whose sidecar is missing) are parsed with pypdf.
+    """
+    if jobs > 1:
+        error = extract_texts(
+            [(pdf_path, output_path)], jobs, pages_per_task, sidecars={pdf_path: sidecars}
+        )[pdf_path]
+        if error is not None:
+            raise error
+        return output_path
+
+    PdfReader = _require_pypdf()
+    with open(pdf_path, "rb") as handle:
+        reader = PdfReader(handle)
+        known = read_sidecars(sidecars)
+        output = _TextOutput(pdf_path, output_path, len(reader.pages), len(known))
+        try:
+            for number, page in enumerate(reader.pages, start=1):
+                text = known.get(number)
+                output.write(
+                    _page_block(number, page) if text is None else _text_block(number, text)
+                )
+        except BaseException as exc:
+            output.error = exc
+            raise
+        finally:
+            output.finish()
+    return output_path
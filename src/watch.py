@@ -0,0 +1,209 @@
+"""Watch an input folder and queue PDFs once they have finished arriving."""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTLE_SECONDS = 10.0
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_RESCAN_INTERVAL = 600.0
+
+# inotify(7) event masks.
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT = struct.Struct("iIII")
+
+Signature = Tuple[int, int]
+
+
+class _Inotify:
+    """Names of files created, written or moved into one folder (Linux only)."""
+
+    def __init__(self, folder: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Cannot watch {folder}")
+
+    def read(self, timeout: float) -> Optional[Set[str]]:
+        """Names changed within ``timeout`` seconds; None if events were lost."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        names: Set[str] = set()
+        while ready:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = _EVENT.unpack_from(buffer, offset)
+                offset += _EVENT.size
+                if mask & _IN_Q_OVERFLOW:
+                    return None
+                if length and not mask & _IN_IGNORED:
+                    name = buffer[offset : offset + length].rstrip(b"\0")
+                    names.add(os.fsdecode(name))
+                offset += length
+        return names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _signature(path: Path) -> Optional[Signature]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _is_pdf(name: str) -> bool:
+    return name.endswith(".pdf") and not name.startswith(".")
+
+
+class FolderWatcher:
+    """Report PDFs in ``folder`` that are new or changed and have settled.
+
+    ``known`` maps file names to the ``(size, mtime_ns)`` already queued; a file
+    with that signature is ignored. Other PDFs become candidates, and a
+    candidate is ready once its size and mtime have stayed the same for
+    ``settle_seconds`` (its mtime alone is not trusted, since copies keep it).
+
+    Changes are learned from inotify where available. Otherwise the folder is
+    listed only when its mtime changes (files are added, removed or renamed),
+    and only names not in ``known`` are stat'ed then, so an idle 50k-file
+    folder costs one ``stat`` per poll and a new file one listing. Every
+    ``rescan_interval`` seconds, and at start, known files are stat'ed too,
+    which catches files changed in place. Candidates are tracked
+    individually until they settle.
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        known: Optional[Dict[str, Signature]] = None,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        rescan_interval: float = DEFAULT_RESCAN_INTERVAL,
+        use_inotify: bool = True,
+    ) -> None:
+        self.folder = Path(folder)
+        if not self.folder.is_dir():
+            raise ValueError(f"{self.folder} is not a folder.")
+        self.known: Dict[str, Signature] = dict(known or {})
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        # name -> (signature, monotonic time it was first seen unchanged)
+        self._candidates: Dict[str, Tuple[Signature, float]] = {}
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(self.folder)
+            except OSError as exc:
+                logger.info("inotify unavailable (%s); polling %s", exc, self.folder)
+        self._folder_mtime: Optional[int] = None
+        self._last_scan = 0.0
+        self._scan()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify is not None else "polling"
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def __enter__(self) -> "FolderWatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _scan(self, full: bool = True) -> None:
+        """List the folder and make new PDFs candidates, and with ``full``
+        changed ones too."""
+        started = time.perf_counter()
+        self._folder_mtime = self.folder.stat().st_mtime_ns
+        if full:
+            self._last_scan = time.monotonic()
+        names = []
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not _is_pdf(entry.name) or (not full and entry.name in self.known):
+                    continue
+                if entry.is_file():
+                    names.append(entry.name)
+        self._consider(names)
+        logger.debug(
+            "Scanned %s%s PDF(s) in %s in %.2fs",
+            len(names),
+            "" if full else " new",
+            self.folder,
+            time.perf_counter() - started,
+        )
+
+    def _consider(self, names: Iterable[str]) -> None:
+        for name in names:
+            if _is_pdf(name) and name not in self._candidates:
+                signature = _signature(self.folder / name)
+                if signature is not None and self.known.get(name) != signature:
+                    self._candidates[name] = (signature, time.monotonic())
+
+    def _wait_for_changes(self, timeout: float) -> None:
+        if self._inotify is not None:
+            names = self._inotify.read(timeout)
+            if names is None:
+                logger.warning("inotify queue overflowed; rescanning %s", self.folder)
+                self._scan()
+            else:
+                self._consider(names)
+            return
+        time.sleep(timeout)
+        if time.monotonic() - self._last_scan >= self.rescan_interval:
+            self._scan()
+        elif self.folder.stat().st_mtime_ns != self._folder_mtime:
+            self._scan(full=False)
+
+    def _settled(self) -> List[Path]:
+        ready = []
+        now = time.monotonic()
+        for name, (signature, since) in list(self._candidates.items()):
+            current = _signature(self.folder / name)
+            if current is None:
+                del self._candidates[name]
+            elif current != signature:
+                self._candidates[name] = (current, now)
+            elif now - since >= self.settle_seconds:
+                del self._candidates[name]
+                self.known[name] = signature
+                ready.append(self.folder / name)
+        return sorted(ready)
+
+    def poll(self, timeout: Optional[float] = None) -> List[Path]:
+        """Wait up to ``timeout`` (default ``poll_interval``) for changes and
+        return the PDFs that have settled since the last call."""
+        self._wait_for_changes(self.poll_interval if timeout is None else timeout)
+        return self._settled()
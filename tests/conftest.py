@@ -0,0 +1,77 @@
+import zlib
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (
+    DecodedStreamObject,
+    DictionaryObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+
+from benchmarks.fake_tools import fake_tools
+from benchmarks.synthetic import make_book
+
+
+@pytest.fixture
+def fake_ocr():
+    """The benchmarks' fake ocrmypdf, docker, tesseract and gs first on PATH.
+
+    Tests may change ``FAKE_OCR_PAGE_LATENCY`` and friends in ``os.environ``;
+    they are restored afterwards.
+    """
+    with fake_tools() as bin_dir:
+        yield bin_dir
+
+
+@pytest.fixture
+def layout_book(tmp_path):
+    """Make a synthetic book from page codes: ``i`` image, ``t`` text, ``b`` blank
+    and ``d`` a dense scan (one large image, so the pre-scan costs it higher)."""
+
+    def add_dense_page(writer):
+        image = StreamObject()
+        image._data = zlib.compress(b"\xff" * 4000 * 4000)
+        image.update(
+            {
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(4000),
+                NameObject("/Height"): NumberObject(4000),
+                NameObject("/ColorSpace"): NameObject("/DeviceGray"),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+                NameObject("/Filter"): NameObject("/FlateDecode"),
+            }
+        )
+        contents = DecodedStreamObject()
+        contents.set_data(b"q 612 0 0 792 0 0 cm /Im0 Do Q")
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {
+                NameObject("/XObject"): DictionaryObject(
+                    {NameObject("/Im0"): writer._add_object(image)}
+                )
+            }
+        )
+        page[NameObject("/Contents")] = writer._add_object(contents)
+
+    def make(path, codes):
+        sources = {
+            code: PdfReader(make_book(tmp_path / f"layout_{code}.pdf", len(codes), every))
+            for code, every in (("i", 1), ("t", 0))
+        }
+        writer = PdfWriter()
+        for index, code in enumerate(codes):
+            if code == "b":
+                writer.add_blank_page(612, 792)
+            elif code == "d":
+                add_dense_page(writer)
+            else:
+                writer.add_page(sources[code].pages[index])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as handle:
+            writer.write(handle)
+        return path
+
+    return make
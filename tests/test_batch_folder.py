@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+
+from benchmarks.synthetic import make_book
+from src import batch_folder, ocr_chunks
+from src.leases import LeaseDirectory
+from src.status_store import StatusStore
+
+
+def _fake_run_books(calls):
+    def run_books(run_path, book_ids, **options):
+        calls.append(list(book_ids))
+        for book_id in book_ids:
+            with StatusStore(run_path / "books" / book_id / "status.json") as store:
+                if book_id.startswith("bad"):
+                    store.set(("steps", "ocr"), "failed")
+                else:
+                    store.set(("steps",), {"ocr": "completed", "extract_text": "completed"})
+        return {}
+
+    return run_books
+
+
+def test_queue_book_keeps_an_existing_folder_unless_the_file_changed(tmp_path):
+    run_path = batch_folder.create_run_folders(tmp_path / "runs", "watch")
+    pdf_path = tmp_path / "act.pdf"
+    book_id = batch_folder.queue_book(run_path, pdf_path)
+    chunk = run_path / "books" / book_id / "chunk_0001.pdf"
+    chunk.write_bytes(b"%PDF")
+
+    batch_folder.queue_book(run_path, pdf_path)
+    assert chunk.exists()
+    batch_folder.queue_book(run_path, pdf_path, changed=True)
+    assert not chunk.exists()
+    assert StatusStore(run_path / "books" / book_id / "status.json").get("steps", "ocr") == (
+        "pending"
+    )
+
+
+def test_watch_records_failed_books_and_retries_them_after_a_restart(tmp_path, monkeypatch):
+    input_folder = tmp_path / "in"
+    input_folder.mkdir()
+    for name in ("good.pdf", "bad.pdf"):
+        (input_folder / name).write_bytes(b"%PDF")
+    calls = []
+    monkeypatch.setattr(batch_folder, "run_books", _fake_run_books(calls))
+    monkeypatch.setattr(batch_folder, "format_summary", lambda summary: "")
+    options = dict(settle_seconds=0, poll_interval=0.01, use_inotify=False)
+
+    run_path = batch_folder.watch_folder(
+        input_folder, tmp_path / "runs", stop=lambda: bool(calls), **options
+    )
+    files = StatusStore(run_path / "watch.json").get("files")
+    assert {name: record["state"] for name, record in files.items()} == {
+        "good.pdf": "completed",
+        "bad.pdf": "failed",
+    }
+
+    calls.clear()
+    batch_folder.watch_folder(input_folder, tmp_path / "runs", stop=lambda: True, **options)
+    assert calls == [["bad"]]
+
+
+def test_a_book_taken_over_mid_chunk_leaves_no_chunk_behind(tmp_path, fake_ocr):
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "1"
+    make_book(tmp_path / "in" / "act.pdf", 4, image_every=1)
+    run_path = batch_folder.prepare_books(tmp_path / "in", tmp_path / "runs", "shared")
+    chunks = run_path / "books" / "act" / "chunks"
+    options = dict(chunk_size=4, backend="local", progress_interval=0)
+    stale = LeaseDirectory(run_path / "leases", owner="stale", ttl=0.3)
+    summaries = []
+    worker = threading.Thread(
+        target=lambda: summaries.append(
+            batch_folder.run_books(
+                run_path, tmp_path / "out", leases={"act": stale.claim("act")}, **options
+            )
+        )
+    )
+    worker.start()
+    deadline = time.monotonic() + 10
+    while not (chunks / "chunk_0001-0004.log").exists():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    time.sleep(0.4)
+
+    # The stale holder's OCR is still running when its lease is taken over.
+    assert LeaseDirectory(run_path / "leases", owner="new").claim("act") is not None
+    stale.renew()
+    worker.join(timeout=2)
+    assert not worker.is_alive()
+    assert summaries[0]["books_taken_over"] == 1
+    assert not (chunks / "chunk_0001-0004.pdf").exists()
+    assert not list(chunks.glob("*.part"))
+
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "0"
+    summary = batch_folder.run_books(run_path, tmp_path / "out", **options)
+    assert summary["books_completed"] == 1
+    status = StatusStore(run_path / "books" / "act" / "status.json")
+    assert status.get("chunks", "chunk_0001-0004.pdf", "status") == "completed"
+
+
+def test_born_digital_books_need_no_backend_and_text_is_extracted_apart(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setattr(ocr_chunks, "docker_available", lambda: False)
+    monkeypatch.setattr(ocr_chunks, "local_ocrmypdf_ready", lambda: False)
+    threads = []
+    extract_text = batch_folder.extract_text
+
+    def recording_extract_text(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return extract_text(*args, **kwargs)
+
+    monkeypatch.setattr(batch_folder, "extract_text", recording_extract_text)
+    for name in ("act", "code"):
+        make_book(tmp_path / "in" / f"{name}.pdf", 6, image_every=0)
+    run_path = batch_folder.prepare_books(tmp_path / "in", tmp_path / "runs", "digital")
+
+    summary = batch_folder.run_books(
+        run_path, tmp_path / "out", chunk_size=2, backend="auto", progress_interval=0
+    )
+    assert summary["books_completed"] == 2
+    assert sorted(path.name for path in (tmp_path / "out" / "output_text").iterdir()) == [
+        "act.txt",
+        "code.txt",
+    ]
+    assert all(name.startswith("extract") for name in threads) and len(threads) == 2
+
+    make_book(tmp_path / "in" / "scan.pdf", 2, image_every=1)
+    run_path = batch_folder.prepare_books(tmp_path / "in", tmp_path / "runs", "scans")
+    summary = batch_folder.run_books(
+        run_path, tmp_path / "out", backend="auto", progress_interval=0, book_ids=["scan"]
+    )
+    assert summary["books_failed"] == 1
+    status = StatusStore(run_path / "books" / "scan" / "status.json")
+    assert "Neither docker nor" in status.get("last_error")
+
+
+def test_books_share_one_pool_with_the_longest_queued_first(tmp_path, fake_ocr, monkeypatch):
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "0.05"
+    queued = []
+    run_book_jobs = batch_folder.run_book_jobs
+
+    def recording_run_book_jobs(books, *args, **kwargs):
+        queued.append([book.source_path.stem for book in books])
+        return run_book_jobs(books, *args, **kwargs)
+
+    monkeypatch.setattr(batch_folder, "run_book_jobs", recording_run_book_jobs)
+    for name, pages in (("act", 2), ("code", 6), ("rules", 4)):
+        make_book(tmp_path / "in" / f"{name}.pdf", pages, image_every=1)
+    run_path = batch_folder.prepare_books(tmp_path / "in", tmp_path / "runs", "library")
+
+    summary = batch_folder.run_books(
+        run_path, tmp_path / "out", chunk_size=2, jobs=2, backend="local", progress_interval=0
+    )
+    assert queued == [["code", "rules", "act"]]
+    assert summary["books_completed"] == 3
+    assert len(list((tmp_path / "out" / "output_text").iterdir())) == 3
@@ -0,0 +1,42 @@
+import argparse
+import sys
+import time
+
+from src import daemon
+
+
+def _parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=daemon.JOB_COMMANDS)
+    parser.add_argument("--fail", action="store_true")
+    return parser
+
+
+def _dispatch(args, out):
+    # Printed straight to stdout, as --dry-run commands do.
+    print(f"running {args.command}")
+    print("summary", file=out)
+    return 1 if args.fail else 0
+
+
+def _wait(job):
+    deadline = time.monotonic() + 10
+    while not job.done:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_jobs_capture_output_and_only_recent_jobs_are_kept(monkeypatch):
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    server = daemon.JobServer(_parser(), _dispatch, workers=1, keep_jobs=2)
+    server.start()
+    jobs = [server.submit(["ocr-one"]) for _ in range(3)]
+    failed = server.submit(["process-folder", "--fail"])
+    for job in [*jobs, failed]:
+        _wait(job)
+
+    output = [event["text"] for event in jobs[0].events if event["type"] == "output"]
+    assert output == ["running ocr-one", "summary"]
+    assert failed.state == "failed" and failed.exit_code == 1
+    assert [job.id for job in server.list()] == [jobs[2].id, failed.id]
+    assert server.get(jobs[0].id) is None
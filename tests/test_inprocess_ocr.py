@@ -0,0 +1,116 @@
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from benchmarks.synthetic import make_book
+from src import ocr_chunks
+from src.inprocess_ocr import InprocessOcrPool, ocrmypdf_importable
+from src.profiles import CpuLimits
+from src.runner import CommandCancelled, OcrmypdfNotFoundError
+
+
+def copy_worker(in_pdf, out_pdf, options):
+    shutil.copyfile(in_pdf, out_pdf)
+
+
+def hanging_worker(in_pdf, out_pdf, options):
+    if "hang" in in_pdf:
+        time.sleep(60)
+    shutil.copyfile(in_pdf, out_pdf)
+
+
+def env_worker(in_pdf, out_pdf, options):
+    with open(out_pdf, "w") as handle:
+        handle.write(os.environ.get("OMP_THREAD_LIMIT", "unset"))
+
+
+def failing_worker(in_pdf, out_pdf, options):
+    raise ValueError("bad page")
+
+
+def _pool(worker, workers=1):
+    return InprocessOcrPool(workers=workers, entry_point=f"{__name__}:{worker}")
+
+
+def _run(pool, tmp_path, name, **kwargs):
+    in_pdf = tmp_path / f"{name}.pdf"
+    in_pdf.write_bytes(b"%PDF-1.7\n")
+    out_pdf = tmp_path / f"{name}_ocr.pdf"
+    pool.run(str(in_pdf), str(out_pdf), (1, 1), "eng", **kwargs)
+    return out_pdf
+
+
+def test_jobs_run_in_worker_processes(tmp_path):
+    with _pool("copy_worker") as pool:
+        assert _run(pool, tmp_path, "a").read_bytes() == b"%PDF-1.7\n"
+        assert _run(pool, tmp_path, "b").exists()
+
+
+def test_worker_errors_are_raised_as_runtime_errors(tmp_path):
+    with _pool("failing_worker") as pool, pytest.raises(RuntimeError, match="bad page"):
+        _run(pool, tmp_path, "a")
+
+
+def test_timed_out_worker_is_killed_and_replaced(tmp_path):
+    with _pool("hanging_worker") as pool:
+        worker = pool._idle[0]
+        with pytest.raises(TimeoutError):
+            _run(pool, tmp_path, "hang", timeout_sec=0.5)
+        assert not worker.process.is_alive()
+        # The next job gets a fresh worker and its full time limit.
+        assert _run(pool, tmp_path, "after", timeout_sec=30).exists()
+
+
+def test_cancelled_jobs_kill_their_worker(tmp_path):
+    with _pool("hanging_worker", workers=2) as pool:
+        workers = list(pool._idle)
+        stop = threading.Event()
+        with pytest.raises(CommandCancelled):
+            threading.Timer(0.5, stop.set).start()
+            _run(pool, tmp_path, "hang1", cancelled=stop.is_set)
+
+        threading.Timer(0.5, pool.cancel).start()
+        with pytest.raises(CommandCancelled):
+            _run(pool, tmp_path, "hang2")
+        assert not any(worker.process.is_alive() for worker in workers)
+
+
+def test_cpu_limits_do_not_leak_into_later_jobs(tmp_path):
+    with _pool("env_worker") as pool:
+        limited = _run(pool, tmp_path, "a", cpu=CpuLimits(ocr_jobs=1, tesseract_threads=3))
+        assert limited.read_text() == "3"
+        assert _run(pool, tmp_path, "b").read_text() == "unset"
+
+
+@pytest.mark.skipif(ocrmypdf_importable(), reason="needs a Python without ocrmypdf")
+def test_dry_runs_do_not_need_ocrmypdf(tmp_path):
+    pool = InprocessOcrPool(workers=1)
+    assert pool.run("in.pdf", "out.pdf", (1, 2), "eng", dry_run=True).startswith(
+        "ocrmypdf.ocr('in.pdf', 'out.pdf'"
+    )
+    with pytest.raises(OcrmypdfNotFoundError):
+        pool.start()
+
+
+def test_runs_share_a_pool_set_by_the_server(tmp_path, monkeypatch):
+    make_book(tmp_path / "act.pdf", 4, image_every=1)
+    monkeypatch.setattr(ocr_chunks, "InprocessOcrPool", None)
+    with _pool("copy_worker") as pool:
+        ocr_chunks.share_inprocess_pool(pool)
+        try:
+            for run in ("first", "second"):
+                outputs = ocr_chunks.ocr_pdf_in_chunks(
+                    str(tmp_path / "act.pdf"),
+                    str(tmp_path / run),
+                    chunk_size=2,
+                    backend="inprocess",
+                    progress_interval=0,
+                )
+                assert len(outputs) == 2
+        finally:
+            ocr_chunks.share_inprocess_pool(None)
+        # Still open: the runs left closing it to its owner.
+        assert _run(pool, tmp_path, "after").exists()
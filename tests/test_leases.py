@@ -0,0 +1,47 @@
+import time
+
+from src.leases import LeaseDirectory
+
+
+def test_only_one_worker_holds_a_lease(tmp_path):
+    first = LeaseDirectory(tmp_path, owner="a")
+    second = LeaseDirectory(tmp_path, owner="b")
+    lease = first.claim("act")
+    assert lease is not None and lease.generation == 1
+    assert second.claim("act") is None
+    assert second.state("act") == "held"
+
+
+def test_an_expired_lease_is_taken_over_and_its_holder_told(tmp_path):
+    first = LeaseDirectory(tmp_path, owner="a", ttl=0.05)
+    second = LeaseDirectory(tmp_path, owner="b", ttl=0.05)
+    lost = []
+    lease = first.claim("act")
+    lease.on_lost = lambda: lost.append(True)
+    time.sleep(0.1)
+    assert first.state("act") == "expired"
+
+    takeover = second.claim("act")
+    assert takeover is not None and takeover.generation == 2
+    assert [path.name for path in (tmp_path / "act").iterdir()] == ["00000002.json"]
+    first.renew()
+    assert lost == [True] and lease.lost and "act" not in first.held
+    assert not first.release(lease, "completed")
+    assert second.state("act") == "held"
+
+
+def test_renewal_keeps_a_lease_alive(tmp_path):
+    with LeaseDirectory(tmp_path, owner="a", ttl=0.2) as first:
+        first.claim("act")
+        time.sleep(0.5)
+        assert LeaseDirectory(tmp_path, owner="b").claim("act") is None
+
+
+def test_finished_items_are_not_claimed_again(tmp_path):
+    leases = LeaseDirectory(tmp_path, owner="a")
+    leases.release(leases.claim("done"), "completed")
+    leases.release(leases.claim("interrupted"))
+    assert leases.state("done") == "completed"
+    assert leases.claim("done") is None
+    assert leases.state("interrupted") == "free"
+    assert leases.claim("interrupted").generation == 2
@@ -0,0 +1,42 @@
+import os
+
+from benchmarks.synthetic import make_book
+from src import metrics
+from src.ocr_chunks import ocr_pdf_in_chunks
+
+
+def test_counts_go_to_the_innermost_span():
+    with metrics.span("merge") as outer:
+        metrics.count(pages=2)
+        with metrics.span("split", pages=1) as inner:
+            metrics.count(pages=3, bytes=10)
+        metrics.count(bytes=5)
+    metrics.count(pages=100)
+    assert (outer.pages, outer.bytes) == (2, 5)
+    assert (inner.pages, inner.bytes) == (4, 10)
+    assert outer.wall_seconds >= inner.wall_seconds
+    assert metrics.current_span() is None
+
+
+def test_a_run_is_summarized_by_stage_and_exported(tmp_path, fake_ocr):
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "0.05"
+    make_book(tmp_path / "act.pdf", 6, image_every=1)
+    ocr_pdf_in_chunks(
+        str(tmp_path / "act.pdf"), str(tmp_path / "act"), chunk_size=2, progress_interval=0
+    )
+
+    summary = metrics.summarize(metrics.load_statuses(tmp_path), top=2)
+    assert summary["books"] == {"completed": 1}
+    assert summary["chunks"] == {"completed": 3}
+    assert {"ocr", "split", "merge"} <= set(summary["stages"])
+    assert summary["stages"]["ocr"]["count"] == 3
+    assert summary["stages"]["ocr"]["pages"] == 6
+    assert summary["stages"]["merge"]["pages"] == 6
+    slowest = summary["slowest_chunks"]
+    assert len(slowest) == 2 and slowest[0]["wall_seconds"] >= slowest[1]["wall_seconds"]
+    assert "Chunks: 3 completed" in metrics.format_stats(summary)
+
+    path = metrics.write_prometheus(summary, tmp_path / "lawbooks.prom", run='nightly "7"')
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert 'lawbooks_stage_pages_total{run="nightly \\"7\\"",stage="ocr"} 6' in lines
+    assert 'lawbooks_chunks{run="nightly \\"7\\"",status="completed"} 3' in lines
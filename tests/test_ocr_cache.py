@@ -0,0 +1,56 @@
+import json
+import os
+import time
+
+from src.ocr_cache import OcrCache, cache_key
+
+
+def _chunk(tmp_path, name, size):
+    path = tmp_path / f"{name}.pdf"
+    path.write_bytes(b"%" * size)
+    return path
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = OcrCache(tmp_path / "cache", max_bytes=350)
+    keys = [cache_key(str(number), {"lang": "eng"}) for number in range(3)]
+    for number, key in enumerate(keys):
+        cache.store(key, _chunk(tmp_path, str(number), 100))
+        # Distinct mtimes, oldest first.
+        entry = cache.root / key[:2] / f"{key}.pdf"
+        os.utime(entry, (time.time() - 10 + number, time.time() - 10 + number))
+    assert cache.fetch(keys[0], tmp_path / "hit.pdf")
+
+    cache.store(cache_key("3", {"lang": "eng"}), _chunk(tmp_path, "3", 100))
+    assert not cache.fetch(keys[1], tmp_path / "miss.pdf")
+    assert cache.fetch(keys[0], tmp_path / "hit.pdf")
+    assert cache.fetch(keys[2], tmp_path / "hit.pdf")
+    totals = cache.close()
+    assert (totals["hits"], totals["misses"], totals["stores"], totals["evictions"]) == (
+        3,
+        1,
+        4,
+        1,
+    )
+    assert totals["bytes"] == 300
+
+
+def test_stores_update_the_total_without_listing_the_cache(tmp_path, monkeypatch):
+    cache = OcrCache(tmp_path / "cache", max_bytes=10_000)
+    listings = []
+    entries = cache._iter_entries
+    monkeypatch.setattr(cache, "_iter_entries", lambda: listings.append(1) or entries())
+    for number in range(5):
+        cache.store(cache_key(str(number), {}), _chunk(tmp_path, str(number), 100))
+    # The first store has no total to add to; the others add their size.
+    assert len(listings) == 1
+    stats = json.loads((cache.root / "stats.json").read_text())
+    assert stats["bytes"] == 500
+
+    # Another process's total, an hour old, is listed again.
+    stats["scanned_at"] -= 3601
+    stats["bytes"] = 0
+    (cache.root / "stats.json").write_text(json.dumps(stats))
+    cache.store(cache_key("5", {}), _chunk(tmp_path, "5", 100))
+    assert len(listings) == 2
+    assert json.loads((cache.root / "stats.json").read_text())["bytes"] == 600
@@ -0,0 +1,180 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import pytest
+from pypdf import PdfReader
+
+from src.ocr_chunks import MAX_TEXT_GAP, ChunkFailures, RetryPolicy, ocr_pdf_in_chunks
+
+
+def flaky_worker(in_pdf, out_pdf, options):
+    marker = in_pdf + ".tried"
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        raise OSError("scanner glitch")
+    shutil.copyfile(in_pdf, out_pdf)
+
+
+def broken_pages_worker(in_pdf, out_pdf, options):
+    if "chunk_0003" in in_pdf or "chunk_0007" in in_pdf:
+        raise ValueError("bad page")
+    shutil.copyfile(in_pdf, out_pdf)
+
+
+def _ocr(tmp_path, codes, layout_book, **options):
+    book = layout_book(tmp_path / "act.pdf", codes)
+    options.setdefault("backend", "local")
+    chunks = ocr_pdf_in_chunks(str(book), str(tmp_path / "work"), progress_interval=0, **options)
+    return [tuple(map(int, re.findall(r"\d+", chunk.name))) for chunk in chunks]
+
+
+def test_short_text_gaps_stay_inside_chunks(tmp_path, fake_ocr, layout_book):
+    assert _ocr(tmp_path, "it" * 10, layout_book, chunk_size=5) == [
+        (1, 5),
+        (6, 10),
+        (11, 15),
+        (16, 19),
+    ]
+    assert len(PdfReader(tmp_path / "work" / "act_ocr.pdf").pages) == 20
+
+
+def test_long_text_runs_split_chunks(tmp_path, fake_ocr, layout_book):
+    gap = "t" * (MAX_TEXT_GAP + 1)
+    second = 3 + len(gap)
+    codes = "ii" + gap + "i" + "t" * MAX_TEXT_GAP + "ib"
+    assert _ocr(tmp_path, codes, layout_book) == [(1, 2), (second, second + MAX_TEXT_GAP + 1)]
+
+
+def test_books_without_scans_never_start_the_backend(tmp_path, layout_book):
+    # No fake tools on PATH: the book must not need any.
+    assert _ocr(tmp_path, "ttbt", layout_book, backend="docker") == []
+    assert len(PdfReader(tmp_path / "work" / "act_ocr.pdf").pages) == 4
+
+
+def test_pages_count_when_chunks_finish_without_a_progress_bar(
+    tmp_path, layout_book, monkeypatch, caplog
+):
+    # The stub worker copies its input and prints nothing.
+    monkeypatch.setenv("LAWBOOKS_INPROCESS_WORKER", "tests.test_inprocess_ocr:copy_worker")
+    caplog.set_level("INFO", logger="src.progress")
+    book = layout_book(tmp_path / "act.pdf", "i" * 8)
+    ocr_pdf_in_chunks(
+        str(book), str(tmp_path / "work"), chunk_size=4, backend="inprocess", progress_interval=60
+    )
+    progress = [record.progress for record in caplog.records if hasattr(record, "progress")]
+    assert progress[-1]["books"]["act"]["pages_done"] == 8
+
+
+def _status(tmp_path):
+    return json.loads((tmp_path / "work" / "status.json").read_text())
+
+
+def test_chunks_run_concurrently_and_come_back_in_page_order(tmp_path, fake_ocr, layout_book):
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "0.2"
+    assert _ocr(tmp_path, "i" * 8, layout_book, chunk_size=2, jobs=4) == [
+        (1, 2),
+        (3, 4),
+        (5, 6),
+        (7, 8),
+    ]
+    status = _status(tmp_path)
+    ocr_seconds = sum(chunk["ocr_seconds"] for chunk in status["chunks"].values())
+    # Four 0.4s chunks at once take about as long as one, not as four.
+    assert ocr_seconds > 2 * status["metrics"]["elapsed_seconds"]
+
+
+def test_chunks_are_split_ahead_of_the_workers_but_only_lookahead_deep(
+    tmp_path, fake_ocr, layout_book
+):
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "0.2"
+    chunks_dir = tmp_path / "work" / "chunks"
+    waiting = []
+    done = threading.Event()
+
+    def watch():
+        while not done.is_set():
+            waiting.append(len(list(chunks_dir.glob("*_input.pdf"))))
+            time.sleep(0.02)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    try:
+        chunks = _ocr(tmp_path, "i" * 10, layout_book, chunk_size=2, jobs=1, lookahead=1)
+    finally:
+        done.set()
+        watcher.join()
+    assert len(chunks) == 5
+    # One input on the worker and one split ahead, never more.
+    assert max(waiting) == 2
+    assert not list(chunks_dir.glob("*_input.pdf"))
+    for record in _status(tmp_path)["chunks"].values():
+        assert record["split_seconds"] >= 0
+        assert record["metrics"]["split"]["pages"] == 2
+
+
+def test_a_rerun_keeps_the_merged_pdf_while_its_chunks_are_unchanged(
+    tmp_path, fake_ocr, layout_book
+):
+    _ocr(tmp_path, "iitii", layout_book, chunk_size=2)
+    merged = tmp_path / "work" / "act_ocr.pdf"
+    merge = _status(tmp_path)["merge"]
+    assert merge["status"] == "completed" and merge["pages"] == 5
+    written = merged.stat().st_mtime_ns
+
+    _ocr(tmp_path, "iitii", layout_book, chunk_size=2)
+    assert merged.stat().st_mtime_ns == written
+    _ocr(tmp_path, "iitii", layout_book, chunk_size=2, force=True)
+    assert merged.stat().st_mtime_ns != written
+    assert len(PdfReader(merged).pages) == 5
+
+
+def test_cost_chunking_gives_dense_scans_shorter_chunks(tmp_path, fake_ocr, layout_book):
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "0.05"
+    # Fixed chunking would give (1, 4), (5, 8) and (9, 12).
+    assert _ocr(tmp_path, "i" * 8 + "dddd", layout_book, chunk_size=4, chunking="cost") == [
+        (1, 8),
+        (9, 10),
+        (11, 12),
+    ]
+    status = _status(tmp_path)
+    costs = [status["chunks"][name]["estimated_cost"] for name in sorted(status["chunks"])]
+    assert max(costs) < 2 * min(costs)
+    assert status["cost_model"]["chunks"] == 3
+    assert status["prescan"]["pages"] == "i" * 12
+
+
+def test_failed_attempts_are_retried(tmp_path, layout_book, monkeypatch):
+    monkeypatch.setenv("LAWBOOKS_INPROCESS_WORKER", f"{__name__}:flaky_worker")
+    retry = RetryPolicy(attempts=2, backoff_seconds=0)
+    chunks = _ocr(tmp_path, "iiii", layout_book, chunk_size=2, backend="inprocess", retry=retry)
+    assert len(chunks) == 2
+    records = _status(tmp_path)["chunks"].values()
+    assert [(record["status"], record["attempts"]) for record in records] == [("completed", 2)] * 2
+
+
+def test_keep_going_reports_every_failed_chunk(tmp_path, layout_book, monkeypatch):
+    monkeypatch.setenv("LAWBOOKS_INPROCESS_WORKER", f"{__name__}:broken_pages_worker")
+    with pytest.raises(ChunkFailures) as failures:
+        _ocr(tmp_path, "i" * 8, layout_book, chunk_size=2, backend="inprocess", keep_going=True)
+    assert sorted(failures.value.errors) == ["chunk_0003-0004.pdf", "chunk_0007-0008.pdf"]
+    states = {name: record["status"] for name, record in _status(tmp_path)["chunks"].items()}
+    assert states == {
+        "chunk_0001-0002.pdf": "completed",
+        "chunk_0003-0004.pdf": "failed",
+        "chunk_0005-0006.pdf": "completed",
+        "chunk_0007-0008.pdf": "failed",
+    }
+    assert not (tmp_path / "work" / "act_ocr.pdf").exists()
+
+    # Without keep_going the first failure stops the book and is raised alone.
+    with pytest.raises(RuntimeError, match="bad page") as failure:
+        _ocr(tmp_path, "i" * 8, layout_book, chunk_size=2, backend="inprocess")
+    assert not isinstance(failure.value, ChunkFailures)
+    # One attempt in each run; completed chunks were not run again.
+    chunks = _status(tmp_path)["chunks"]
+    assert chunks["chunk_0003-0004.pdf"]["attempts"] == 2
+    assert chunks["chunk_0001-0002.pdf"]["attempts"] == 1
@@ -0,0 +1,43 @@
+import pytest
+
+from src.page_store import PageStore, pack_text_files, read_text_pages
+
+PAGES = [
+    "Short title\n",
+    "1. Interpretation\n\nIn this Act, unless the context otherwise requires,\n" * 8,
+    "",
+    "Schedule — Forms ✓",
+]
+
+
+def write_book(path, pages):
+    # The layout text extraction writes: blocks joined by a newline.
+    blocks = [f"===== PAGE {number:04d} =====\n{text}" for number, text in enumerate(pages, 1)]
+    path.write_text("\n".join(blocks), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_pages_round_trip_through_a_packed_store(tmp_path, compress):
+    act = write_book(tmp_path / "act.txt", PAGES)
+    code = write_book(tmp_path / "code.txt", ["only page"])
+    assert list(read_text_pages(act)) == PAGES
+
+    store_path = pack_text_files([act, code], tmp_path / "pages.lbp", compress=compress)
+    with PageStore(store_path) as store:
+        assert store.books == ["act", "code"]
+        assert store.page_count("act") == 4
+        assert store.get_page(2, "act") == PAGES[1]
+        assert list(store.iter_pages("act")) == PAGES
+        assert store.get_page(1, "code") == "only page"
+        with pytest.raises(IndexError):
+            store.get_page(5, "act")
+        with pytest.raises(ValueError):
+            store.get_page(1)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "act.txt"
+    path.write_text("not a page store", encoding="utf-8")
+    with pytest.raises(ValueError):
+        PageStore(path)
@@ -0,0 +1,50 @@
+import pytest
+from pypdf import PdfReader
+
+from benchmarks.synthetic import make_book
+from src import pdf_ops
+from src.pdf_ops import merge_pdfs
+
+
+def _page_labels(path):
+    return [page.extract_text().split("\n")[0] for page in PdfReader(path).pages]
+
+
+def test_whole_files_and_page_ranges_are_merged_in_order(tmp_path):
+    first = make_book(tmp_path / "first.pdf", 3, image_every=0)
+    second = make_book(tmp_path / "second.pdf", 2, image_every=0)
+    merged = merge_pdfs(
+        [(first, 1, 2), second, (first, 3, 3)], tmp_path / "out.pdf", expected_pages=[2, 2, 1]
+    )
+    assert _page_labels(merged) == ["Page 1", "Page 2", "Page 1", "Page 2", "Page 3"]
+    assert not list(tmp_path.glob("out.pdf.part*"))
+
+    with pytest.raises(ValueError, match="expected 3"):
+        merge_pdfs([second], tmp_path / "bad.pdf", expected_pages=[3])
+
+
+def test_an_interrupted_merge_resumes_after_its_last_input(tmp_path, monkeypatch, caplog):
+    inputs = [make_book(tmp_path / f"{index}.pdf", 2, image_every=0) for index in range(3)]
+    opened = []
+    unreadable = {str(inputs[2])}
+
+    def failing_reader(path):
+        opened.append(path)
+        if path in unreadable:
+            raise OSError("disk went away")
+        return PdfReader(path)
+
+    monkeypatch.setattr(pdf_ops, "PdfReader", failing_reader)
+    with pytest.raises(OSError):
+        merge_pdfs(inputs, tmp_path / "out.pdf")
+    assert (tmp_path / "out.pdf.part.json").exists()
+
+    opened.clear()
+    unreadable.clear()
+    caplog.set_level("INFO", logger="src.pdf_ops")
+    merged = merge_pdfs(inputs, tmp_path / "out.pdf", expected_pages=[2, 2, 2])
+    # Only the input that had not been merged is read again.
+    assert opened == [str(inputs[2])]
+    assert "after 2 of 3 input(s)" in caplog.text
+    assert _page_labels(merged) == ["Page 1", "Page 2"] * 3
+    assert not (tmp_path / "out.pdf.part.json").exists()
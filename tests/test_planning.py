@@ -0,0 +1,44 @@
+from benchmarks.synthetic import make_book
+from src import planning
+from src.planning import Rates, simulate
+
+
+def test_longest_book_first_shortens_the_run():
+    rates = Rates(seconds_per_page=1.0)
+    books = [("a", 10), ("b", 10), ("big", 20)]
+    assert simulate(books, jobs=2, chunk_size=100, rates=rates) == (
+        30.0,
+        {"a": 10.0, "b": 10.0, "big": 30.0},
+    )
+    wall, finished = simulate(sorted(books, key=lambda book: -book[1]), 2, 100, rates)
+    assert wall == 20.0
+    assert finished == {"big": 20.0, "a": 10.0, "b": 20.0}
+
+
+def test_chunks_spread_over_workers_and_other_stages_follow():
+    rates = Rates(seconds_per_page=1.0, ocr_fraction=0.5, other_seconds_per_page=0.1)
+    wall, finished = simulate([("act", 40)], jobs=2, chunk_size=5, rates=rates)
+    # 20 pages to OCR in four chunks on two workers, then 4s of extraction.
+    assert finished == {"act": 14.0}
+    assert wall == 14.0
+    assert simulate([], 4, 25, rates) == (0.0, {})
+
+
+def test_page_counts_are_cached_until_the_file_changes(tmp_path):
+    library = tmp_path / "library"
+    library.mkdir()
+    make_book(library / "act.pdf", 6)
+    make_book(library / "code.pdf", 3)
+    runs = tmp_path / "runs"
+
+    plan = planning.plan_library(library, runs, jobs=2, chunk_size=2)
+    assert plan["pages"] == 9 and plan["cached_counts"] == 0
+    assert "no cost-balanced chunks" in planning.format_plan(plan)
+    assert [book["book"] for book in plan["order"]] == ["act", "code"]
+
+    make_book(library / "code.pdf", 8)
+    books = planning.scan_library(library, runs / planning.PAGE_COUNT_CACHE)
+    assert {(book.name, book.pages, book.cached) for book in books} == {
+        ("act", 6, True),
+        ("code", 8, False),
+    }
@@ -0,0 +1,54 @@
+import io
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from src.prescan import BLANK, IMAGE, TEXT, scan_pages
+
+FONT = DictionaryObject(
+    {
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }
+)
+
+
+def _book(*pages):
+    """A PDF with one page per ``(content stream, has font)`` pair, read back."""
+    writer = PdfWriter()
+    for contents, has_font in pages:
+        page = writer.add_blank_page(612, 792)
+        stream = DecodedStreamObject()
+        stream.set_data(contents)
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        resources = DictionaryObject()
+        if has_font:
+            resources[NameObject("/Font")] = DictionaryObject(
+                {NameObject("/F1"): writer._add_object(FONT)}
+            )
+        page[NameObject("/Resources")] = resources
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return PdfReader(buffer)
+
+
+def test_pages_showing_strings_are_text_and_fonts_alone_are_not():
+    codes, costs = scan_pages(
+        _book(
+            (b"BT /F1 12 Tf 72 720 Td (Section 1) Tj ET", True),
+            (b"BT /F1 12 Tf 72 720 Td [(Sec) -20 (tion)] TJ ET", True),
+            (b"BT /F1 12 Tf 72 720 Td () Tj ET", True),
+            (b"", False),
+        )
+    )
+    assert codes == TEXT + TEXT + IMAGE + BLANK
+    assert costs[0] < costs[2]
+
+
+def test_inline_images_need_ocr():
+    pixels = b"\x80" * 64 * 64
+    inline = b"q 612 0 0 792 0 0 cm BI /W 64 /H 64 /BPC 8 /CS /G ID " + pixels + b" EI Q"
+    codes, costs = scan_pages(_book((inline, False), (b"q Q", False)))
+    assert codes == IMAGE + BLANK
+    assert costs[0] > costs[1]
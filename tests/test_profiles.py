@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from benchmarks.synthetic import make_book
+from src.ocr_chunks import ocr_pdf_in_chunks
+from src.profiles import CpuBudget, CpuLimits, get_profile
+
+
+def test_cores_go_to_pages_before_tesseract_threads():
+    budget = CpuBudget(jobs=2, cpus=8)
+    assert budget.limits(10) == CpuLimits(ocr_jobs=4, tesseract_threads=1)
+    assert budget.limits(2) == CpuLimits(ocr_jobs=2, tesseract_threads=2)
+    assert budget.limits(1) == CpuLimits(ocr_jobs=1, tesseract_threads=4)
+    assert budget.limits(1).env() == {"OMP_THREAD_LIMIT": "4"}
+
+    crowded = CpuBudget(jobs=6, cpus=4)
+    assert crowded.oversubscribed
+    assert crowded.limits(10) == CpuLimits(ocr_jobs=1, tesseract_threads=1)
+    with pytest.raises(ValueError):
+        CpuBudget(jobs=0, cpus=4)
+    with pytest.raises(ValueError, match="Choose from"):
+        get_profile("quick")
+
+
+def test_each_chunk_records_its_share_of_the_cpus(tmp_path, fake_ocr, caplog):
+    make_book(tmp_path / "act.pdf", 5, image_every=1)
+    ocr_pdf_in_chunks(
+        str(tmp_path / "act.pdf"),
+        str(tmp_path / "work"),
+        chunk_size=2,
+        jobs=2,
+        cpus=8,
+        backend="local",
+        progress_interval=0,
+    )
+    chunks = json.loads((tmp_path / "work" / "status.json").read_text())["chunks"]
+    assert {name: chunk["cpu"] for name, chunk in chunks.items()} == {
+        "chunk_0001-0002.pdf": {"ocr_jobs": 2, "tesseract_threads": 2},
+        "chunk_0003-0004.pdf": {"ocr_jobs": 2, "tesseract_threads": 2},
+        "chunk_0005-0005.pdf": {"ocr_jobs": 1, "tesseract_threads": 4},
+    }
+    assert "compete for cores" not in caplog.text
+
+    ocr_pdf_in_chunks(
+        str(tmp_path / "act.pdf"),
+        str(tmp_path / "crowded"),
+        chunk_size=2,
+        jobs=3,
+        cpus=2,
+        backend="local",
+        progress_interval=0,
+    )
+    assert "3 concurrent chunks on 2 CPU(s)" in caplog.text
@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+
+import pytest
+
+from benchmarks.synthetic import make_book
+from src import runner
+from src.ocr_chunks import ocr_pdf_in_chunks
+from src.status_store import StatusStore
+
+# stderr of OCRmyPDF 14 (tqdm) on a four-page chunk, as written to a pipe.
+TQDM_OUTPUT = (
+    "Start processing 4 pages concurrently\n"
+    "Scanning contents: 100%|##########| 4/4 [00:00<00:00, 96.31page/s]\n"
+    "\rOCR:   0%|          | 0/4 [00:00<?, ?page/s]"
+    "\rOCR:  25%|##5       | 1/4 [00:02<00:07,  2.41s/page]"
+    "\rOCR:  50%|#####     | 2/4 [00:04<00:04,  2.20s/page]"
+    "\rOCR: 100%|##########| 4/4 [00:07<00:00,  1.78s/page]\n"
+    "PDF/A conversion: 100%|##########| 4/4 [00:01<00:00,  3.12page/s]\n"
+)
+# The same from OCRmyPDF 15 and later (rich), with colour codes.
+RICH_OUTPUT = (
+    "\x1b[2KOCR \x1b[38;5;237m━━━━━━━━━━\x1b[0m \x1b[35m  0%\x1b[0m 0/4 "
+    "\x1b[36m-:--:--\x1b[0m\r"
+    "\x1b[2KOCR \x1b[38;2;249;38;114m━━━━━\x1b[0m \x1b[35m 50%\x1b[0m 2/4 "
+    "\x1b[36m0:00:04\x1b[0m\r"
+    "\x1b[2KOCR \x1b[38;2;114;156;31m━━━━━━━━━━\x1b[0m \x1b[35m100%\x1b[0m 4/4 "
+    "\x1b[36m0:00:00\x1b[0m\n"
+    "Optimize ratio: 1.12 savings: 10.9%\n"
+)
+
+
+def _pages_reported(output, tmp_path):
+    pages = []
+    runner.run_command(
+        [sys.executable, "-c", f"import sys; sys.stderr.write({output!r})"],
+        timeout_sec=30,
+        log_path=tmp_path / "chunk.log",
+        on_output=runner.ocr_progress_listener(pages.append),
+    )
+    return pages
+
+
+def test_progress_is_read_from_ocrmypdf_output(tmp_path):
+    assert _pages_reported(TQDM_OUTPUT, tmp_path) == [0, 1, 2, 4]
+    assert _pages_reported(RICH_OUTPUT, tmp_path) == [0, 2, 4]
+
+
+def test_other_progress_bars_are_not_counted_as_ocr(tmp_path):
+    output = "Scanning contents: 100%|##########| 4/4\nPDF/A conversion: 1/1\n"
+    assert _pages_reported(output, tmp_path) == []
+
+
+@pytest.fixture
+def docker_calls(tmp_path, fake_ocr, monkeypatch):
+    """Record every docker command line, then hand it to the fake docker."""
+    log = tmp_path / "docker.log"
+    shim = tmp_path / "shim" / "docker"
+    shim.parent.mkdir()
+    fake = str(fake_ocr / "docker")
+    shim.write_text(
+        f"#!{sys.executable}\n"
+        "import json, os, sys\n"
+        f"with open({str(log)!r}, 'a') as handle:\n"
+        "    handle.write(json.dumps(sys.argv[1:]) + '\\n')\n"
+        f"os.execv({fake!r}, [{fake!r}, *sys.argv[1:]])\n"
+    )
+    shim.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{shim.parent}{os.pathsep}{os.environ['PATH']}")
+
+    def calls():
+        if not log.exists():
+            return []
+        return [json.loads(line) for line in log.read_text().splitlines()]
+
+    return calls
+
+
+def test_a_pool_runs_chunks_in_its_containers_and_removes_them(tmp_path, docker_calls):
+    make_book(tmp_path / "act.pdf", 6, image_every=1)
+    chunks = ocr_pdf_in_chunks(
+        str(tmp_path / "act.pdf"),
+        str(tmp_path / "work"),
+        chunk_size=2,
+        jobs=2,
+        backend="docker",
+        reuse_containers=True,
+        progress_interval=0,
+    )
+    assert len(chunks) == 3
+    commands = [call[0] for call in docker_calls()]
+    # Two containers, one exec per chunk, one rm; no overhead probe.
+    assert commands == ["run", "run", "exec", "exec", "exec", "rm"]
+    assert not os.listdir(os.environ["FAKE_DOCKER_STATE"])
+    summary = StatusStore(tmp_path / "work" / "status.json").get("docker_pool")
+    assert summary["containers"] == 2 and summary["jobs_run"] == 3
+    assert summary["cold_run_seconds"] is None
+
+
+def test_a_timed_out_container_is_removed_by_name(tmp_path, docker_calls):
+    make_book(tmp_path / "in.pdf", 4, image_every=1)
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "2"
+    with pytest.raises(TimeoutError):
+        runner.run_docker_ocrmypdf(
+            str(tmp_path),
+            str(tmp_path / "in.pdf"),
+            str(tmp_path / "out.pdf"),
+            pages_range=(1, 4),
+            lang="eng",
+            timeout_sec=0.5,
+        )
+    run, rm = docker_calls()
+    name = run[run.index("--name") + 1]
+    assert name.startswith("lawbooks-ocr-")
+    assert rm == ["rm", "-f", name]
+
+
+def test_a_timed_out_pool_container_is_restarted_not_removed(tmp_path, docker_calls):
+    make_book(tmp_path / "in.pdf", 4, image_every=1)
+    os.environ["FAKE_OCR_PAGE_LATENCY"] = "2"
+    with runner.DockerContainerPool(str(tmp_path), size=1) as pool:
+        with pool.acquire() as container, pytest.raises(TimeoutError):
+            runner.run_docker_ocrmypdf(
+                str(tmp_path),
+                str(tmp_path / "in.pdf"),
+                str(tmp_path / "out.pdf"),
+                pages_range=(1, 4),
+                lang="eng",
+                timeout_sec=0.5,
+                container=container,
+            )
+        assert docker_calls()[-1] == ["restart", "-t", "0", container]
+    assert docker_calls()[-1] == ["rm", "-f", container]
@@ -0,0 +1,49 @@
+import os
+import time
+
+from benchmarks.synthetic import make_book
+from src.ocr_chunks import ocr_pdf_in_chunks
+from src.scratch import ScratchSpace, remove_stale
+
+
+def _age(path, seconds=3600):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_stale_folders_are_removed_and_live_ones_kept(tmp_path):
+    crashed = tmp_path / "lawbooks-crashed"
+    crashed.mkdir()
+    (crashed / ".lock").write_text("")
+    _age(crashed)
+    starting = tmp_path / "lawbooks-starting"
+    starting.mkdir()
+
+    with ScratchSpace(tmp_path) as live:
+        assert live.path.name.startswith("lawbooks-")
+        assert (live.path / ".lock").exists()
+        _age(live.path)
+        assert not crashed.exists()
+
+        assert remove_stale(tmp_path) == 0
+        assert live.path.exists() and starting.exists()
+        folder = live.folder("book")
+    assert not folder.exists()
+    assert not list(tmp_path.glob(".new-lawbooks-*"))
+
+
+def test_dry_runs_neither_create_nor_mount_scratch_space(tmp_path, fake_ocr, capsys):
+    make_book(tmp_path / "act.pdf", 4, image_every=1)
+    ocr_pdf_in_chunks(
+        str(tmp_path / "act.pdf"),
+        str(tmp_path / "work"),
+        chunk_size=2,
+        dry_run=True,
+        backend="docker",
+        scratch_dir=tmp_path / "scratch",
+        progress_interval=0,
+    )
+    commands = [line for line in capsys.readouterr().out.splitlines() if "DRY RUN" in line]
+    assert len(commands) == 2
+    assert not any("/scratch" in command for command in commands)
+    assert not (tmp_path / "scratch").exists()
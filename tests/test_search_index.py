@@ -0,0 +1,43 @@
+from src.search_index import SearchHit, SearchIndex
+
+
+def write_book(path, pages):
+    blocks = [f"===== PAGE {number:04d} =====\n{text}" for number, text in enumerate(pages, 1)]
+    path.write_text("\n".join(blocks), encoding="utf-8")
+    return path
+
+
+def test_citations_and_phrases_are_found(tmp_path):
+    act = write_book(
+        tmp_path / "act.txt",
+        [
+            "Part 1 Preliminary",
+            "An order under s. 12(3) may be revoked by the Minister.",
+            "Section 12 applies; see also subsection (3) of section 40.",
+        ],
+    )
+    code = write_book(tmp_path / "code.txt", ["The Minister may revoke an order under s.12(3)."])
+    with SearchIndex(tmp_path / "index.sqlite") as index:
+        assert index.update([act, code])["added"] == 2
+
+        assert index.search("s. 12(3)") == [
+            SearchHit("act", 2, 1),
+            SearchHit("code", 1, 1),
+        ]
+        assert index.search('"revoked by the minister"') == [SearchHit("act", 2, 1)]
+        assert index.search('"minister revoked"') == []
+        assert [hit.page for hit in index.search("section 12")] == [3]
+
+
+def test_update_reindexes_changed_files_and_prunes_missing_ones(tmp_path):
+    act = write_book(tmp_path / "act.txt", ["old wording"])
+    code = write_book(tmp_path / "code.txt", ["penalty units"])
+    with SearchIndex(tmp_path / "index.sqlite") as index:
+        index.update([act, code])
+        write_book(act, ["new wording", "second page"])
+        counts = index.update([act])
+        assert (counts["updated"], counts["removed"], counts["pages"]) == (1, 1, 2)
+        assert index.search("old") == []
+        assert index.search("wording") == [SearchHit("act", 1, 1)]
+        assert index.search("penalty") == []
+        assert index.update([act])["unchanged"] == 1
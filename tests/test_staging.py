@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from src.staging import stage_source
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "library" / "act.pdf"
+    path.parent.mkdir()
+    path.write_bytes(b"%PDF-1.7\n" + b"0" * 1000)
+    return path
+
+
+def test_auto_shares_the_source_and_reuses_it_while_unchanged(tmp_path, source):
+    dest = tmp_path / "run" / "input.pdf"
+    staged, record = stage_source(source, dest)
+    assert staged == dest and dest.read_bytes() == source.read_bytes()
+    assert record["strategy"] in {"reflink", "hardlink"}
+
+    assert stage_source(source, dest, previous=record) == (dest, record)
+    replacement = source.with_name("new.pdf")
+    replacement.write_bytes(b"%PDF-1.7\nchanged")
+    os.replace(replacement, source)
+    _, changed = stage_source(source, dest, previous=record)
+    assert changed["size"] != record["size"]
+    assert dest.read_bytes() == b"%PDF-1.7\nchanged"
+
+
+def test_auto_falls_back_to_a_symlink_then_a_copy(tmp_path, source, monkeypatch):
+    fcntl = pytest.importorskip("fcntl")
+
+    def unsupported(*args):
+        raise OSError("not supported")
+
+    monkeypatch.setattr(fcntl, "ioctl", unsupported)
+    monkeypatch.setattr(os, "link", unsupported)
+    dest = tmp_path / "run" / "input.pdf"
+    dest.parent.mkdir()
+    _, record = stage_source(source, dest)
+    assert record["strategy"] == "symlink"
+    assert dest.is_symlink() and os.readlink(dest) == str(source)
+
+    monkeypatch.setattr(os, "symlink", unsupported)
+    copy = tmp_path / "other" / "input.pdf"
+    _, record = stage_source(source, copy)
+    assert record["strategy"] == "copy"
+    assert not copy.is_symlink() and copy.read_bytes() == source.read_bytes()
+
+
+def test_reference_reads_the_source_in_place(tmp_path, source):
+    staged, record = stage_source(source, tmp_path / "run" / "input.pdf", strategy="reference")
+    assert staged == source and record["strategy"] == "reference"
+    with pytest.raises(ValueError):
+        stage_source(source, tmp_path / "input.pdf", strategy="mount")
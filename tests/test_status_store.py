@@ -0,0 +1,70 @@
+import json
+
+from src.status_store import StatusStore
+
+
+def test_journal_replays_without_a_snapshot(tmp_path):
+    store = StatusStore(tmp_path / "status.json")
+    store.set(("steps", "ocr"), "pending")
+    store.update(("steps",), {"extract_text": "completed"})
+    store.set(("steps", "ocr"), "completed")
+
+    reloaded = StatusStore(tmp_path / "status.json")
+    assert not (tmp_path / "status.json").exists()
+    assert reloaded.get("steps") == {"ocr": "completed", "extract_text": "completed"}
+
+
+def test_compaction_writes_the_snapshot_and_drops_the_journal(tmp_path):
+    store = StatusStore(tmp_path / "status.json", compact_every=3)
+    for index in range(3):
+        store.set(("chunks", str(index)), {"status": "completed"})
+
+    assert not store.journal_path.exists()
+    snapshot = json.loads((tmp_path / "status.json").read_text(encoding="utf-8"))
+    assert sorted(snapshot["chunks"]) == ["0", "1", "2"]
+
+    store.set(("pages",), 10)
+    store.close()
+    assert StatusStore(tmp_path / "status.json").get("pages") == 10
+
+
+def _torn_journal(tmp_path):
+    store = StatusStore(tmp_path / "status.json")
+    store.set(("steps", "ocr"), "completed")
+    store.freeze()
+    with store.journal_path.open("ab") as handle:
+        handle.write(b'{"op":"set","keys":["pa')
+    return store.journal_path
+
+
+def test_loading_skips_a_torn_tail_without_writing(tmp_path):
+    journal_path = _torn_journal(tmp_path)
+    size = journal_path.stat().st_size
+
+    reader = StatusStore(tmp_path / "status.json")
+    assert reader.get("steps", "ocr") == "completed"
+    assert reader.get("pa") is None
+    assert journal_path.stat().st_size == size
+
+
+def test_first_append_cuts_off_the_torn_tail(tmp_path):
+    journal_path = _torn_journal(tmp_path)
+
+    writer = StatusStore(tmp_path / "status.json")
+    writer.set(("pages",), 12)
+
+    lines = journal_path.read_bytes().splitlines(keepends=True)
+    assert all(line.endswith(b"\n") for line in lines)
+    assert [json.loads(line)["keys"] for line in lines] == [["steps", "ocr"], ["pages"]]
+    assert StatusStore(tmp_path / "status.json").get("pages") == 12
+
+
+def test_frozen_store_changes_only_in_memory(tmp_path):
+    store = StatusStore(tmp_path / "status.json")
+    store.set(("steps", "ocr"), "running")
+    store.freeze()
+    store.set(("steps", "ocr"), "failed")
+    store.close()
+
+    assert store.get("steps", "ocr") == "failed"
+    assert StatusStore(tmp_path / "status.json").get("steps", "ocr") == "running"
@@ -0,0 +1,63 @@
+from benchmarks.synthetic import make_book
+from src.ocr_chunks import chunk_sidecars, ocr_pdf_in_chunks
+from src.text_extract import extract_text, extract_texts
+
+
+def test_parallel_extraction_matches_a_single_process(tmp_path):
+    book = make_book(tmp_path / "act.pdf", 7, image_every=3)
+    serial = extract_text(book, tmp_path / "serial.txt")
+    parallel = extract_text(book, tmp_path / "parallel.txt", jobs=3, pages_per_task=2)
+    text = serial.read_text(encoding="utf-8")
+    assert parallel.read_text(encoding="utf-8") == text
+    assert text.count("===== PAGE ") == 7 and "===== PAGE 0007 =====" in text
+
+
+def test_a_broken_book_fails_alone_on_a_shared_pool(tmp_path):
+    books = [make_book(tmp_path / f"{name}.pdf", 5, image_every=0) for name in ("act", "code")]
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+    pairs = [(pdf, tmp_path / "text" / f"{pdf.stem}.txt") for pdf in (books[0], broken, books[1])]
+
+    results = extract_texts(pairs, jobs=2, pages_per_task=2)
+    assert results[books[0]] is None and results[books[1]] is None
+    assert results[broken] is not None
+    assert sorted(path.name for path in (tmp_path / "text").iterdir()) == ["act.txt", "code.txt"]
+    for pdf, output in pairs[::2]:
+        assert output.read_text(encoding="utf-8") == extract_text(
+            pdf, tmp_path / "serial.txt"
+        ).read_text(encoding="utf-8")
+
+
+def _pages(path):
+    return path.read_text(encoding="utf-8").split("===== PAGE ")[1:]
+
+
+def test_sidecar_pages_are_used_and_skipped_pages_extracted(tmp_path):
+    book = make_book(tmp_path / "act.pdf", 5, image_every=0)
+    sidecar = tmp_path / "chunk.txt"
+    sidecar.write_text("Second\n\f[OCR skipped on page 2]\n\fFourth\n", encoding="utf-8")
+    wrong = tmp_path / "wrong.txt"
+    wrong.write_text("Only one page\n", encoding="utf-8")
+    sidecars = [(2, 4, sidecar), (5, 5, sidecar), (1, 2, wrong)]
+
+    for jobs in (1, 2):
+        pages = _pages(extract_text(book, tmp_path / "act.txt", jobs=jobs, sidecars=sidecars))
+        assert pages[1] == "0002 =====\nSecond\n"
+        assert pages[2].startswith("0003 =====\nPage 3")
+        assert pages[3] == "0004 =====\nFourth\n"
+        # The mismatched sidecars are ignored, so these come from the PDF.
+        assert pages[0].startswith("0001 =====\nPage 1")
+        assert pages[4].startswith("0005 =====\nPage 5")
+
+
+def test_text_of_ocrd_chunks_comes_from_their_sidecars(tmp_path, fake_ocr, layout_book):
+    book = layout_book(tmp_path / "act.pdf", "iittttttii")
+    ocr_pdf_in_chunks(str(book), str(tmp_path / "work"), chunk_size=2, progress_interval=0)
+    merged = tmp_path / "work" / "act_ocr.pdf"
+    sidecars = chunk_sidecars(merged)
+    assert [(first, last) for first, last, _path in sidecars] == [(1, 2), (9, 10)]
+
+    pages = _pages(extract_text(merged, tmp_path / "act.txt", sidecars=sidecars))
+    assert pages[0] == "0001 =====\nFake OCR text of page 1\n"
+    assert pages[9] == "0010 =====\nFake OCR text of page 2"
+    assert pages[4].startswith("0005 =====\nPage 5")
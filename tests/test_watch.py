@@ -0,0 +1,47 @@
+from src import watch
+from src.watch import FolderWatcher
+
+
+def _count_stats(monkeypatch):
+    stated = []
+    signature = watch._signature
+
+    def counting(path):
+        stated.append(path.name)
+        return signature(path)
+
+    monkeypatch.setattr(watch, "_signature", counting)
+    return stated
+
+
+def _library(folder, count):
+    folder.mkdir()
+    for number in range(count):
+        (folder / f"book{number:03d}.pdf").write_bytes(b"%PDF-1.7")
+    return {path.name: watch._signature(path) for path in folder.iterdir()}
+
+
+def test_a_new_file_is_found_without_stating_known_ones(tmp_path, monkeypatch):
+    known = _library(tmp_path / "in", 50)
+    with FolderWatcher(tmp_path / "in", known, settle_seconds=0, use_inotify=False) as watcher:
+        stated = _count_stats(monkeypatch)
+        assert watcher.poll(timeout=0) == []
+        assert stated == []
+
+        (tmp_path / "in" / "new.pdf").write_bytes(b"%PDF-1.7")
+        (tmp_path / "in" / "notes.txt").write_text("not a book")
+        assert watcher.poll(timeout=0) == [tmp_path / "in" / "new.pdf"]
+        assert set(stated) == {"new.pdf"}
+
+
+def test_files_changed_in_place_are_found_by_the_rescan(tmp_path, monkeypatch):
+    known = _library(tmp_path / "in", 3)
+    with FolderWatcher(
+        tmp_path / "in", known, settle_seconds=0, rescan_interval=0, use_inotify=False
+    ) as watcher:
+        assert watcher.poll(timeout=0) == []
+        with (tmp_path / "in" / "book001.pdf").open("ab") as handle:
+            handle.write(b"\n%%EOF\n")
+        stated = _count_stats(monkeypatch)
+        assert watcher.poll(timeout=0) == [tmp_path / "in" / "book001.pdf"]
+        assert sorted(set(stated)) == ["book000.pdf", "book001.pdf", "book002.pdf"]